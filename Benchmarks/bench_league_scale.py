@@ -0,0 +1,180 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import time
+from types import SimpleNamespace
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import assemble_srs, solve_srs_components
+from nfelosrs.Resources.SRS import SRS
+from nfelosrs.Resources.Bayes.BayesTuner import replay_season
+
+N_TEAMS = 130
+N_WEEKS = 15
+N_SEASONS = 25
+CONFERENCE_SIZE = 13
+NON_CONFERENCE_WEEKS = 3
+
+def college_schedule(n_teams=N_TEAMS, n_weeks=N_WEEKS, n_seasons=N_SEASONS, seed=0):
+    '''
+    A college like schedule. Early weeks pair teams across the league, later
+    weeks pair within conferences, so early graphs are sparse and split into
+    components. Odd team counts leave one team per conference on bye
+    '''
+    rng = numpy.random.default_rng(seed)
+    teams = numpy.array(['T{0:03d}'.format(i) for i in range(n_teams)])
+    conferences = numpy.arange(n_teams) // CONFERENCE_SIZE
+    games = []
+    for season in range(2000, 2000 + n_seasons):
+        strength = rng.normal(0, 10, n_teams)
+        for week in range(1, n_weeks + 1):
+            if week <= NON_CONFERENCE_WEEKS:
+                slates = [rng.permutation(n_teams)[:int(n_teams * 0.6) // 2 * 2]]
+            else:
+                slates = [
+                    rng.permutation(numpy.flatnonzero(conferences == c))
+                    for c in numpy.unique(conferences)
+                ]
+            for slate in slates:
+                for i in range(0, len(slate) - 1, 2):
+                    home, away = slate[i], slate[i + 1]
+                    games.append({
+                        'season' : season,
+                        'week' : week,
+                        'game_type' : 'REG',
+                        'home_team' : teams[home],
+                        'away_team' : teams[away],
+                        'home_index' : home,
+                        'away_index' : away,
+                        'result' : float(round(strength[home] - strength[away] + 3 + rng.normal(0, 14))),
+                        'modeled_hfa' : 3.0
+                    })
+    return pd.DataFrame(games)
+
+def legacy_calc_margins(games, week):
+    ## the original row by row opponent margin loop, kept as the baseline ##
+    games_ = games[games['week'] <= week].copy()
+    games_['away_result'] = games_['result'] * -1
+    flat = pd.concat([
+        games_[['home_team', 'away_team', 'result']].rename(columns={
+            'home_team' : 'team', 'away_team' : 'opponent', 'result' : 'mov'
+        }),
+        games_[['away_team', 'home_team', 'away_result']].rename(columns={
+            'away_team' : 'team', 'home_team' : 'opponent', 'away_result' : 'mov'
+        })
+    ])
+    avg_mov = flat.groupby(['team']).agg(
+        gp = ('mov', 'count'),
+        avg_mov = ('mov', 'mean')
+    ).reset_index()
+    records = []
+    for index, row in flat.iterrows():
+        flat_ = flat[
+            (flat['team'] == row['opponent']) &
+            (flat['opponent'] != row['team'])
+        ]
+        records.append({'team' : row['team'], 'opp_avg_mov' : flat_['mov'].mean()})
+    avg_mov = pd.merge(
+        avg_mov,
+        pd.DataFrame(records).groupby(['team']).agg(
+            avg_mov_of_opponents = ('opp_avg_mov', 'mean')
+        ).reset_index(),
+        on=['team'],
+        how='left'
+    )
+    return avg_mov.set_index('team').to_dict('index')
+
+def dense_solve(home, away, results, n_teams):
+    ## the dense path SRS uses, least squares for singular systems ##
+    coefficients, constants, _ = assemble_srs(home, away, results, n_teams)
+    try:
+        return numpy.linalg.solve(coefficients, constants)
+    except numpy.linalg.LinAlgError:
+        return numpy.linalg.lstsq(coefficients, constants, rcond=None)[0]
+
+def bench_league_scale(n_teams=N_TEAMS, n_weeks=N_WEEKS, n_seasons=N_SEASONS):
+    '''
+    Times each point in time stage at college scale. Every (season, week)
+    rates the games played through that week, as the schedule graph only
+    fills in over the season. Teams without a game yet are excluded from the
+    system so the dense path is not handed a zero row
+    '''
+    games = college_schedule(n_teams, n_weeks, n_seasons)
+    adjusted = (games['result'] - games['modeled_hfa']).values
+    timings = {'dense' : 0.0, 'sparse' : 0.0, 'margins' : 0.0, 'bayes' : 0.0}
+    max_diff = 0.0
+    components = []
+    for season, season_games in games.groupby('season'):
+        index = season_games.index.values
+        for week in range(1, n_weeks + 1):
+            played = index[season_games['week'].values <= week]
+            ## compact to the teams that have played ##
+            teams, codes = numpy.unique(
+                numpy.concatenate([games.loc[played, 'home_index'], games.loc[played, 'away_index']]),
+                return_inverse=True
+            )
+            home, away = codes[:len(played)], codes[len(played):]
+            start = time.perf_counter()
+            dense = dense_solve(home, away, adjusted[played], len(teams))
+            timings['dense'] += time.perf_counter() - start
+            start = time.perf_counter()
+            sparse, labels = solve_srs_components(home, away, adjusted[played], len(teams))
+            timings['sparse'] += time.perf_counter() - start
+            components.append(len(numpy.unique(labels)))
+            ## the dense path's median centering, for comparison ##
+            if components[-1] == 1:
+                max_diff = max(max_diff, numpy.max(numpy.abs(
+                    (dense - numpy.median(dense)) - (sparse - numpy.median(sparse))
+                )))
+            start = time.perf_counter()
+            SRS.calc_margins(SimpleNamespace(games=season_games, week=week))
+            timings['margins'] += time.perf_counter() - start
+        ## bayesian updates for the season ##
+        start = time.perf_counter()
+        zeros = numpy.zeros(len(season_games))
+        replay_season(
+            season_games['home_index'].values, season_games['away_index'].values,
+            season_games['result'].values, season_games['modeled_hfa'].values,
+            zeros, zeros, numpy.zeros(n_teams),
+            numpy.array([7.5]), numpy.array([13.5]), numpy.array([0.0])
+        )
+        timings['bayes'] += time.perf_counter() - start
+    ## legacy margins on one season, which is quadratic in games ##
+    season_games = games[games['season'] == games['season'].min()]
+    legacy_weeks = [1, n_weeks // 2, n_weeks]
+    start = time.perf_counter()
+    legacy = [legacy_calc_margins(season_games, week) for week in legacy_weeks]
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    current = [SRS.calc_margins(SimpleNamespace(games=season_games, week=week)) for week in legacy_weeks]
+    current_time = time.perf_counter() - start
+    margins_match = all(
+        pd.DataFrame(l).equals(pd.DataFrame(c)) for l, c in zip(legacy, current)
+    )
+    n_systems = n_seasons * n_weeks
+    print('  {0} teams x {1} weeks x {2} seasons, {3:,} games, {4:,} weekly systems'.format(
+        n_teams, n_weeks, n_seasons, len(games), n_systems
+    ))
+    print('    components per week:  {0} (week 1) to {1}'.format(max(components), min(components)))
+    print('    dense solve:          {0:.3f}s'.format(timings['dense']))
+    print('    sparse components:    {0:.3f}s ({1:.1f}x)'.format(timings['sparse'], timings['dense'] / timings['sparse']))
+    print('    connected max diff:   {0:.2e}'.format(max_diff))
+    print('    margins:              {0:.3f}s'.format(timings['margins']))
+    print('    margins, 3 weeks:     legacy {0:.3f}s, current {1:.3f}s ({2:.1f}x), match {3}'.format(
+        legacy_time, current_time, legacy_time / current_time, margins_match
+    ))
+    print('    bayesian replay:      {0:.3f}s'.format(timings['bayes']))
+    return {
+        'timings' : timings,
+        'legacy_margins' : legacy_time,
+        'current_margins' : current_time,
+        'margins_match' : margins_match,
+        'max_diff' : max_diff
+    }
+
+if __name__ == '__main__':
+    print('Benchmarking league scale...')
+    bench_league_scale()
@@ -0,0 +1,70 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import time
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import (
+    american_to_prob, calc_vf_over_prob, line_adj_arrays, load_config
+)
+
+N_QUOTES = 2000000
+
+def legacy_add_odds_and_line_adj(wts, over_prob_logit_coef):
+    ## the original column by column implementation, kept as the baseline ##
+    wts['over_prob'] = american_to_prob(wts['over_odds'])
+    wts['under_prob'] = american_to_prob(wts['under_odds'])
+    wts['hold'] = wts['over_prob'] + wts['under_prob'] - 1
+    wts['over_prob_vf'] = calc_vf_over_prob(wts['over_prob'], wts['under_prob'])
+    wts['under_prob_vf'] = 1 - wts['over_prob_vf']
+    wts['logit_over_prob_vf'] = numpy.log(
+        wts['over_prob_vf'] /
+        (1 - wts['over_prob_vf'])
+    )
+    wts['line_adj'] = (
+        wts['line'] +
+        wts['logit_over_prob_vf'] * over_prob_logit_coef
+    )
+    wts = wts.drop(columns=['over_prob', 'under_prob'])
+    return wts
+
+def bench_odds(n_quotes=N_QUOTES):
+    '''
+    Times bulk conversion of win total quotes with the legacy dataframe
+    path and the array path. Quotes are resampled from win_totals_full.csv
+    '''
+    quotes = pd.read_csv(
+        '{0}/nfelosrs/Manual Data/win_totals_full.csv'.format(package_dir),
+        usecols=['line', 'over_odds', 'under_odds']
+    )
+    sample = quotes.sample(n=n_quotes, replace=True, random_state=0).reset_index(drop=True)
+    coef = load_config('config.json', ['wt_ratings'])['over_prob_logit_coef']
+    ## legacy ##
+    start = time.perf_counter()
+    legacy = legacy_add_odds_and_line_adj(sample.copy(), coef)
+    legacy_time = time.perf_counter() - start
+    ## arrays, into a preallocated buffer ##
+    line = sample['line'].values.astype(numpy.float64)
+    over = sample['over_odds'].values.astype(numpy.float64)
+    under = sample['under_odds'].values.astype(numpy.float64)
+    buffer = numpy.empty((5, n_quotes))
+    start = time.perf_counter()
+    fields = line_adj_arrays(line, over, under, coef, out=buffer)
+    array_time = time.perf_counter() - start
+    matches = numpy.allclose(fields['line_adj'], legacy['line_adj'].values)
+    print('  {0:,} quotes'.format(n_quotes))
+    print('    legacy dataframe: {0:.3f}s'.format(legacy_time))
+    print('    array buffer:     {0:.3f}s ({1:.1f}x)'.format(array_time, legacy_time / array_time))
+    print('    results match:    {0}'.format(matches))
+    return {
+        'legacy' : legacy_time,
+        'array' : array_time,
+        'matches' : matches
+    }
+
+if __name__ == '__main__':
+    print('Benchmarking odds conversion...')
+    bench_odds()
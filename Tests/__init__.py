@@ -1,5 +1,30 @@
 from .test_wt_completeness import test_wt_ratings_completeness
 from .test_wt_rsq_progression import test_rsq_progression
+from .test_season_simulator import test_season_simulator
+from .test_wt_optimizer import test_wt_optimizer
+from .test_odds_arrays import test_odds_arrays
+from .test_wt_consensus import test_wt_consensus
+from .test_wt_ratings_history import test_wt_ratings_history
+from .test_qb_season import test_qb_season
+from .test_feature_cache import test_feature_cache
+from .test_distributions import test_distributions
+from .test_bayes_tuner import test_bayes_tuner
+from .test_srs_diff import test_srs_diff
+from .test_data_source import test_data_source
+from .test_dirty_weeks import test_dirty_weeks
+from .test_pipeline import test_pipeline
+from .test_ratings_service import test_ratings_service
+from .test_srs_assembly import test_srs_assembly
+from .test_team_index import test_team_index
+from .test_updatable_srs import test_updatable_srs
+from .test_live_srs import test_live_srs
+from .test_league import test_league
+from .test_ratings_cube import test_ratings_cube
+from .test_srs_bootstrap import test_srs_bootstrap
+from .test_backtest import test_backtest
+from .test_schedule_strength import test_schedule_strength
+from .test_bayes_smoother import test_bayes_smoother
+from .test_srs_variants import test_srs_variants
 
 
 def run_tests():
@@ -13,4 +38,89 @@ def run_tests():
     print('Testing WT Ratings R² Progression...')
     rsq_passed = test_rsq_progression()
     print('Result: {0}'.format('PASS' if rsq_passed else 'FAIL'))
-    return completeness_passed and rsq_passed
+    print('Testing Season Simulator...')
+    simulator_passed = test_season_simulator()
+    print('Result: {0}'.format('PASS' if simulator_passed else 'FAIL'))
+    print('Testing WT Optimizer...')
+    optimizer_passed = test_wt_optimizer()
+    print('Result: {0}'.format('PASS' if optimizer_passed else 'FAIL'))
+    print('Testing Odds Arrays...')
+    odds_passed = test_odds_arrays()
+    print('Result: {0}'.format('PASS' if odds_passed else 'FAIL'))
+    print('Testing WT Consensus...')
+    consensus_passed = test_wt_consensus()
+    print('Result: {0}'.format('PASS' if consensus_passed else 'FAIL'))
+    print('Testing WT Ratings History...')
+    history_passed = test_wt_ratings_history()
+    print('Result: {0}'.format('PASS' if history_passed else 'FAIL'))
+    print('Testing QB Season...')
+    qb_passed = test_qb_season()
+    print('Result: {0}'.format('PASS' if qb_passed else 'FAIL'))
+    print('Testing Feature Cache...')
+    features_passed = test_feature_cache()
+    print('Result: {0}'.format('PASS' if features_passed else 'FAIL'))
+    print('Testing Distributions...')
+    distributions_passed = test_distributions()
+    print('Result: {0}'.format('PASS' if distributions_passed else 'FAIL'))
+    print('Testing Bayes Tuner...')
+    tuner_passed = test_bayes_tuner()
+    print('Result: {0}'.format('PASS' if tuner_passed else 'FAIL'))
+    print('Testing SRS Diff...')
+    diff_passed = test_srs_diff()
+    print('Result: {0}'.format('PASS' if diff_passed else 'FAIL'))
+    print('Testing Data Source...')
+    source_passed = test_data_source()
+    print('Result: {0}'.format('PASS' if source_passed else 'FAIL'))
+    print('Testing Dirty Weeks...')
+    dirty_passed = test_dirty_weeks()
+    print('Result: {0}'.format('PASS' if dirty_passed else 'FAIL'))
+    print('Testing Pipeline...')
+    pipeline_passed = test_pipeline()
+    print('Result: {0}'.format('PASS' if pipeline_passed else 'FAIL'))
+    print('Testing Ratings Service...')
+    service_passed = test_ratings_service()
+    print('Result: {0}'.format('PASS' if service_passed else 'FAIL'))
+    print('Testing SRS Assembly...')
+    assembly_passed = test_srs_assembly()
+    print('Result: {0}'.format('PASS' if assembly_passed else 'FAIL'))
+    print('Testing Team Index...')
+    team_index_passed = test_team_index()
+    print('Result: {0}'.format('PASS' if team_index_passed else 'FAIL'))
+    print('Testing Updatable SRS...')
+    updatable_passed = test_updatable_srs()
+    print('Result: {0}'.format('PASS' if updatable_passed else 'FAIL'))
+    print('Testing Live SRS...')
+    live_passed = test_live_srs()
+    print('Result: {0}'.format('PASS' if live_passed else 'FAIL'))
+    print('Testing League...')
+    league_passed = test_league()
+    print('Result: {0}'.format('PASS' if league_passed else 'FAIL'))
+    print('Testing Ratings Cube...')
+    cube_passed = test_ratings_cube()
+    print('Result: {0}'.format('PASS' if cube_passed else 'FAIL'))
+    print('Testing SRS Bootstrap...')
+    bootstrap_passed = test_srs_bootstrap()
+    print('Result: {0}'.format('PASS' if bootstrap_passed else 'FAIL'))
+    print('Testing Backtest...')
+    backtest_passed = test_backtest()
+    print('Result: {0}'.format('PASS' if backtest_passed else 'FAIL'))
+    print('Testing Schedule Strength...')
+    sos_passed = test_schedule_strength()
+    print('Result: {0}'.format('PASS' if sos_passed else 'FAIL'))
+    print('Testing Bayes Smoother...')
+    smoother_passed = test_bayes_smoother()
+    print('Result: {0}'.format('PASS' if smoother_passed else 'FAIL'))
+    print('Testing SRS Variants...')
+    variants_passed = test_srs_variants()
+    print('Result: {0}'.format('PASS' if variants_passed else 'FAIL'))
+    return (
+        completeness_passed and rsq_passed and simulator_passed and
+        optimizer_passed and odds_passed and consensus_passed and
+        history_passed and qb_passed and features_passed and
+        distributions_passed and tuner_passed and diff_passed and
+        source_passed and dirty_passed and pipeline_passed and
+        service_passed and assembly_passed and team_index_passed and
+        updatable_passed and live_passed and league_passed and
+        cube_passed and bootstrap_passed and backtest_passed and
+        sos_passed and smoother_passed and variants_passed
+    )
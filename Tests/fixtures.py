@@ -0,0 +1,74 @@
+import pandas as pd
+import numpy
+import pathlib
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+
+def synthetic_season(season=2023, seed=0, weeks=18, played_through=None):
+    '''
+    Creates a synthetic games and qbelo file for a season, using the teams
+    in wt_ratings.csv, so point in time engines can be tested without nfelodcm.
+    Every 6th week has 4 teams on bye and roughly 10% of starts are by a backup
+    '''
+    rng = numpy.random.default_rng(seed)
+    wt_ratings = pd.read_csv('{0}/wt_ratings.csv'.format(package_dir), index_col=0)
+    teams = sorted(wt_ratings[wt_ratings['season'] == season]['team'].unique())
+    strength = dict(zip(teams, rng.normal(0, 5, len(teams))))
+    games = []
+    qbs = []
+    for week in range(1, weeks + 1):
+        slate = rng.permutation(teams)
+        if week % 6 == 0:
+            slate = slate[:-4]
+        for i in range(0, len(slate), 2):
+            home, away = slate[i], slate[i + 1]
+            game_id = '{0}_{1:02d}_{2}_{3}'.format(season, week, away, home)
+            result = float(round(strength[home] - strength[away] + 2 + rng.normal(0, 13)))
+            if played_through is not None and week > played_through:
+                result = numpy.nan
+            games.append({
+                'game_id' : game_id,
+                'season' : season,
+                'week' : week,
+                'game_type' : 'REG',
+                'gameday' : '{0}-09-{1:02d}'.format(season, week),
+                'gametime' : '{0}:00'.format(13 + i % 8),
+                'home_team' : home,
+                'away_team' : away,
+                'result' : result,
+                'spread_line' : round(strength[home] - strength[away] + 2, 1),
+                'modeled_hfa' : 1.8
+            })
+            qbs.append({
+                'game_id' : game_id,
+                'season' : season,
+                'week' : week,
+                'date' : '{0}-09-{1:02d}'.format(season, week),
+                'team1' : home,
+                'team2' : away,
+                'qb1' : '{0}_qb{1}'.format(home, int(rng.random() < 0.1)),
+                'qb2' : '{0}_qb{1}'.format(away, int(rng.random() < 0.1)),
+                'qb1_value_pre' : rng.normal(100, 30),
+                'qb2_value_pre' : rng.normal(100, 30),
+                'score1' : numpy.nan if numpy.isnan(result) else 20
+            })
+    return pd.DataFrame(games), pd.DataFrame(qbs)
+
+def synthetic_history(seasons):
+    '''
+    Stacks synthetic seasons and adds the qbelo fields used by the
+    distributions
+    '''
+    games, qbs = [], []
+    for i, season in enumerate(seasons):
+        season_games, season_qbs = synthetic_season(season=season, seed=i)
+        games.append(season_games)
+        qbs.append(season_qbs)
+    games = pd.concat(games).reset_index(drop=True)
+    qbs = pd.concat(qbs).reset_index(drop=True)
+    rng = numpy.random.default_rng(0)
+    for col in ['qbelo1_pre', 'qbelo2_pre', 'qbelo1_post', 'qbelo2_post']:
+        qbs[col] = rng.normal(1505, 80, len(qbs))
+    qbs['qb1_adj'] = rng.normal(0, 20, len(qbs))
+    qbs['qb2_adj'] = rng.normal(0, 20, len(qbs))
+    return games, qbs
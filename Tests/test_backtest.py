@@ -0,0 +1,95 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.Backtest import Backtest
+from nfelosrs.Utilities import spread_to_prob
+from Tests.fixtures import synthetic_season
+
+def merged_predictions(games, ratings, rating):
+    ## each game with the prior week's ratings, joined as calc_rmse does ##
+    prior = ratings[['season', 'week', 'team', rating]].copy()
+    prior['week'] = prior['week'] + 1
+    df = pd.merge(
+        games, prior.rename(columns={'team' : 'home_team', rating : 'home_rating'}),
+        on=['season', 'week', 'home_team']
+    )
+    df = pd.merge(
+        df, prior.rename(columns={'team' : 'away_team', rating : 'away_rating'}),
+        on=['season', 'week', 'away_team']
+    )
+    df['margin_pred'] = df['home_rating'] + df['modeled_hfa'] - df['away_rating']
+    return df
+
+def test_backtest():
+    '''
+    Ensures the vectorized backtest matches merged predictions on RMSE, ATS,
+    and brier by week, and that seasons run in a process pool match serially
+    '''
+    frames = [synthetic_season(season=s, seed=s, played_through=12)[0] for s in [2022, 2023]]
+    games = pd.concat(frames).reset_index(drop=True)
+    rng = numpy.random.default_rng(0)
+    teams = sorted(set(games['home_team']))
+    ratings = pd.DataFrame([
+        {'season' : s, 'week' : w, 'team' : t}
+        for s in [2022, 2023] for w in range(1, 13) for t in teams
+    ])
+    ratings['srs_rating'] = rng.normal(0, 5, len(ratings)).round(1)
+    ratings['bayesian_rating'] = rng.normal(0, 5, len(ratings)).round(1)
+    ## a missing rating drops only that rating's game ##
+    ratings.loc[3, 'srs_rating'] = numpy.nan
+    columns = ['srs_rating', 'bayesian_rating']
+    backtest = Backtest(games, ratings, columns)
+    report = backtest.run()
+    passed = True
+    for rating in columns:
+        df = merged_predictions(games[games['result'].notnull()], ratings, rating)
+        df = df[df['margin_pred'].notnull()]
+        edge = numpy.sign(df['margin_pred'] - df['spread_line'])
+        cover = numpy.sign(df['result'] - df['spread_line'])
+        df['graded'] = (edge != 0) & (cover != 0)
+        df['ats_win'] = df['graded'] & (edge == cover)
+        df['se'] = (df['result'] - df['margin_pred']) ** 2
+        df['brier'] = (
+            spread_to_prob(df['margin_pred']) -
+            numpy.where(df['result'] > 0, 1.0, numpy.where(df['result'] < 0, 0.0, 0.5))
+        ) ** 2
+        expected = df.groupby(['season', 'week']).agg(
+            games = ('se', 'count'),
+            rmse = ('se', 'mean'),
+            ats_games = ('graded', 'sum'),
+            ats_wins = ('ats_win', 'sum'),
+            brier = ('brier', 'mean')
+        ).reset_index()
+        expected['rmse'] = expected['rmse'] ** (1/2)
+        actual = report[report['rating'] == rating].reset_index(drop=True)
+        passed = (
+            passed and
+            actual['week'].tolist() == expected['week'].tolist() and
+            actual['games'].tolist() == expected['games'].tolist() and
+            numpy.allclose(actual['rmse'], expected['rmse']) and
+            actual['ats_games'].tolist() == expected['ats_games'].tolist() and
+            numpy.allclose(
+                actual['ats_accuracy'] * actual['ats_games'], expected['ats_wins'], equal_nan=True
+            ) and
+            numpy.allclose(actual['brier'], expected['brier'])
+        )
+    ## calibration covers every scored game ##
+    calibration = backtest.calibration()
+    passed = passed and (
+        calibration.groupby('rating')['games'].sum() ==
+        report.groupby('rating')['games'].sum()
+    ).all()
+    ## process pool ##
+    pooled = Backtest(games, ratings, columns).run(processes=2)
+    return passed and pooled.equals(report)
+
+if __name__ == '__main__':
+    print('Testing Backtest...')
+    passed = test_backtest()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
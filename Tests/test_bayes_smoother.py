@@ -0,0 +1,96 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import os
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.PIT import QBSeason
+from nfelosrs.Resources.PIT.GamesPit import GamesPit
+from nfelosrs.Resources.SRS import SRSRunner
+from Tests.fixtures import synthetic_season
+
+def kalman_records(team, observations, prior_mean, prior_var, noise_var, obs_var):
+    ## weekly records of an exact random walk kalman filter for one team ##
+    records = []
+    mean, var = prior_mean, prior_var
+    for week, y in enumerate(observations, start=1):
+        predicted_var = var + noise_var
+        post_var = 1 / (1 / predicted_var + 1 / obs_var)
+        post_mean = post_var * (mean / predicted_var + y / obs_var)
+        records.append({
+            'season' : 2023, 'week' : week, 'team' : team,
+            'bayesian_ranking_pre' : mean, 'bayesian_stdev_pre' : numpy.sqrt(var),
+            'bayesian_ranking_post' : post_mean, 'bayesian_stdev_post' : numpy.sqrt(post_var)
+        })
+        mean, var = post_mean, post_var
+    return records
+
+def dense_posterior(observations, prior_mean, prior_var, noise_var, obs_var):
+    ## posterior of the preseason and post game states given every game ##
+    n = len(observations)
+    ## state k is the preseason state plus the noise added before games 1..k ##
+    walk = numpy.tril(numpy.ones((n + 1, n + 1)))
+    prior_cov = walk @ numpy.diag([prior_var] + [noise_var] * n) @ walk.T
+    observe = numpy.eye(n + 1)[1:]
+    gain = prior_cov @ observe.T @ numpy.linalg.inv(
+        observe @ prior_cov @ observe.T + obs_var * numpy.eye(n)
+    )
+    mean = prior_mean + gain @ (observations - prior_mean)
+    cov = prior_cov - gain @ observe @ prior_cov
+    return mean, numpy.sqrt(numpy.diag(cov))
+
+def test_bayes_smoother():
+    '''
+    Ensures the RTS smoother matches the exact posterior of a random walk given
+    every game, leaves each team's last game at its filtered value, fills
+    every week of a season, and is only written by runners that ask for it
+    '''
+    games, qbs = synthetic_season(played_through=12)
+    qb_season = QBSeason(qbs, 2023)
+    rankings = GamesPit(games, qb_season.snapshot(12).weekly_qb_adjustments).bayesian_rankings
+    filtered = pd.DataFrame(rankings.weekly)
+    by_week = rankings.smoothed_by_week(list(range(1, 13)))
+    smoothed = pd.DataFrame(rankings.weekly)
+    last = smoothed.groupby('team').tail(1)
+    season_passed = (
+        numpy.allclose(last['bayesian_ranking_smoothed'], last['bayesian_ranking_post']) and
+        numpy.allclose(last['bayesian_stdev_smoothed'], last['bayesian_stdev_post']) and
+        filtered['bayesian_ranking_post'].equals(smoothed['bayesian_ranking_post']) and
+        (smoothed['bayesian_stdev_smoothed'] <= smoothed['bayesian_stdev_post'] + 1e-9).all() and
+        len(by_week) == 12 * len(rankings.current) and
+        not by_week.isna().any().any()
+    )
+    ## an exact random walk kalman filter against the dense posterior ##
+    rng = numpy.random.default_rng(0)
+    observations = rng.normal(2, 10, 9)
+    rankings.process_noise = 1.5
+    rankings.weekly = kalman_records('ARI', observations, 1.0, 16.0, 1.5**2, 13.0**2)
+    rankings.current = {'ARI' : {'ranking_mean' : 0.0, 'ranking_stdev' : 1.0}}
+    smoothed = rankings.smooth()
+    mean, stdev = dense_posterior(observations, 1.0, 16.0, 1.5**2, 13.0**2)
+    exact_passed = (
+        numpy.allclose(smoothed['bayesian_ranking_smoothed'], mean[1:]) and
+        numpy.allclose(smoothed['bayesian_stdev_smoothed'], stdev[1:]) and
+        numpy.isclose(rankings.smoothed_preseason['ARI']['ranking_mean'], mean[0]) and
+        numpy.isclose(rankings.smoothed_preseason['ARI']['ranking_stdev'], stdev[0])
+    )
+    ## runners write the smoothed rankings only when asked to ##
+    short_games, short_qbs = synthetic_season(played_through=4)
+    written = []
+    for smoothed_flag in [False, True]:
+        with tempfile.TemporaryDirectory() as folder:
+            runner = SRSRunner(short_games, short_qbs, 2023, 4, rebuild=True, smoothed=smoothed_flag)
+            runner.package_dir = folder
+            runner.run()
+            written.append(os.path.exists('{0}/srs_bayesian_smoothed.csv'.format(folder)))
+    return season_passed and exact_passed and written == [False, True]
+
+if __name__ == '__main__':
+    print('Testing Bayes Smoother...')
+    passed = test_bayes_smoother()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
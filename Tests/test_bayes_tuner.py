@@ -0,0 +1,79 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs import Utilities as utils
+from nfelosrs.Resources.Bayes import BayesianRankings, BayesTuner, update_distributions
+from nfelosrs.Resources.Bayes.BayesTuner import replay_season
+from nfelosrs.Resources.Features import FeatureCache
+from Tests.fixtures import synthetic_season, synthetic_history
+
+def test_bayes_tuner():
+    '''
+    Ensures a grid replay matches BayesianRankings for each setting, that
+    the pooled and serial runs score the grid identically, and that the tuned
+    process noise survives a distributions refresh
+    '''
+    games, qbs = synthetic_season(played_through=14)
+    wt_ratings = pd.read_csv('{0}/wt_ratings.csv'.format(package_dir), index_col=0)
+    tuner = BayesTuner(
+        games, qbs, wt_ratings,
+        {'rankings' : [3, 4], 'margins' : [13], 'process_noise' : [0, 0.5]},
+        seasons=[2023]
+    )
+    args = tuner.season_args(2023)
+    replay = replay_season(*args)
+    ## reference with the same qb adjustments ##
+    played = tuner.games[tuner.games['season'] == 2023].copy()
+    played['home_qb_adj'] = args[4]
+    played['away_qb_adj'] = args[5]
+    ## replay arrays are in team id (alphabetical) order ##
+    teams = sorted(wt_ratings[wt_ratings['season'] == 2023]['team'])
+    all_passed = True
+    for i, params in tuner.grid.iterrows():
+        br = BayesianRankings(played, 2023, 18)
+        br.distributions = {'rankings' : params['rankings'], 'margins' : params['margins']}
+        br.process_noise = params['process_noise']
+        br.current = br.initialize_rankings()
+        br.update_priors()
+        means = br.return_updated_priors()
+        stdevs = br.return_updated_deviations()
+        all_passed = all_passed and (
+            numpy.allclose([means[t] for t in teams], replay['means'][i]) and
+            numpy.allclose([stdevs[t] for t in teams], replay['stdevs'][i])
+        )
+    serial = tuner.run()
+    pooled = tuner.run(processes=2)
+    ## write the best setting, then refresh, restoring the package file after ##
+    path = utils.get_distributions_path()
+    with open(path, 'r') as fp:
+        original = fp.read()
+    try:
+        tuned = tuner.write_best()
+        history_games, history_qbs = synthetic_history([2021, 2022])
+        with tempfile.TemporaryDirectory() as folder:
+            refreshed = update_distributions(
+                history_games, history_qbs,
+                FeatureCache(history_games, history_qbs, path='{0}/features.json'.format(folder))
+            )
+        stored = utils.load_distributions()
+    finally:
+        with open(path, 'w') as fp:
+            fp.write(original)
+    return (
+        all_passed and serial.equals(pooled) and len(serial) == 4 and
+        serial['rmse'].is_monotonic_increasing and
+        stored['process_noise'] == tuned['process_noise'] == refreshed['process_noise'] and
+        stored['rankings'] != tuned['rankings']
+    )
+
+if __name__ == '__main__':
+    print('Testing Bayes Tuner...')
+    passed = test_bayes_tuner()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,59 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.DataSource import DataSource, SnapshotSource, FrameSource
+from Tests.fixtures import synthetic_season
+
+def test_data_source():
+    '''
+    Ensures a snapshot round trips the tables and season state exactly,
+    that the latest version is picked by default, that a modified
+    file is rejected, and that an incomplete source can not be created
+    '''
+    games, qbs = synthetic_season(played_through=9)
+    qbs.loc[2, 'qb1'] = numpy.nan
+    source = FrameSource({'games' : games, 'qbelo' : qbs}, 2023, 9)
+    with tempfile.TemporaryDirectory() as root:
+        SnapshotSource.write(source, root=root, version='v001')
+        SnapshotSource.write(
+            FrameSource({'games' : games.head(10), 'qbelo' : qbs.head(10)}, 2023, 1),
+            root=root, version='v000'
+        )
+        snapshot = SnapshotSource(root)
+        tables = snapshot.load(['games', 'qbelo'])
+        passed = (
+            snapshot.version == 'v001' and
+            snapshot.get_season_state() == (2023, 9) and
+            tables['games'].equals(games) and
+            tables['qbelo'].equals(qbs)
+        )
+        ## tampering is caught ##
+        with open('{0}/v000/games.csv.gz'.format(root), 'ab') as fp:
+            fp.write(b'0')
+        try:
+            SnapshotSource(root, 'v000').load(['games'])
+            passed = False
+        except ValueError:
+            pass
+    ## a source missing get_season_state fails when it is created ##
+    class LoadOnly(DataSource):
+        def load(self, tables):
+            return {}
+    try:
+        LoadOnly()
+        passed = False
+    except TypeError:
+        pass
+    return passed
+
+if __name__ == '__main__':
+    print('Testing Data Source...')
+    passed = test_data_source()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,76 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.SRS import SRSRunner
+from Tests.fixtures import synthetic_season
+
+def weeks_to_run(games, qbs, folder, existing=None, bands=True):
+    ## a runner whose ratings are current through week 8 as of the stored fingerprints ##
+    runner = SRSRunner(games, qbs, 2023, 8, rebuild=True, bands=bands)
+    runner.rebuild = False
+    runner.package_dir = folder
+    runner.existing_ratings = existing if existing is not None else pd.DataFrame({
+        'season' : [2023], 'week' : [8], 'srs_rating_p05' : [-1.0], 'srs_rating_p95' : [1.0]
+    })
+    runner.current_week_index = len(runner.week_list) - 1
+    runner.existing_fingerprints = runner.load_existing_fingerprints()
+    return runner.get_weeks_to_run()
+
+def test_dirty_weeks():
+    '''
+    Ensures a score correction or a QB change dirties its week and every
+    later week of the season, unchanged inputs dirty nothing, and weeks
+    rated without bands are backfilled only when bands are on
+    '''
+    games, qbs = synthetic_season(played_through=8)
+    with tempfile.TemporaryDirectory() as folder:
+        runner = SRSRunner(games, qbs, 2023, 8, rebuild=True)
+        runner.package_dir = folder
+        runner.save_fingerprints()
+        unchanged = weeks_to_run(games, qbs, folder)
+        ## score correction in week 3 ##
+        corrected = games.copy()
+        corrected.loc[corrected['week'] == 3, 'result'] += 1
+        score_fix = weeks_to_run(corrected, qbs, folder)
+        ## qb change in week 6 ##
+        changed = qbs.copy()
+        changed.loc[changed[changed['week'] == 6].index[0], 'qb1'] = 'backup'
+        qb_fix = weeks_to_run(games, changed, folder)
+        ## weeks 4 and 5 were rated before the bands ##
+        existing = pd.DataFrame({
+            'season' : 2023, 'week' : range(2, 9), 'srs_rating_p05' : -1.0, 'srs_rating_p95' : 1.0
+        })
+        existing.loc[existing['week'].isin([4, 5]), 'srs_rating_p05'] = numpy.nan
+        backfill = weeks_to_run(games, qbs, folder, existing)
+        backfill_fix = weeks_to_run(corrected, qbs, folder, existing)
+        legacy = weeks_to_run(games, qbs, folder, existing[['season', 'week']])
+        unbanded = weeks_to_run(games, qbs, folder, existing[['season', 'week']], bands=False)
+    ## a week without qb rows round trips as an empty fingerprint ##
+    no_qbs = qbs[qbs['week'] != 4]
+    with tempfile.TemporaryDirectory() as folder:
+        runner = SRSRunner(games, no_qbs, 2023, 8, rebuild=True)
+        runner.package_dir = folder
+        runner.save_fingerprints()
+        empty_qbs = weeks_to_run(games, no_qbs, folder)
+    return (
+        unchanged == [] and
+        empty_qbs == [] and
+        score_fix == [[2023, w] for w in range(3, 9)] and
+        qb_fix == [[2023, w] for w in range(6, 9)] and
+        backfill == [[2023, 4], [2023, 5]] and
+        backfill_fix == [[2023, w] for w in range(3, 9)] and
+        legacy == [[2023, w] for w in range(2, 9)] and
+        unbanded == []
+    )
+
+if __name__ == '__main__':
+    print('Testing Dirty Weeks...')
+    passed = test_dirty_weeks()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
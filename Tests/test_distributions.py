@@ -0,0 +1,80 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs import Utilities as utils
+from nfelosrs.Resources.Bayes import update_distributions
+from nfelosrs.Resources.Features import FeatureCache
+from Tests.fixtures import synthetic_history
+
+def reference_ranking_deltas(qbs):
+    ## per group head / tail aggregation the vectorized version replaced ##
+    qbs = qbs[(qbs['season'] >= 1999) & (~pd.isnull(qbs['score1']))]
+    flat = pd.concat([
+        qbs[['season', 'date', 'team{0}'.format(i), 'qbelo{0}_pre'.format(i),
+             'qbelo{0}_post'.format(i), 'qb{0}_adj'.format(i)]].rename(columns={
+            'team{0}'.format(i) : 'team',
+            'qbelo{0}_pre'.format(i) : 'qbelo_pre',
+            'qbelo{0}_post'.format(i) : 'qbelo_post',
+            'qb{0}_adj'.format(i) : 'qb_adj'
+        }) for i in [1, 2]
+    ]).sort_values(by=['date', 'team']).reset_index(drop=True)
+    flat['qbelo_pre'] = ((flat['qbelo_pre'] + flat['qb_adj']) - 1505) / 25
+    flat['qbelo_post'] = ((flat['qbelo_post'] + flat['qb_adj']) - 1505) / 25
+    seasons = flat.groupby(['season', 'team']).agg(
+        gp = ('season', 'count'),
+        pre_season_rank=('qbelo_pre', lambda x: x.head(1)),
+        end_of_season_rank=('qbelo_post', lambda x: x.tail(1)),
+    ).reset_index()
+    seasons = seasons[seasons['gp']>14].copy()
+    seasons['delta'] = seasons['end_of_season_rank']-seasons['pre_season_rank']
+    return seasons[['season', 'team', 'delta']].reset_index(drop=True)
+
+def test_distributions():
+    '''
+    Ensures the vectorized ranking deltas match the per group aggregation,
+    including missing values at a season's edges, that bootstrap intervals
+    bracket the point estimate, and that they are only written on request
+    '''
+    games, qbs = synthetic_history([2021, 2022])
+    qbs.loc[0, 'qbelo1_pre'] = numpy.nan
+    qbs.loc[len(qbs) - 1, 'qbelo2_post'] = numpy.nan
+    deltas = utils.calc_ranking_deltas(qbs)
+    passed = deltas.equals(reference_ranking_deltas(qbs))
+    errors = utils.calc_margin_errors(games)['spread_error'].values
+    low, high = utils.bootstrap_std_ci(errors, n_boot=500, seed=7)
+    passed = (
+        passed and low < numpy.std(errors, ddof=1) < high and
+        [low, high] == utils.bootstrap_std_ci(errors, n_boot=500, seed=7)
+    )
+    ## intervals are written on request and dropped by a default refresh, ##
+    ## restoring the package file after ##
+    path = utils.get_distributions_path()
+    with open(path, 'r') as fp:
+        original = fp.read()
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            cache = FeatureCache(games, qbs, path='{0}/features.json'.format(folder))
+            with_intervals = update_distributions(games, qbs, cache, n_boot=50, seed=7)
+            refreshed = update_distributions(games, qbs, cache)
+        stored = utils.load_distributions()
+    finally:
+        with open(path, 'w') as fp:
+            fp.write(original)
+    return (
+        passed and
+        'rankings_ci' in with_intervals and 'margins_ci' in with_intervals and
+        'rankings_ci' not in refreshed and 'margins_ci' not in stored and
+        stored['rankings'] == with_intervals['rankings']
+    )
+
+if __name__ == '__main__':
+    print('Testing Distributions...')
+    passed = test_distributions()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
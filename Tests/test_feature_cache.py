@@ -0,0 +1,104 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.Features import FeatureCache
+from nfelosrs.Resources.Bayes.update_distributions import (
+    calc_margin_distributions, calc_ranking_distributions
+)
+from Tests.fixtures import synthetic_season, synthetic_history
+
+def reference_hfa(games):
+    ## compute_simple_hfa prior to the feature cache ##
+    seasonal_margin = games[
+        games['game_type'] == 'REG'
+    ].groupby(['season']).agg(
+        avg_margin = ('result', 'mean')
+    ).reset_index()
+    seasonal_margin['last_margin'] = seasonal_margin['avg_margin'].shift()
+    seasonal_margin = seasonal_margin[
+        seasonal_margin['season']!=2020
+    ].copy()
+    seasonal_margin['rolling_hfa'] = seasonal_margin['last_margin'].ewm(span=5).mean()
+    seasonal_margin = pd.concat([
+        seasonal_margin,
+        pd.DataFrame([{
+            'season' : 2020, 'avg_margin' : numpy.nan,
+            'last_margin' : numpy.nan, 'rolling_hfa' : 0,
+        }])
+    ])
+    return seasonal_margin[['season', 'rolling_hfa']].rename(columns={
+        'rolling_hfa' : 'modeled_hfa'
+    })
+
+def test_feature_cache():
+    '''
+    Ensures cached HFA and distributions match a full recompute, that only
+    seasons with changed inputs are recomputed, that a season without results
+    still gets an HFA, and that a cache stored for another season range is
+    verified before it is used
+    '''
+    games, qbs = synthetic_history([2018, 2019, 2020, 2021, 2022])
+    with tempfile.TemporaryDirectory() as folder:
+        path = '{0}/derived_features.json'.format(folder)
+        cache = FeatureCache(games, qbs, path=path).update()
+        hfa = cache.hfa().reset_index(drop=True)
+        ref = reference_hfa(games).reset_index(drop=True)
+        distros = cache.distributions()
+        passed = (
+            hfa['season'].tolist() == ref['season'].tolist() and
+            numpy.allclose(hfa['modeled_hfa'], ref['modeled_hfa'], equal_nan=True) and
+            numpy.isclose(distros['margins'], calc_margin_distributions(games)) and
+            numpy.isclose(distros['rankings'], calc_ranking_distributions(qbs)) and
+            cache.recomputed == [2018, 2019, 2020, 2021, 2022]
+        )
+        ## a fresh cache over unchanged inputs recomputes nothing ##
+        passed = passed and FeatureCache(games, qbs, path=path).update().recomputed == []
+        ## changing a result only dirties that season ##
+        games.loc[games['season'] == 2021, 'result'] += 1
+        cache = FeatureCache(games, qbs, path=path).update()
+        passed = (
+            passed and cache.recomputed == [2021] and
+            numpy.allclose(
+                cache.hfa().reset_index(drop=True)['modeled_hfa'],
+                reference_hfa(games).reset_index(drop=True)['modeled_hfa'],
+                equal_nan=True
+            )
+        )
+    ## an upcoming season with no results takes the prior seasons' HFA ##
+    upcoming = pd.concat([
+        games, synthetic_season(season=2023, seed=9, played_through=0)[0]
+    ]).reset_index(drop=True)
+    with tempfile.TemporaryDirectory() as folder:
+        path = '{0}/derived_features.json'.format(folder)
+        hfa = FeatureCache(upcoming, path=path).update().hfa().reset_index(drop=True)
+        ref = reference_hfa(upcoming).reset_index(drop=True)
+        passed = (
+            passed and
+            hfa['season'].tolist() == ref['season'].tolist() and
+            numpy.allclose(hfa['modeled_hfa'], ref['modeled_hfa'], equal_nan=True) and
+            not numpy.isnan(hfa[hfa['season'] == 2023]['modeled_hfa']).any()
+        )
+        ## a cache stored for fewer seasons is checked before it is used ##
+        FeatureCache(upcoming[upcoming['season'] < 2022], path=path).update()
+        upcoming.loc[upcoming['season'] == 2021, 'result'] -= 2
+        cache = FeatureCache(upcoming, path=path)
+        hfa = cache.hfa().reset_index(drop=True)
+        ref = reference_hfa(upcoming).reset_index(drop=True)
+        passed = (
+            passed and cache.recomputed == [2021] and
+            numpy.allclose(hfa['modeled_hfa'], ref['modeled_hfa'], equal_nan=True) and
+            FeatureCache(upcoming, path=path).stored_key == cache.key
+        )
+    return passed
+
+if __name__ == '__main__':
+    print('Testing Feature Cache...')
+    passed = test_feature_cache()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
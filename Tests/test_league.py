@@ -0,0 +1,63 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import calc_league_dims, add_line_rating, calc_rmse_by_week, calc_opponent_margins
+from Tests.fixtures import synthetic_season
+
+def test_league():
+    '''
+    Ensures league dimensions are read from the data, line ratings scale to
+    the league passed, RMSE handles seasons shorter than the NFL's, and
+    opponent margins match a row by row filter
+    '''
+    games, qbs = synthetic_season(weeks=12)
+    dims = calc_league_dims(games)
+    ## a 130 team, 12 game league ##
+    wts = pd.DataFrame({
+        'season' : 2023,
+        'team' : range(130),
+        'line_adj' : numpy.random.default_rng(0).uniform(3, 9, 130)
+    })
+    wts = add_line_rating(wts, {'teams' : 130, 'standard_games' : 12, 'regular_season_weeks' : 15})
+    ## ratings for every team and week ##
+    teams = sorted(set(games['home_team']))
+    ratings = pd.DataFrame([
+        {'season' : 2023, 'week' : w, 'team' : t, 'srs_rating' : 0.0}
+        for w in range(1, 13) for t in teams
+    ])
+    for column in [
+        'avg_mov', 'srs_rating_normalized', 'bayesian_rating', 'pre_season_wt_rating',
+        'srs_rating_w_qb_adj', 'srs_rating_normalized_w_qb_adj',
+        'bayesian_rating_w_qb_adj', 'pre_season_wt_rating_w_qb_adj'
+    ]:
+        ratings[column] = 0.0
+    rmse = calc_rmse_by_week(games, ratings)
+    ## opponent margins, with a team that has no other games ##
+    flat = pd.DataFrame({
+        'team' : ['A', 'B', 'A', 'C', 'B', 'C', 'D', 'E'],
+        'opponent' : ['B', 'A', 'C', 'A', 'C', 'B', 'E', 'D'],
+        'mov' : [3, -3, 7, -7, numpy.nan, numpy.nan, 1, -1]
+    })
+    expected = [
+        flat[(flat['team'] == row['opponent']) & (flat['opponent'] != row['team'])]['mov'].mean()
+        for _, row in flat.iterrows()
+    ]
+    margins = calc_opponent_margins(flat['team'].values, flat['opponent'].values, flat['mov'].values)
+    return (
+        dims == {'teams' : 32, 'standard_games' : 12, 'regular_season_weeks' : 12} and
+        numpy.isclose((wts['line_rating'] + 6).sum(), 780) and
+        rmse['week'].tolist() == list(range(2, 13)) and
+        not rmse.isna().any().any() and
+        numpy.array_equal(margins, numpy.array(expected), equal_nan=True)
+    )
+
+if __name__ == '__main__':
+    print('Testing League...')
+    passed = test_league()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,60 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.SRS import SRS, LiveSRS
+from Tests.fixtures import synthetic_season
+
+COLUMNS = [
+    'srs_rating', 'srs_rating_normalized', 'bayesian_rating',
+    'bayesian_stdev', 'qb_adjustment', 'srs_rating_w_qb_adj'
+]
+
+def test_live_srs():
+    '''
+    Ensures applying a week's scores one at a time ends at the week's SRS, and
+    that out of order and corrected scores replay to the same state
+    '''
+    full, qbs = synthetic_season()
+    full = full.sort_values(by=['week', 'gameday', 'gametime'], kind='stable').reset_index(drop=True)
+    games = full.copy()
+    games.loc[games['week'] >= 8, 'result'] = numpy.nan
+    week = full[full['week'] == 8]
+    scores = list(zip(week['game_id'], week['result']))
+    ## in kickoff order ##
+    live = LiveSRS(games, qbs, 2023, 8)
+    first = pd.DataFrame(live.apply_result(*scores[0]))
+    for game_id, result in scores[1:]:
+        live.apply_result(game_id, result)
+    played = games.copy()
+    played.loc[played['week'] == 8, 'result'] = full['result']
+    expected = pd.DataFrame(SRS(played, qbs, 2023, 8).records).set_index('team')
+    in_order = pd.DataFrame(live.records()).set_index('team').loc[expected.index]
+    ## reversed, with every score corrected ##
+    replayed = LiveSRS(games, qbs, 2023, 8)
+    for game_id, result in scores[::-1]:
+        replayed.apply_result(game_id, result + 5)
+    for game_id, result in scores:
+        replayed.apply_result(game_id, result)
+    replayed = pd.DataFrame(replayed.records()).set_index('team').loc[expected.index]
+    ## only the first game's teams have new bayesian ratings ##
+    moved = first[first['bayesian_rating'] != pd.DataFrame(
+        LiveSRS(games, qbs, 2023, 8).records()
+    )['bayesian_rating']]['team'].tolist()
+    home, away = week.iloc[0][['home_team', 'away_team']]
+    return (
+        numpy.allclose(in_order[COLUMNS].values, expected[COLUMNS].values, atol=0.01 + 1e-9) and
+        replayed.equals(in_order) and
+        live.pending() == [] and
+        set(moved) <= {home, away}
+    )
+
+if __name__ == '__main__':
+    print('Testing Live SRS...')
+    passed = test_live_srs()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
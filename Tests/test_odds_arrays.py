@@ -0,0 +1,50 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import (
+    american_to_prob, spread_to_prob, calc_probs_and_hold,
+    american_to_prob_array, spread_to_prob_array, line_adj_arrays
+)
+
+def test_odds_arrays():
+    '''
+    Ensures the array odds functions match the original conversions on
+    every quote in the win total files and return floats for scalars
+    '''
+    all_passed = True
+    for file in ['win_totals.csv', 'win_totals_full.csv']:
+        wts = pd.read_csv('{0}/nfelosrs/Manual Data/{1}'.format(package_dir, file), index_col=0)
+        over = wts['over_odds'].values
+        under = wts['under_odds'].values
+        vf_over, vf_under, hold = calc_probs_and_hold(over, under)
+        fields = line_adj_arrays(wts['line'].values, over, under, 0.5)
+        line_adj = wts['line'].values + numpy.log(vf_over / (1 - vf_over)) * 0.5
+        passed = (
+            numpy.allclose(american_to_prob_array(over), american_to_prob(over)) and
+            numpy.allclose(fields['over_prob_vf'], vf_over) and
+            numpy.allclose(fields['under_prob_vf'], vf_under) and
+            numpy.allclose(fields['hold'], hold) and
+            numpy.allclose(fields['line_adj'], line_adj)
+        )
+        print('  {0}: {1}'.format(file, 'PASS' if passed else 'FAIL'))
+        all_passed = all_passed and passed
+    ## scalar api ##
+    spreads = numpy.linspace(-20, 20, 81)
+    passed = (
+        isinstance(american_to_prob_array(-110), float) and
+        numpy.isclose(american_to_prob_array(150), 0.4) and
+        numpy.allclose(spread_to_prob_array(spreads), spread_to_prob(spreads))
+    )
+    print('  scalar api: {0}'.format('PASS' if passed else 'FAIL'))
+    return all_passed and passed
+
+if __name__ == '__main__':
+    print('Testing Odds Arrays...')
+    passed = test_odds_arrays()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,43 @@
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.Pipeline import BackgroundWriter
+
+def test_pipeline():
+    '''
+    Ensures the background writer runs writes in order, and that a failed
+    write is raised in the caller and stops later writes
+    '''
+    written = []
+    writer = BackgroundWriter(max_queued=2)
+    for i in range(5):
+        writer.put(written.append, i)
+    writer.close()
+    passed = written == [0, 1, 2, 3, 4]
+    ## failure ##
+    def fail(value):
+        raise OSError('disk full')
+    written = []
+    writer = BackgroundWriter(max_queued=2)
+    writer.put(written.append, 0)
+    writer.put(fail, 1)
+    raised = False
+    try:
+        for i in range(2, 50):
+            writer.put(written.append, i)
+    except OSError:
+        raised = True
+    try:
+        writer.close()
+    except OSError:
+        raised = True
+    return passed and raised and written[0] == 0 and 49 not in written
+
+if __name__ == '__main__':
+    print('Testing Pipeline...')
+    passed = test_pipeline()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
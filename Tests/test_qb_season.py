@@ -0,0 +1,42 @@
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.PIT import QBPit, QBSeason
+from Tests.fixtures import synthetic_season
+
+def test_qb_season():
+    '''
+    Ensures QBSeason slices match QBPit for every week of a synthetic season,
+    including a missing QB name and a missing QB value
+    '''
+    games, qbs = synthetic_season()
+    qbs.loc[3, 'qb1'] = numpy.nan
+    qbs.loc[7, 'qb2_value_pre'] = numpy.nan
+    qb_season = QBSeason(qbs, 2023)
+    all_passed = True
+    for week in sorted(games['week'].unique()):
+        reference = QBPit(qbs, games, 2023, week)
+        ref_adjs = reference.get_last_qb_adjs()
+        adjs = qb_season.get_last_qb_adjs(week)
+        passed = (
+            reference.weekly_qb_adjustments.equals(qb_season.weekly_qb_adjustments(week)) and
+            ref_adjs.keys() == adjs.keys() and
+            all(
+                ref_adjs[team] == adjs[team] or
+                (numpy.isnan(ref_adjs[team]) and numpy.isnan(adjs[team]))
+                for team in ref_adjs
+            )
+        )
+        print('  Week {0}: {1}'.format(week, 'PASS' if passed else 'FAIL'))
+        all_passed = all_passed and passed
+    return all_passed
+
+if __name__ == '__main__':
+    print('Testing QB Season...')
+    passed = test_qb_season()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,96 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.SRS import SRSRunner, RatingsCube
+from Tests.fixtures import synthetic_season
+
+def run_runner(games, qbs, week, folder):
+    ## a runner that picks up the ratings and fingerprints stored in folder ##
+    runner = SRSRunner(games, qbs, 2023, week, rebuild=True)
+    runner.rebuild = False
+    runner.package_dir = folder
+    runner.existing_ratings, runner.current_week_index = runner.load_existing()
+    runner.existing_fingerprints = runner.load_existing_fingerprints()
+    runner.run()
+    return pd.read_csv('{0}/srs_ratings.csv'.format(folder), index_col=0)
+
+def matches(cube, ratings, season, week):
+    ## a cube week against the csv, at float32 precision ##
+    expected = ratings[
+        (ratings['season'] == season) & (ratings['week'] == week)
+    ].sort_values(by='team').reset_index(drop=True)
+    actual = cube.frame(season, week)
+    metrics = cube.sidecar['metrics']
+    return (
+        actual['team'].tolist() == expected['team'].tolist() and
+        numpy.array_equal(
+            actual[metrics].values,
+            expected[metrics].values.astype(numpy.float32).astype(numpy.float64),
+            equal_nan=True
+        )
+    )
+
+def test_ratings_cube():
+    '''
+    Ensures the cube matches the csv ratings, a new week is written in place,
+    a recomputed week is rewritten without disturbing an open reader, and a
+    reader that read the sidecar before a rewrite opens the new data file
+    '''
+    games, qbs = synthetic_season(played_through=5)
+    with tempfile.TemporaryDirectory() as folder:
+        path = '{0}/srs_ratings_cube.json'.format(folder)
+        ratings = run_runner(games, qbs, 4, folder)
+        reader = RatingsCube(path).open()
+        first_data = reader.sidecar['data']
+        built = all(matches(reader, ratings, 2023, w) for w in range(2, 5))
+        unrated = False
+        try:
+            reader.slice(2023, 5)
+        except KeyError:
+            unrated = True
+        ## week 5 lands ##
+        ratings = run_runner(games, qbs, 5, folder)
+        cube = RatingsCube(path).open()
+        in_place = (
+            cube.sidecar['data'] == first_data and
+            all(matches(cube, ratings, 2023, w) for w in range(2, 6))
+        )
+        ## a score correction in week 2 rewrites the cube ##
+        held = numpy.array(reader.slice(2023, 3))
+        corrected = games.copy()
+        corrected.loc[corrected['week'] == 2, 'result'] += 3
+        ratings = run_runner(corrected, qbs, 5, folder)
+        cube = RatingsCube(path).open()
+        rewritten = (
+            cube.sidecar['data'] != first_data and
+            not (pathlib.Path(folder) / first_data).exists() and
+            all(matches(cube, ratings, 2023, w) for w in range(2, 6)) and
+            numpy.array_equal(numpy.array(reader.slice(2023, 3)), held, equal_nan=True)
+        )
+        srs = cube.slice(2023, metric='srs_rating')
+        ## a reader holding the sidecar of the removed data file ##
+        racing = RatingsCube(path)
+        sidecars = [reader.sidecar]
+        racing.load_sidecar = lambda: sidecars.pop() if sidecars else RatingsCube.load_sidecar(racing)
+        racing.open()
+        reopened = (
+            racing.sidecar['data'] == cube.sidecar['data'] and
+            matches(racing, ratings, 2023, 5)
+        )
+    return (
+        built and unrated and in_place and rewritten and reopened and
+        srs.shape == (18, len(cube.sidecar['teams'])) and
+        numpy.isnan(srs[5:]).all()
+    )
+
+if __name__ == '__main__':
+    print('Testing Ratings Cube...')
+    passed = test_ratings_cube()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
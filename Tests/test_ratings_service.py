@@ -0,0 +1,106 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import json
+import tempfile
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.SRS import SRSRunner
+from nfelosrs.Resources.Service import RatingsService, RatingsRequestHandler
+from Tests.fixtures import synthetic_season
+
+def rebuilt_ratings(games, qbs, week):
+    ## cold run of the same games for comparison ##
+    runner = SRSRunner(games, qbs, 2023, week, rebuild=True)
+    weeks = runner.prepare_run()
+    return runner.combine_ratings(weeks, [runner.calc_week(s, w) for s, w in weeks])
+
+def test_ratings_service():
+    '''
+    Ensures results events recompute only the affected weeks, that a partially
+    posted week is held until it is complete, that the in memory ratings match a
+    cold run, and that the HTTP interface answers queries
+    '''
+    full_games, qbs = synthetic_season()
+    games, _ = synthetic_season(played_through=6)
+    with tempfile.TemporaryDirectory() as folder:
+        runner = SRSRunner(games, qbs, 2023, 6, rebuild=True)
+        runner.package_dir = folder
+        service = RatingsService(runner, persist=False)
+        ## new week, posted in two parts ##
+        week_7 = [
+            {'game_id' : g, 'result' : r} for g, r in
+            full_games[full_games['week'] == 7][['game_id', 'result']].values
+        ]
+        partial = service.apply_results(2023, 7, week_7[:8])
+        partial_status = service.status()
+        partial_ratings = service.ratings.copy()
+        ## week 8 can not be posted while week 7 is unfinished ##
+        week_8 = full_games[full_games['week'] == 8]
+        try:
+            service.apply_results(2023, 8, [
+                {'game_id' : week_8['game_id'].iloc[0], 'result' : week_8['result'].iloc[0]}
+            ])
+            early = False
+        except ValueError:
+            early = True
+        new_week = service.apply_results(2023, 7, week_7[8:])
+        ## score correction ##
+        game_id = full_games[full_games['week'] == 4]['game_id'].iloc[0]
+        corrected = full_games['result'][full_games['game_id'] == game_id].iloc[0] + 3
+        correction = service.apply_results(2023, 4, [{'game_id' : game_id, 'result' : corrected}])
+        ## unknown game ##
+        try:
+            service.apply_results(2023, 5, [{'game_id' : game_id, 'result' : 0}])
+            rejected = False
+        except ValueError:
+            rejected = True
+        ## cold run ##
+        expected_games = full_games.copy()
+        expected_games.loc[expected_games['week'] > 7, 'result'] = numpy.nan
+        expected_games.loc[expected_games['game_id'] == game_id, 'result'] = corrected
+        expected = rebuilt_ratings(expected_games, qbs, 7)
+        ## http ##
+        server = ThreadingHTTPServer(('127.0.0.1', 0), RatingsRequestHandler)
+        server.service = service
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:{0}/ratings?season=2023&week=7&team={1}'.format(
+                server.server_address[1], expected['team'].iloc[0]
+            )
+            with urllib.request.urlopen(url) as response:
+                served = json.loads(response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+    team = expected[(expected['week'] == 7) & (expected['team'] == expected['team'].iloc[0])]
+    return (
+        partial == [] and
+        partial_status['week'] == 6 and
+        not partial_ratings['srs_rating'].isnull().any() and
+        early and
+        new_week == [[2023, 7]] and
+        correction == [[2023, w] for w in range(4, 8)] and
+        rejected and
+        service.status()['week'] == 7 and
+        numpy.allclose(
+            service.ratings.select_dtypes('number').values,
+            expected.select_dtypes('number').values,
+            equal_nan=True
+        ) and
+        len(served) == 1 and
+        served[0]['srs_rating'] == team['srs_rating'].iloc[0]
+    )
+
+if __name__ == '__main__':
+    print('Testing Ratings Service...')
+    passed = test_ratings_service()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
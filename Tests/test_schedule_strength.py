@@ -0,0 +1,96 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+import tempfile
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import calc_sos_by_week
+from nfelosrs.Resources.SRS import SRSRunner
+from Tests.fixtures import synthetic_season
+
+def test_schedule_strength():
+    '''
+    Ensures past, remaining, and total SOS match averaging each team's
+    opponents' current ratings week by week, including bye weeks and a
+    missing rating, and that the runner writes SOS against the ratings it
+    wrote
+    '''
+    frames = [synthetic_season(season=s, seed=s, played_through=10)[0] for s in [2022, 2023]]
+    games = pd.concat(frames).reset_index(drop=True)
+    rng = numpy.random.default_rng(0)
+    teams = sorted(set(games['home_team']))
+    ratings = pd.DataFrame([
+        {'season' : s, 'week' : w, 'team' : t}
+        for s in [2022, 2023] for w in range(1, 11) for t in teams
+    ])
+    ratings['srs_rating'] = rng.normal(0, 5, len(ratings))
+    ratings['bayesian_rating'] = rng.normal(0, 5, len(ratings))
+    ratings.loc[5, 'srs_rating'] = numpy.nan
+    sos = calc_sos_by_week(games, ratings).set_index(['season', 'week', 'team'])
+    ## week by week reference ##
+    reg = games[games['game_type'] == 'REG']
+    flat = pd.concat([
+        reg[['season', 'week', 'home_team', 'away_team']].rename(columns={
+            'home_team' : 'team', 'away_team' : 'opponent'
+        }),
+        reg[['season', 'week', 'away_team', 'home_team']].rename(columns={
+            'away_team' : 'team', 'home_team' : 'opponent'
+        })
+    ])
+    passed = len(sos) == len(ratings)
+    for (season, week), current in ratings.groupby(['season', 'week']):
+        schedule = pd.merge(
+            flat[flat['season'] == season],
+            current[['team', 'srs_rating', 'bayesian_rating']].rename(columns={'team' : 'opponent'}),
+            on='opponent',
+            how='left'
+        )
+        for name, subset in [
+            ('past', schedule[schedule['week'] <= week]),
+            ('remaining', schedule[schedule['week'] > week]),
+            ('total', schedule)
+        ]:
+            expected = subset.groupby('team').agg(
+                games = ('opponent', 'count'),
+                srs_rating = ('srs_rating', lambda x: x.sum(skipna=False) / len(x)),
+                bayesian_rating = ('bayesian_rating', 'mean')
+            ).reindex(teams)
+            actual = sos.loc[(season, week)].reindex(teams)
+            passed = (
+                passed and
+                (actual['{0}_games'.format(name)].values == expected['games'].fillna(0).values).all() and
+                numpy.allclose(
+                    actual['srs_rating_{0}_sos'.format(name)], expected['srs_rating'], equal_nan=True
+                ) and
+                numpy.allclose(
+                    actual['bayesian_rating_{0}_sos'.format(name)], expected['bayesian_rating'], equal_nan=True
+                )
+            )
+    ## runner output ##
+    games, qbs = synthetic_season(played_through=6)
+    with tempfile.TemporaryDirectory() as folder:
+        runner = SRSRunner(games, qbs, 2023, 6, rebuild=True)
+        runner.package_dir = folder
+        runner.run()
+        written = pd.read_csv('{0}/srs_ratings.csv'.format(folder), index_col=0)
+        written_sos = pd.read_csv('{0}/srs_sos.csv'.format(folder), index_col=0)
+    expected = calc_sos_by_week(games, written)
+    runner_passed = (
+        written_sos['week'].tolist() == expected['week'].tolist() and
+        written_sos['team'].tolist() == expected['team'].tolist() and
+        numpy.allclose(
+            written_sos.drop(columns=['team']).values.astype(float),
+            expected.drop(columns=['team']).values.astype(float),
+            equal_nan=True
+        )
+    )
+    return passed and runner_passed
+
+if __name__ == '__main__':
+    print('Testing Schedule Strength...')
+    passed = test_schedule_strength()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
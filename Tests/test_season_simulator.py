@@ -0,0 +1,66 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.Sim import SeasonSimulator
+from Tests.fixtures import synthetic_season
+
+def test_season_simulator():
+    '''
+    Ensures every simulated season's wins sum to the games played, played
+    wins are banked, division odds sum to 1, chunks run in a process pool
+    match serially, and a finished season has no spread
+    '''
+    games, qbs = synthetic_season(played_through=8)
+    teams = sorted(games['home_team'].unique())
+    rng = numpy.random.default_rng(0)
+    rankings = dict(zip(teams, rng.normal(0, 4, len(teams))))
+    stdevs = dict(zip(teams, rng.uniform(1, 3, len(teams))))
+    sim = SeasonSimulator(
+        games, rankings, stdevs, 2023, 8, n_sims=2000, chunk_size=500, seed=0, margin_stdev=13
+    )
+    results = sim.run()
+    n_games = (games['game_type'] == 'REG').sum()
+    ## banked wins from the played games, ties as half a win ##
+    played = games[games['week'] <= 8]
+    banked = (
+        (played['result'] > 0).groupby(played['home_team']).sum().reindex(teams, fill_value=0) +
+        (played['result'] < 0).groupby(played['away_team']).sum().reindex(teams, fill_value=0) +
+        0.5 * (played['result'] == 0).groupby(played['home_team']).sum().reindex(teams, fill_value=0) +
+        0.5 * (played['result'] == 0).groupby(played['away_team']).sum().reindex(teams, fill_value=0)
+    )
+    division_odds = results.dropna(subset=['division']).groupby('division')['division_odds'].sum()
+    passed = (
+        results['team'].tolist() == teams and
+        numpy.isclose(sim.accumulators['wins'].sum() / sim.accumulators['n'], n_games) and
+        (sim.accumulators['histogram'].sum(axis=1) == 2000).all() and
+        numpy.allclose(results['current_wins'], banked.values) and
+        (results['mean_wins'] >= results['current_wins']).all() and
+        len(division_odds) > 0 and numpy.allclose(division_odds, 1, atol=1e-3)
+    )
+    ## process pool ##
+    pooled = SeasonSimulator(
+        games, rankings, stdevs, 2023, 8, n_sims=2000, chunk_size=500, seed=0, margin_stdev=13
+    ).run(processes=2)
+    passed = passed and pooled.equals(results)
+    ## nothing left to play ##
+    final_games, _ = synthetic_season(played_through=18)
+    final = SeasonSimulator(
+        final_games, rankings, stdevs, 2023, 18, n_sims=100, chunk_size=50, seed=0, margin_stdev=13
+    ).run()
+    return (
+        passed and
+        numpy.allclose(final['mean_wins'], final['current_wins']) and
+        (final['wins_stdev'] == 0).all() and
+        final['ros_sos'].isnull().all()
+    )
+
+if __name__ == '__main__':
+    print('Testing Season Simulator...')
+    passed = test_season_simulator()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
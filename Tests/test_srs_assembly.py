@@ -0,0 +1,88 @@
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import assemble_srs, assemble_srs_weeks, solve_srs_components
+
+def add_at_srs(home, away, results, n_teams):
+    ## the original add.at assembly ##
+    coefficients = numpy.zeros((n_teams, n_teams))
+    constants = numpy.zeros(n_teams)
+    numpy.add.at(coefficients, (home, home), 1)
+    numpy.add.at(coefficients, (away, away), 1)
+    numpy.add.at(coefficients, (home, away), -1)
+    numpy.add.at(coefficients, (away, home), -1)
+    numpy.add.at(constants, home, results)
+    numpy.add.at(constants, away, -1 * results)
+    game_counts = numpy.zeros(n_teams)
+    numpy.add.at(game_counts, home, 1)
+    numpy.add.at(game_counts, away, 1)
+    constants = constants / game_counts
+    for i in range(n_teams):
+        coefficients[i, :] /= game_counts[i]
+    return coefficients, constants
+
+def test_srs_assembly():
+    '''
+    Ensures bincount assembly matches add.at exactly for a single week, that
+    each week of a masked multi week assembly matches its own system, and that
+    the sparse component solve matches least squares
+    '''
+    rng = numpy.random.default_rng(0)
+    n_teams = 32
+    pairs = numpy.array([rng.permutation(n_teams) for _ in range(17)]).reshape(-1, 2)
+    home, away = pairs[:, 0], pairs[:, 1]
+    week = numpy.repeat(numpy.arange(1, 18), n_teams // 2)
+    ## results differ by week, as unplayed games use prior based results ##
+    results = rng.normal(0, 13, (17, len(home)))
+    masks = week[None, :] <= numpy.arange(1, 18)[:, None]
+    ## single week ##
+    coefficients, constants, _ = assemble_srs(home, away, results[-1], n_teams)
+    expected = add_at_srs(home, away, results[-1], n_teams)
+    passed = (
+        numpy.array_equal(coefficients, expected[0]) and
+        numpy.array_equal(constants, expected[1])
+    )
+    ## many weeks ##
+    coefficients, constants, game_counts = assemble_srs_weeks(home, away, results, masks, n_teams)
+    for w in range(17):
+        expected = add_at_srs(home[masks[w]], away[masks[w]], results[w][masks[w]], n_teams)
+        passed = (
+            passed and
+            numpy.array_equal(coefficients[w], expected[0]) and
+            numpy.array_equal(constants[w], expected[1]) and
+            game_counts[w].sum() == 2 * masks[w].sum()
+        )
+    ## sparse solve of a connected week and of two disconnected leagues ##
+    for league_home, league_away, league_results in [
+        (home, away, results[-1]),
+        (home[:32], away[:32], results[-1][:32])
+    ]:
+        coefficients, constants, _ = assemble_srs(
+            numpy.concatenate([league_home, league_home + n_teams]),
+            numpy.concatenate([league_away, league_away + n_teams]),
+            numpy.concatenate([league_results, league_results]),
+            2 * n_teams
+        )
+        least_squares = numpy.linalg.lstsq(coefficients, constants, rcond=None)[0]
+        ratings, labels = solve_srs_components(
+            numpy.concatenate([league_home, league_home + n_teams]),
+            numpy.concatenate([league_away, league_away + n_teams]),
+            numpy.concatenate([league_results, league_results]),
+            2 * n_teams
+        )
+        passed = (
+            passed and
+            numpy.allclose(ratings, least_squares, atol=1e-8) and
+            len(numpy.unique(labels)) >= 2
+        )
+    return passed
+
+if __name__ == '__main__':
+    print('Testing SRS Assembly...')
+    passed = test_srs_assembly()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
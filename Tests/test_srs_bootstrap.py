@@ -0,0 +1,73 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import assemble_srs, assemble_srs_weeks, bootstrap_srs
+from nfelosrs.Resources.SRS import SRS
+from Tests.fixtures import synthetic_season
+
+def test_srs_bootstrap():
+    '''
+    Ensures weighted assembly matches repeating games, the bands collapse to
+    the SRS solution when no games are resampled, the sparse path matches the
+    dense one and covers disconnected schedules, and SRS records carry bands
+    around srs_rating only when asked to
+    '''
+    rng = numpy.random.default_rng(0)
+    n_teams = 32
+    pairs = numpy.array([rng.permutation(n_teams) for _ in range(17)]).reshape(-1, 2)
+    home, away = pairs[:, 0], pairs[:, 1]
+    results = rng.normal(0, 13, len(home))
+    ## a weight of 2 is the game played twice ##
+    weights = numpy.where(numpy.arange(len(home)) % 3 == 0, 2.0, 1.0)
+    repeat = numpy.repeat(numpy.arange(len(home)), weights.astype(int))
+    weighted = assemble_srs_weeks(
+        home, away, results, numpy.ones((1, len(home)), dtype=bool), n_teams, weights[None, :]
+    )
+    repeated = assemble_srs(home[repeat], away[repeat], results[repeat], n_teams)
+    assembly_passed = (
+        numpy.allclose(weighted[0][0], repeated[0]) and
+        numpy.allclose(weighted[1][0], repeated[1])
+    )
+    ## nothing played, so every resample is the prior based system ##
+    coefficients, constants, _ = assemble_srs(home, away, results, n_teams)
+    expected = numpy.linalg.lstsq(coefficients, constants, rcond=None)[0]
+    expected -= numpy.median(expected)
+    bands = bootstrap_srs(home, away, results, numpy.zeros(len(home), dtype=bool), n_teams, n_boot=20)
+    collapse_passed = numpy.allclose(bands, expected[None, :])
+    ## sparse resamples match the dense ones ##
+    played = numpy.arange(len(home)) < 200
+    dense = bootstrap_srs(home, away, results, played, n_teams, n_boot=50, seed=1)
+    sparse = bootstrap_srs(home, away, results, played, n_teams, n_boot=50, seed=1, dense=False)
+    ## two leagues that never meet ##
+    split = (home < 16) == (away < 16)
+    disconnected = bootstrap_srs(
+        home[split], away[split], results[split], played[split], n_teams, n_boot=50, seed=1
+    )
+    sparse_passed = (
+        numpy.allclose(dense, sparse) and
+        numpy.isfinite(disconnected).all() and
+        (disconnected[0] < disconnected[1]).all()
+    )
+    ## srs records ##
+    games, qbs = synthetic_season(played_through=10)
+    records = pd.DataFrame(SRS(games, qbs, 2023, 10, bands=True).records)
+    unbanded = pd.DataFrame(SRS(games, qbs, 2023, 10).records)
+    records_passed = (
+        len(unbanded.columns.intersection(SRS.band_columns())) == 0 and
+        numpy.allclose(unbanded['srs_rating'], records['srs_rating']) and
+        (records['srs_rating_p05'] < records['srs_rating_p95']).all() and
+        (records['srs_rating'] >= records['srs_rating_p05']).mean() > 0.9 and
+        (records['srs_rating'] <= records['srs_rating_p95']).mean() > 0.9
+    )
+    return assembly_passed and collapse_passed and sparse_passed and records_passed
+
+if __name__ == '__main__':
+    print('Testing SRS Bootstrap...')
+    passed = test_srs_bootstrap()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,43 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.SRS import SRSDiff
+from nfelosrs.Resources.SRS.SRSDiff import reference_engine
+from Tests.fixtures import synthetic_season
+
+def test_srs_diff():
+    '''
+    Ensures the rewritten SRS and the production path match the frozen
+    reference on sampled weeks, including metrics, and that a perturbed engine
+    is caught at the first diverging team
+    '''
+    games, qbs = synthetic_season(played_through=10)
+    weeks = SRSDiff.sample_weeks([[2023, w] for w in range(1, 11)], 3, seed=1)
+    def perturbed(games, qbs, season, week):
+        records = reference_engine(games, qbs, season, week)
+        if week == weeks[-1][1]:
+            records.loc[records['team'] == 'NYJ', 'bayesian_rating'] += 0.01
+        return records
+    diff = SRSDiff(games, qbs)
+    diff.engines['perturbed'] = perturbed
+    report = diff.run(weeks, metrics=True).set_index('engine')
+    return (
+        len(weeks) == 3 and
+        bool(report.loc['srs', 'passed']) and
+        bool(report.loc['qb_season', 'passed']) and
+        not report.loc['perturbed', 'passed'] and
+        report.loc['perturbed', 'week'] == weeks[-1][1] and
+        report.loc['perturbed', 'team'] == 'NYJ' and
+        report.loc['perturbed', 'column'] == 'bayesian_rating'
+    )
+
+if __name__ == '__main__':
+    print('Testing SRS Diff...')
+    passed = test_srs_diff()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
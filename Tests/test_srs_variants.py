@@ -0,0 +1,76 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import assemble_srs, assemble_srs_constants, solve_srs_components
+from nfelosrs.Resources.SRS import SRS, SRSVariants
+from Tests.fixtures import synthetic_season
+
+def test_srs_variants():
+    '''
+    Ensures shared constants assembly matches each column's own assembly,
+    every variant matches a separate solve of its own system, the default
+    variant reproduces srs_rating, and the sparse path solves many columns
+    '''
+    rng = numpy.random.default_rng(0)
+    n_teams = 32
+    pairs = numpy.array([rng.permutation(n_teams) for _ in range(17)]).reshape(-1, 2)
+    home, away = pairs[:, 0], pairs[:, 1]
+    results = rng.normal(0, 13, (len(home), 3))
+    ## constants ##
+    _, _, game_counts = assemble_srs(home, away, results[:, 0], n_teams)
+    constants = assemble_srs_constants(home, away, results, game_counts)
+    assembly_passed = all(
+        numpy.array_equal(constants[:, i], assemble_srs(home, away, results[:, i], n_teams)[1])
+        for i in range(results.shape[1])
+    )
+    ## sparse path, many columns against each alone ##
+    ratings, _ = solve_srs_components(home, away, results, n_teams)
+    sparse_passed = ratings.shape == (n_teams, 3) and all(
+        numpy.allclose(ratings[:, i], solve_srs_components(home, away, results[:, i], n_teams)[0])
+        for i in range(results.shape[1])
+    )
+    ## variants ##
+    games, qbs = synthetic_season(played_through=10)
+    variants = SRSVariants(games, qbs, 2023, 10, {
+        'base' : {},
+        'neutral' : {'hfa' : 0},
+        'no_qb' : {'qb_adj' : False},
+        'capped' : {'margin_cap' : 14},
+        'half_prior' : {'prior_weight' : 0.5}
+    })
+    variants_passed = True
+    for i in range(len(variants.variants)):
+        coefficients, constants, _ = assemble_srs(
+            variants.home_index, variants.away_index, variants.results[:, i], len(variants.teams)
+        )
+        expected = numpy.linalg.lstsq(coefficients, constants, rcond=None)[0]
+        expected -= numpy.median(expected)
+        variants_passed = variants_passed and numpy.allclose(variants.ratings[:, i], expected)
+    ## variants differ from the base ##
+    variants_passed = variants_passed and all(
+        not numpy.allclose(variants.ratings[:, 0], variants.ratings[:, i])
+        for i in range(1, len(variants.variants))
+    )
+    ## the default variant is srs_rating ##
+    records = pd.DataFrame(SRS(games, qbs, 2023, 10).records)
+    frame = variants.frame()
+    base_passed = (
+        frame['team'].tolist() == records['team'].tolist() and
+        numpy.allclose(frame['srs_rating_base'], records['srs_rating'], atol=0.011) and
+        list(frame.columns) == [
+            'season', 'week', 'team', 'srs_rating_base', 'srs_rating_neutral',
+            'srs_rating_no_qb', 'srs_rating_capped', 'srs_rating_half_prior'
+        ]
+    )
+    return assembly_passed and sparse_passed and variants_passed and base_passed
+
+if __name__ == '__main__':
+    print('Testing SRS Variants...')
+    passed = test_srs_variants()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,45 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Utilities import TeamIndex, index_teams
+from Tests.fixtures import synthetic_season
+
+def test_team_index():
+    '''
+    Ensures ids round trip, relocations are canonicalized, unknown teams
+    raise, and games index the same with or without id columns
+    '''
+    games, qbs = synthetic_season()
+    team_index = TeamIndex.from_columns(games['home_team'], games['away_team'])
+    ids = team_index.encode(games['home_team'])
+    round_trip = (team_index.decode(ids) == games['home_team'].values).all()
+    canonical = TeamIndex.canonical(pd.Series(['SD', 'STL', 'KC'])).tolist() == ['LAC', 'LAR', 'KC']
+    try:
+        team_index.encode(pd.Series(['KC', 'XXX']))
+        rejected = False
+    except ValueError:
+        rejected = True
+    ## names and ids give the same teams and indices ##
+    by_name = index_teams(games)
+    by_id = index_teams(team_index.add_ids(games.copy(), ['home_team', 'away_team']))
+    sorted_by_id = index_teams(team_index.add_ids(games.copy(), ['home_team', 'away_team']), sort=True)
+    return (
+        round_trip and canonical and rejected and
+        by_name[0] == by_id[0] and
+        by_name[0] == games[['home_team', 'away_team']].stack().unique().tolist() and
+        numpy.array_equal(by_name[1], by_id[1]) and
+        numpy.array_equal(by_name[2], by_id[2]) and
+        sorted_by_id[0] == team_index.teams.tolist() and
+        numpy.array_equal(sorted_by_id[1], team_index.encode(games['home_team']))
+    )
+
+if __name__ == '__main__':
+    print('Testing Team Index...')
+    passed = test_team_index()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,52 @@
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.SRS import SRS, UpdatableSRS
+from Tests.fixtures import synthetic_season
+
+def test_updatable_srs():
+    '''
+    Ensures the updatable system matches SRS, that add, remove, and change
+    updates match a fresh build, and that a removal that strands a team
+    falls back to refactorization
+    '''
+    games, qbs = synthetic_season(played_through=8)
+    srs = SRS(games, qbs, 2023, 8)
+    system = UpdatableSRS.from_srs(srs)
+    matches_srs = numpy.array_equal(
+        system.ratings().round(2),
+        numpy.array([r['srs_rating'] for r in srs.records])
+    )
+    ## updates ##
+    teams = srs.teams
+    home = srs.games['home_index'].values.copy()
+    away = srs.games['away_index'].values.copy()
+    results = srs.games['adjusted_result'].values.copy()
+    system.change_result(teams[home[0]], teams[away[0]], results[0], results[0] + 7)
+    results[0] += 7
+    system.remove_game(teams[home[1]], teams[away[1]], results[1])
+    system.add_game(teams[away[1]], teams[home[1]], 3.0)
+    home[1], away[1], results[1] = away[1], home[1], 3.0
+    fresh = UpdatableSRS(teams, home, away, results)
+    matches_fresh = (
+        numpy.allclose(system.ratings(), fresh.ratings(), atol=1e-9) and
+        system.refactorizations == 1
+    )
+    ## strand a team by removing all of its games ##
+    stranded = UpdatableSRS(['A', 'B', 'C'], [0, 1], [1, 2], [3.0, -2.0])
+    stranded.remove_game('B', 'C', -2.0)
+    return (
+        matches_srs and matches_fresh and
+        stranded.refactorizations == 2 and
+        numpy.isfinite(stranded.ratings()).all()
+    )
+
+if __name__ == '__main__':
+    print('Testing Updatable SRS...')
+    passed = test_updatable_srs()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -3,14 +3,17 @@ import pathlib
 import sys
 
 package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
 
-EXPECTED_TEAMS = 32
+from nfelosrs.Utilities import get_league
+
+EXPECTED_TEAMS = get_league()['teams']
 
 def test_wt_ratings_completeness():
     '''
     Ensures we have wt_ratings for all teams in all seasons.
     Checks for:
-        - 32 teams per season
+        - every league team in each season
         - No duplicate teams
         - No missing wt_rating or line_rating values
     '''
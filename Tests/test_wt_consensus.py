@@ -0,0 +1,108 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.DataLoader import DataLoader
+from nfelosrs.Utilities import (
+    calc_consensus_lines, add_quote_odds, add_odds_and_line_adj, load_config,
+    WT_QUOTE_INDEX
+)
+
+def synthetic_quotes(season, teams, seed=0):
+    ## three books, each quoting every team at two timestamps, with an ##
+    ## alternate line at the latest one, indexed as DataLoader.load_wt_quotes does ##
+    rng = numpy.random.default_rng(seed)
+    rows = []
+    for book in ['book_a', 'book_b', 'book_c']:
+        for date in ['{0}-05-01', '{0}-08-01']:
+            for team in teams:
+                for line in [rng.choice([6.5, 7.5, 8.5, 9.5])] + ([10.5] if date.endswith('08-01') else []):
+                    over = float(rng.choice([-140, -120, -110, 100, 115]))
+                    rows.append({
+                        'season' : season,
+                        'team' : team,
+                        'line' : line,
+                        'over_odds' : over,
+                        'under_odds' : float(rng.choice([-130, -110, 105])),
+                        'source' : book,
+                        'source_date' : pd.Timestamp(date.format(season), tz='UTC')
+                    })
+    quotes = pd.DataFrame(rows)
+    quotes['team'] = quotes['team'].astype('category')
+    quotes['source'] = quotes['source'].astype('category')
+    return quotes.set_index(WT_QUOTE_INDEX).sort_index()
+
+def test_wt_consensus():
+    '''
+    Ensures the hold weighted and median consensus match hand computed
+    reductions of each book's latest main line, that the consensus odds give
+    back its probabilities, and that combine_wts swaps the consensus in only
+    for teams with multi book quotes
+    '''
+    coef = load_config('config.json', ['wt_ratings'])['over_prob_logit_coef']
+    teams = ['BUF', 'KC', 'SF']
+    quotes = synthetic_quotes(2023, teams)
+    ## latest snapshot of every book, by hand ##
+    latest = add_quote_odds(quotes.copy(), coef).reset_index()
+    latest = latest[latest['source_date'] == pd.Timestamp('2023-08-01', tz='UTC')].copy()
+    ## each book's main line is the one closest to an even over prob ##
+    latest['distance'] = (latest['over_prob_vf'] - 0.5).abs()
+    latest = latest.loc[latest.groupby(['team', 'source'], observed=True)['distance'].idxmin()]
+    weighted = calc_consensus_lines(quotes, coef, 'hold_weighted').set_index('team')
+    median = calc_consensus_lines(quotes, coef, 'median').set_index('team')
+    passed = True
+    for team in teams:
+        team_quotes = latest[latest['team'] == team]
+        weights = 1 / numpy.maximum(team_quotes['hold'].values, 0.01)
+        for value in ['line', 'line_adj', 'over_prob_vf']:
+            passed = (
+                passed and
+                numpy.isclose(
+                    weighted.loc[team, value],
+                    (weights * team_quotes[value].values).sum() / weights.sum()
+                ) and
+                numpy.isclose(median.loc[team, value], numpy.median(team_quotes[value].values))
+            )
+        passed = (
+            passed and
+            len(team_quotes) == 3 and
+            weighted.loc[team, 'n_sources'] == 3 and
+            weighted.loc[team, 'n_quotes'] == 3
+        )
+    ## the consensus odds give back the consensus probabilities and hold ##
+    reformatted = add_odds_and_line_adj(weighted.reset_index().copy(), coef).set_index('team')
+    passed = (
+        passed and
+        numpy.allclose(reformatted['over_prob_vf'], weighted['over_prob_vf'], atol=1e-4) and
+        numpy.allclose(reformatted['hold'], weighted['hold'], atol=1e-4)
+    )
+    ## combine_wts, on a loader without a data source ##
+    loader = DataLoader.__new__(DataLoader)
+    wts = pd.read_csv(
+        '{0}/nfelosrs/Manual Data/win_totals.csv'.format(package_dir), index_col=0
+    )
+    loader.wts = wts[wts['season'].isin([2022, 2023])].reset_index(drop=True)
+    ## one team has no quotes and keeps its line from the file ##
+    quoted_teams = sorted(loader.wts[loader.wts['season'] == 2023]['team'])[1:]
+    loader.wt_quotes = synthetic_quotes(2023, quoted_teams)
+    combined = loader.combine_wts('median')
+    season_2023 = combined[combined['season'] == 2023]
+    return (
+        passed and
+        (combined[combined['season'] == 2022]['source'] != 'consensus_median').all() and
+        season_2023[season_2023['team'].isin(quoted_teams)]['source'].eq('consensus_median').all() and
+        (season_2023[~season_2023['team'].isin(quoted_teams)]['source'] != 'consensus_median').all() and
+        len(season_2023) == len(quoted_teams) + 1 and
+        len(combined) == len(loader.wts) and
+        combined[['line_adj', 'over_odds', 'under_odds']].notnull().all().all()
+    )
+
+if __name__ == '__main__':
+    print('Testing WT Consensus...')
+    passed = test_wt_consensus()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,45 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.WT import WTOptimizer
+from Tests.fixtures import synthetic_season
+
+def test_wt_optimizer():
+    '''
+    Ensures the fitted ratings played against the schedule reproduce each
+    season's target win totals, the targets sum to the season's games, each
+    season is centered, and a team without a schedule is not rated
+    '''
+    games = pd.concat([
+        synthetic_season(season=s, seed=s)[0] for s in [2022, 2023]
+    ]).reset_index(drop=True)
+    rng = numpy.random.default_rng(0)
+    wts = pd.DataFrame([
+        {'season' : s, 'team' : t}
+        for s in [2022, 2023] for t in sorted(games['home_team'].unique())
+    ])
+    wts['line_adj'] = rng.uniform(5, 12, len(wts))
+    ## a team with a line but no games ##
+    wts = pd.concat([
+        wts, pd.DataFrame([{'season' : 2023, 'team' : 'XXX', 'line_adj' : 8.5}])
+    ]).reset_index(drop=True)
+    ratings = WTOptimizer(wts, games).solve()
+    rated = ratings[ratings['team'] != 'XXX']
+    games_by_season = games[games['game_type'] == 'REG'].groupby('season').size()
+    return (
+        numpy.allclose(rated['expected_wins'], rated['target_wins'], atol=1e-5) and
+        numpy.allclose(rated.groupby('season')['target_wins'].sum(), games_by_season) and
+        numpy.allclose(rated.groupby('season')['wt_schedule_rating'].mean(), 0, atol=1e-5) and
+        ratings[ratings['team'] == 'XXX'][['wt_schedule_rating', 'expected_wins']].isnull().all().all()
+    )
+
+if __name__ == '__main__':
+    print('Testing WT Optimizer...')
+    passed = test_wt_optimizer()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,66 @@
+import pandas as pd
+import numpy
+import pathlib
+import sys
+
+package_dir = pathlib.Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(package_dir))
+
+from nfelosrs.Resources.WT import WTRatingsHistory
+from nfelosrs.Utilities import calc_consensus_lines, add_line_rating, load_config, WT_QUOTE_INDEX
+
+def test_wt_ratings_history():
+    '''
+    Ensures the ratings at the final snapshot match add_line_rating on the
+    consensus of the final quotes, including alternate lines, that a date
+    before the first snapshot has no ratings, and that the history holds a
+    row per snapshot and team
+    '''
+    coef = load_config('config.json', ['wt_ratings'])['over_prob_logit_coef']
+    wts = pd.read_csv(
+        '{0}/nfelosrs/Manual Data/win_totals.csv'.format(package_dir), index_col=0
+    )
+    teams = sorted(wts[wts['season'] == 2023]['team'].unique())
+    ## three books moving one line at a time at staggered times, with an ##
+    ## alternate line on the last day ##
+    rng = numpy.random.default_rng(0)
+    rows = []
+    for i, book in enumerate(['book_a', 'book_b', 'book_c']):
+        for day in range(3):
+            for team in teams:
+                rows.append({
+                    'season' : 2023,
+                    'team' : team,
+                    'line' : float(rng.choice([5.5, 6.5, 7.5, 8.5, 9.5, 10.5])),
+                    'over_odds' : float(rng.choice([-130, -115, -110, 100])),
+                    'under_odds' : float(rng.choice([-125, -110, 105])),
+                    'source' : book,
+                    'source_date' : pd.Timestamp('2023-06-01', tz='UTC') + pd.Timedelta(days=day, hours=i)
+                })
+                if day == 2:
+                    rows.append({
+                        **rows[-1], 'line' : rows[-1]['line'] + 2,
+                        'over_odds' : 150.0, 'under_odds' : -180.0
+                    })
+    quotes = pd.DataFrame(rows)
+    quotes['team'] = quotes['team'].astype('category')
+    quotes['source'] = quotes['source'].astype('category')
+    quotes = quotes.set_index(WT_QUOTE_INDEX).sort_index()
+    history = WTRatingsHistory(quotes)
+    frame = history.run()
+    final = history.ratings_at(2023, quotes.index.get_level_values('source_date').max())
+    ## the consensus of each book's last quotes, normalized as WTRatings does ##
+    expected = add_line_rating(calc_consensus_lines(quotes, coef, 'median'))
+    expected = expected.set_index('team').reindex(final['team'])
+    return (
+        numpy.allclose(final['line_adj'], expected['line_adj'], atol=1e-4) and
+        numpy.allclose(final['line_rating'], expected['line_rating'], atol=1e-4) and
+        history.ratings_at(2023, '2023-05-01') is None and
+        len(frame) == 9 * len(teams)
+    )
+
+if __name__ == '__main__':
+    print('Testing WT Ratings History...')
+    passed = test_wt_ratings_history()
+    print('Result: {0}'.format('PASS' if passed else 'FAIL'))
+    sys.exit(0 if passed else 1)
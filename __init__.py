@@ -1,3 +1,5 @@
 from .nfelosrs.nfelosrs import run
 from .nfelosrs.nfelosrs import create_bayesian_distributions
+from .nfelosrs.nfelosrs import serve
+from .nfelosrs.nfelosrs import backtest
 from .Tests import run_tests
\ No newline at end of file
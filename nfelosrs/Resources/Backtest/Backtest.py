@@ -0,0 +1,189 @@
+import pandas as pd
+import numpy
+from concurrent.futures import ProcessPoolExecutor
+
+from ... import Utilities as utils
+from ...Utilities import get_package_dir, SRS_RATING_COLUMNS, TeamIndex, spread_to_prob_array
+
+## accumulators summed across games, from which every metric is derived ##
+ACCUMULATORS = [
+    'games', 'sse', 'ats_games', 'ats_wins', 'brier', 'log_loss', 'prob', 'wins'
+]
+CALIBRATION_ACCUMULATORS = ['games', 'prob', 'wins']
+## probabilities are clipped so a certain miss has a finite log loss ##
+MIN_PROB = 1e-12
+
+
+def backtest_season(games, ratings, rating_columns, n_bins):
+    '''
+    Scores every game of a season against the prior week's ratings. This is a
+    module level function so it can be pickled and sent to worker processes
+
+    Ratings are laid out as a (week, team, rating) array so each game's home and
+    away ratings for every rating column are a single fancy index, and the
+    accumulators for each (week, rating) are summed with bincount
+
+    Parameters:
+        games: the season's games with a result
+        ratings: the season's ratings
+        rating_columns: rating columns to score
+        n_bins: number of probability bins for calibration
+
+    Returns:
+        (week, rating) accumulators and (rating, bin) calibration accumulators
+    '''
+    n_ratings = len(rating_columns)
+    teams = TeamIndex.from_columns(ratings['team'], games['home_team'], games['away_team'])
+    n_weeks = int(max(ratings['week'].max(), games['week'].max()))
+    ## (week, team, rating). Week 0 is empty so week 1 games have no prior ##
+    table = numpy.full((n_weeks + 1, len(teams), n_ratings), numpy.nan)
+    table[
+        ratings['week'].values.astype(numpy.int64), teams.encode(ratings['team'].values)
+    ] = ratings[rating_columns].values
+    ## predict from the ratings through the prior week ##
+    prior_week = games['week'].values.astype(numpy.int64) - 1
+    ## summed in the order calc_rmse uses, so predictions on the line match ##
+    margin_pred = (
+        table[prior_week, teams.encode(games['home_team'].values)] +
+        games['modeled_hfa'].values[:, None] -
+        table[prior_week, teams.encode(games['away_team'].values)]
+    )
+    result = games['result'].values[:, None]
+    spread = games['spread_line'].values[:, None]
+    valid = ~numpy.isnan(margin_pred)
+    margin_pred = numpy.where(valid, margin_pred, 0)
+    ## against the spread. Pushes and predictions on the line are not graded ##
+    edge = numpy.sign(margin_pred - spread)
+    cover = numpy.sign(result - spread)
+    graded = valid & (edge != 0) & (cover != 0) & ~numpy.isnan(spread)
+    ## win probability, with ties as half a win ##
+    prob = numpy.clip(spread_to_prob_array(margin_pred), MIN_PROB, 1 - MIN_PROB)
+    wins = numpy.broadcast_to(
+        numpy.where(result > 0, 1.0, numpy.where(result < 0, 0.0, 0.5)), prob.shape
+    )
+    values = {
+        'games' : numpy.ones(prob.shape),
+        'sse' : (result - margin_pred) ** 2,
+        'ats_games' : graded.astype(numpy.float64),
+        'ats_wins' : (graded & (edge == cover)).astype(numpy.float64),
+        'brier' : (prob - wins) ** 2,
+        'log_loss' : -1 * (wins * numpy.log(prob) + (1 - wins) * numpy.log(1 - prob)),
+        'prob' : prob,
+        'wins' : wins
+    }
+    ## (week, rating) sums ##
+    weeks, week_codes = numpy.unique(games['week'].values, return_inverse=True)
+    keys = (week_codes[:, None] * n_ratings + numpy.arange(n_ratings))[valid]
+    size = len(weeks) * n_ratings
+    summary = pd.DataFrame({
+        'season' : games['season'].iloc[0],
+        'week' : numpy.repeat(weeks, n_ratings),
+        'rating' : numpy.tile(rating_columns, len(weeks)),
+        **{
+            name : numpy.bincount(keys, weights=values[name][valid], minlength=size)
+            for name in ACCUMULATORS
+        }
+    })
+    ## (rating, bin) sums ##
+    bins = numpy.minimum((prob * n_bins).astype(numpy.int64), n_bins - 1)
+    keys = (numpy.arange(n_ratings) * n_bins + bins)[valid]
+    size = n_ratings * n_bins
+    calibration = pd.DataFrame({
+        'season' : games['season'].iloc[0],
+        'rating' : numpy.repeat(rating_columns, n_bins),
+        'bin' : numpy.tile(numpy.arange(n_bins), n_ratings),
+        **{
+            name : numpy.bincount(keys, weights=values[name][valid], minlength=size)
+            for name in CALIBRATION_ACCUMULATORS
+        }
+    })
+    return summary[summary['games'] > 0], calibration[calibration['games'] > 0]
+
+
+class Backtest():
+    '''
+    Walk forward backtest of the ratings. Each game is predicted from the ratings
+    through the prior week plus modeled_hfa, and scored on margin (RMSE), against
+    the spread (ATS accuracy vs spread_line), and as a win probability (brier,
+    log loss, and calibration through spread_to_prob).
+
+    Seasons are scored independently, so they can be spread across processes.
+    Each season returns sums rather than metrics, so any breakdown (season, week,
+    rating, or a combination) is a groupby of the sums
+    '''
+    def __init__(self, games, ratings, rating_columns=None, n_bins=10):
+        self.rating_columns = rating_columns or SRS_RATING_COLUMNS
+        self.n_bins = n_bins
+        self.games = games[
+            games['result'].notnull() &
+            games['season'].isin(ratings['season'].unique())
+        ]
+        self.ratings = ratings
+        self.accumulators = None
+        self.calibration_accumulators = None
+
+    def season_args(self):
+        ## arguments for each season's backtest ##
+        ratings = dict(tuple(self.ratings.groupby('season')))
+        return [
+            (season_games, ratings[season], self.rating_columns, self.n_bins)
+            for season, season_games in self.games.groupby('season')
+        ]
+
+    def run(self, processes=None):
+        '''
+        Backtests every season. If processes is greater than 1, seasons are
+        distributed across a process pool
+        '''
+        args = self.season_args()
+        if processes is not None and processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                seasons = list(pool.map(backtest_season, *zip(*args)))
+        else:
+            seasons = [backtest_season(*a) for a in args]
+        self.accumulators = pd.concat([s[0] for s in seasons]).reset_index(drop=True)
+        self.calibration_accumulators = pd.concat([s[1] for s in seasons]).reset_index(drop=True)
+        return self.report()
+
+    def report(self, by=['season', 'week', 'rating']):
+        '''
+        Returns RMSE, ATS, and probability metrics for each group
+        '''
+        sums = self.accumulators.groupby(by)[ACCUMULATORS].sum().reset_index()
+        games = sums['games']
+        return pd.DataFrame({
+            **{column : sums[column] for column in by},
+            'games' : games.astype(int),
+            'rmse' : (sums['sse'] / games) ** (1/2),
+            'ats_games' : sums['ats_games'].astype(int),
+            'ats_accuracy' : sums['ats_wins'] / sums['ats_games'].where(sums['ats_games'] > 0),
+            'brier' : sums['brier'] / games,
+            'log_loss' : sums['log_loss'] / games,
+            'mean_prob' : sums['prob'] / games,
+            'win_rate' : sums['wins'] / games
+        })
+
+    def calibration(self, by=['rating']):
+        '''
+        Returns the mean predicted probability and the realized win rate of
+        each probability bin
+        '''
+        sums = self.calibration_accumulators.groupby(
+            by + ['bin']
+        )[CALIBRATION_ACCUMULATORS].sum().reset_index()
+        return pd.DataFrame({
+            **{column : sums[column] for column in by + ['bin']},
+            'bin_low' : sums['bin'] / self.n_bins,
+            'bin_high' : (sums['bin'] + 1) / self.n_bins,
+            'games' : sums['games'].astype(int),
+            'mean_prob' : sums['prob'] / sums['games'],
+            'win_rate' : sums['wins'] / sums['games']
+        })
+
+    def save(self, package_dir=None):
+        '''
+        Writes the season, week, rating report and the calibration table
+        '''
+        package_dir = package_dir or get_package_dir()
+        utils.to_csv_atomic(self.report(), '{0}/srs_backtest.csv'.format(package_dir))
+        utils.to_csv_atomic(self.calibration(), '{0}/srs_backtest_calibration.csv'.format(package_dir))
@@ -0,0 +1 @@
+from .Backtest import Backtest
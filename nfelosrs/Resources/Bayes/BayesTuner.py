@@ -0,0 +1,186 @@
+import pandas as pd
+import numpy
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from ... import Utilities as utils
+from ..PIT.QBSeason import QBSeason
+
+## hyperparameters tuned, as named in distributions.json ##
+TUNED_PARAMS = ['rankings', 'margins', 'process_noise']
+
+
+def replay_season(home, away, result, hfa, home_qb_adj, away_qb_adj,
+                  prior_means, rankings, margins, process_noise):
+    '''
+    Replays a season's bayesian updates for every hyperparameter setting at once.
+    State is held as (params, teams) arrays so each game is a handful of vector
+    operations across the parameter axis. The update mirrors
+    BayesianRankings.likelihood exactly, including its use of the home prior
+    variance in the away mean's numerator
+
+    Parameters:
+        home, away: team index of each played game, in file order
+        result: home margin of each game
+        hfa: modeled hfa of each game
+        home_qb_adj, away_qb_adj: qb adjustment of each team in each game
+        prior_means: (teams,) preseason wt_ratings
+        rankings, margins, process_noise: (params,) hyperparameter values
+
+    Returns:
+        dict with the (params,) sum of squared pre game errors and the (params, teams)
+        posterior means and stdevs at the end of the season
+    '''
+    n_params = len(rankings)
+    means = numpy.tile(prior_means, (n_params, 1))
+    variances = numpy.tile((rankings ** 2)[:, None], (1, len(prior_means)))
+    margin_var = margins ** 2
+    noise_var = process_noise ** 2
+    sse = numpy.zeros(n_params)
+    for h, a, r, f, hq, aq in zip(home, away, result, hfa, home_qb_adj, away_qb_adj):
+        home_mean = means[:, h]
+        away_mean = means[:, a]
+        home_var = variances[:, h] + noise_var
+        away_var = variances[:, a] + noise_var
+        ## score the pre game expectation ##
+        sse += (r - (home_mean + hq - away_mean - aq + f)) ** 2
+        ## team, QB, and HFA adjusted results ##
+        home_result = r + (away_mean + aq) - hq - f
+        away_result = -r + (home_mean + hq) - aq + f
+        ## update ##
+        means[:, h] = (
+            (home_mean / home_var + home_result / margin_var) /
+            (1 / home_var + 1 / margin_var)
+        )
+        means[:, a] = (
+            (away_mean / home_var + away_result / margin_var) /
+            (1 / away_var + 1 / margin_var)
+        )
+        variances[:, h] = 1 / (1 / home_var + 1 / margin_var)
+        variances[:, a] = 1 / (1 / away_var + 1 / margin_var)
+    return {
+        'sse' : sse,
+        'n' : len(result),
+        'means' : means,
+        'stdevs' : numpy.sqrt(variances)
+    }
+
+
+class BayesTuner():
+    '''
+    Empirical bayes tuning of the BayesianRankings hyperparameters (the preseason
+    ranking stdev, the single game margin stdev, and weekly process noise)
+    against the RMSE of each game's pre game expectation
+
+    Each season is replayed once for the whole grid, and seasons can be spread
+    across a process pool
+    '''
+
+    def __init__(self, games, qbs, wt_ratings, grid, seasons=None):
+        self.grid = self.build_grid(grid)
+        self.wt_ratings = wt_ratings
+        ## played games with known priors only ##
+        self.games = games[
+            (~pd.isnull(games['result'])) &
+            (games['season'].isin(wt_ratings['season'].unique()))
+        ]
+        self.qbs = qbs
+        self.seasons = sorted(
+            seasons if seasons is not None else self.games['season'].unique().tolist()
+        )
+        self.scores = None
+
+    def build_grid(self, grid):
+        '''
+        Returns the grid as a frame of TUNED_PARAMS. A dict of value lists is
+        expanded to its full product, and process_noise defaults to 0
+        '''
+        if isinstance(grid, dict):
+            values = [numpy.atleast_1d(grid.get(param, [0])) for param in TUNED_PARAMS]
+            mesh = numpy.meshgrid(*values, indexing='ij')
+            grid = pd.DataFrame({
+                param : m.ravel() for param, m in zip(TUNED_PARAMS, mesh)
+            })
+        grid = grid.copy()
+        if 'process_noise' not in grid.columns:
+            grid['process_noise'] = 0.0
+        return grid[TUNED_PARAMS].astype(numpy.float64).reset_index(drop=True)
+
+    def season_args(self, season):
+        '''
+        Flattens a season into the arrays replay_season expects
+        '''
+        games = self.games[self.games['season'] == season]
+        priors = self.wt_ratings[self.wt_ratings['season'] == season]
+        ## state arrays are in team id order ##
+        team_index = utils.TeamIndex(priors['team'])
+        prior_means = numpy.zeros(len(team_index))
+        prior_means[team_index.encode(priors['team'])] = priors['wt_rating'].values
+        ## qb adjustments as of the week each game was played ##
+        qb_season = QBSeason(self.qbs, season)
+        has_pair = qb_season.row_pair >= 0
+        adjs = numpy.full(len(qb_season.flat), numpy.nan)
+        adjs[has_pair] = qb_season.pair_adjs[
+            qb_season.row_week[has_pair], qb_season.row_pair[has_pair]
+        ]
+        adj_map = pd.Series(
+            adjs, index=pd.MultiIndex.from_arrays([qb_season.flat['game_id'], qb_season.flat['team']])
+        )
+        adj_map = adj_map[~adj_map.index.duplicated()]
+        home_qb_adj = adj_map.reindex(
+            pd.MultiIndex.from_arrays([games['game_id'], games['home_team']])
+        ).fillna(0).values
+        away_qb_adj = adj_map.reindex(
+            pd.MultiIndex.from_arrays([games['game_id'], games['away_team']])
+        ).fillna(0).values
+        return (
+            team_index.encode(games['home_team']),
+            team_index.encode(games['away_team']),
+            games['result'].values.astype(numpy.float64),
+            games['modeled_hfa'].values.astype(numpy.float64),
+            home_qb_adj, away_qb_adj,
+            prior_means,
+            self.grid['rankings'].values,
+            self.grid['margins'].values,
+            self.grid['process_noise'].values
+        )
+
+    def run(self, processes=None):
+        '''
+        Replays every season for the full grid and scores each setting
+        '''
+        args = [self.season_args(season) for season in self.seasons]
+        if processes is not None and processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                replays = list(pool.map(replay_season, *zip(*args)))
+        else:
+            replays = [replay_season(*a) for a in args]
+        ## reduce ##
+        sse = sum(r['sse'] for r in replays)
+        n = sum(r['n'] for r in replays)
+        self.scores = self.grid.copy()
+        self.scores['games'] = n
+        self.scores['rmse'] = numpy.sqrt(sse / n) if n > 0 else numpy.nan
+        self.scores = self.scores.sort_values(
+            by=['rmse'], kind='mergesort'
+        ).reset_index(drop=True)
+        return self.scores
+
+    def best(self):
+        '''
+        Returns the best scoring setting as a dict
+        '''
+        return {
+            k : float(v) for k, v in self.scores.iloc[0][TUNED_PARAMS].items()
+        }
+
+    def write_best(self):
+        '''
+        Writes the best setting to distributions.json, keeping any other
+        values (ie bootstrap intervals) already in the file
+        '''
+        distros = utils.load_distributions()
+        distros.update(self.best())
+        with open(utils.get_distributions_path(), 'w') as fp:
+            json.dump(distros, fp, indent=2)
+        return distros
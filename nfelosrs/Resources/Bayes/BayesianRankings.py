@@ -1,9 +1,10 @@
 import pandas as pd
 import numpy
 import pathlib
-import json
 from scipy.stats import invgamma
 
+from ... import Utilities as utils
+
 class BayesianRankings:
     '''
     Creates a DF of rankings by week to use as priors for SRS
@@ -18,6 +19,8 @@ class BayesianRankings:
         self.week = week
         self.package_dir = pathlib.Path(__file__).parent.parent.parent.parent.resolve()
         self.distributions = self.load_distributions()
+        ## weekly variance added to each team's prior before a game ##
+        self.process_noise = self.distributions.get('process_noise', 0)
         ## structure for bayesian updated ##
         self.current = self.initialize_rankings()
         self.weekly = []
@@ -36,13 +39,10 @@ class BayesianRankings:
 
     def load_distributions(self):
         '''
-        Loads the observed stanrdard deviations for rankigns and results
+        Loads the observed stanrdard deviations for rankigns and results.
+        The file is read once and shared across instances until it changes
         '''
-        with open(
-            '{0}/nfelosrs/Resources/Bayes/distributions.json'.format(self.package_dir),
-            'r'
-        ) as fp:
-            return json.load(fp)
+        return utils.load_distributions()
         
     def initialize_rankings(self):
         '''
@@ -93,31 +93,34 @@ class BayesianRankings:
             ## adjust for HFA ##
             -1 * row['modeled_hfa']
         )
+        ## prior variances, widened by process noise for the week ##
+        home_var = home_priors['ranking_stdev']**2 + self.process_noise**2
+        away_var = away_priors['ranking_stdev']**2 + self.process_noise**2
         ## calcualte new mean and stdev from results ##
         updated_home_mean = (
             (
-                home_priors['ranking_mean'] / home_priors['ranking_stdev']**2 +
+                home_priors['ranking_mean'] / home_var +
                 home_result / self.distributions['margins']**2
             ) / (
-                1 / home_priors['ranking_stdev']**2 +
+                1 / home_var +
                 1 / self.distributions['margins']**2
             )
         )
         updated_home_st_dev = numpy.sqrt(
-            1 / (1 / home_priors['ranking_stdev']**2 +
+            1 / (1 / home_var +
             1 / self.distributions['margins']**2)
         )
         updated_away_mean = (
             (
-                away_priors['ranking_mean'] / home_priors['ranking_stdev']**2 +
+                away_priors['ranking_mean'] / home_var +
                 away_result / self.distributions['margins']**2
             ) / (
-                1 / away_priors['ranking_stdev']**2 +
+                1 / away_var +
                 1 / self.distributions['margins']**2
             )
         )
         updated_away_st_dev = numpy.sqrt(
-            1 / (1 / away_priors['ranking_stdev']**2 +
+            1 / (1 / away_var +
             1 / self.distributions['margins']**2)
         )
         ## return updated priors ##
@@ -130,48 +133,166 @@ class BayesianRankings:
         for index, row in self.games[
             self.games['week'] <= self.week
         ].iterrows():
-            ## create a structure for the output for the home and away teams ##
-            home_rec = {
-                'game_id' : row['game_id'],
-                'season' : row['season'],
-                'week' : row['week'],
-                'opponent' : row['away_team'],
-                'result' : row['result'],
-                'bayesian_ranking_pre' : self.current[row['home_team']]['ranking_mean'],
-                'bayesian_stdev_pre' : self.current[row['home_team']]['ranking_stdev'],
-                'qb_adj' : row['home_qb_adj']
-            }
-            away_rec = {
-                'game_id' : row['game_id'],
-                'season' : row['season'],
-                'week' : row['week'],
-                'opponent' : row['home_team'],
-                'result' : -1 * row['result'],
-                'bayesian_ranking_pre' : self.current[row['away_team']]['ranking_mean'],
-                'bayesian_stdev_pre' : self.current[row['away_team']]['ranking_stdev'],
-                'qb_adj' : row['away_qb_adj']
-            }
-            ## update the model ##
-            updated_home_mean, updated_home_st_dev, updated_away_mean, updated_away_st_dev = self.likelihood(
-                row
+            self.update_game(row)
+
+    def update_game(self, row):
+        '''
+        Updates the priors of a game's teams with its result and records
+        the pre and post values
+        '''
+        ## create a structure for the output for the home and away teams ##
+        home_rec = {
+            'game_id' : row['game_id'],
+            'season' : row['season'],
+            'week' : row['week'],
+            'team' : row['home_team'],
+            'opponent' : row['away_team'],
+            'result' : row['result'],
+            'bayesian_ranking_pre' : self.current[row['home_team']]['ranking_mean'],
+            'bayesian_stdev_pre' : self.current[row['home_team']]['ranking_stdev'],
+            'qb_adj' : row['home_qb_adj']
+        }
+        away_rec = {
+            'game_id' : row['game_id'],
+            'season' : row['season'],
+            'week' : row['week'],
+            'team' : row['away_team'],
+            'opponent' : row['home_team'],
+            'result' : -1 * row['result'],
+            'bayesian_ranking_pre' : self.current[row['away_team']]['ranking_mean'],
+            'bayesian_stdev_pre' : self.current[row['away_team']]['ranking_stdev'],
+            'qb_adj' : row['away_qb_adj']
+        }
+        ## update the model ##
+        updated_home_mean, updated_home_st_dev, updated_away_mean, updated_away_st_dev = self.likelihood(
+            row
+        )
+        ## update the records ##
+        home_rec['bayesian_ranking_post'] = updated_home_mean
+        home_rec['bayesian_stdev_post'] = updated_home_st_dev
+        away_rec['bayesian_ranking_post'] = updated_away_mean
+        away_rec['bayesian_stdev_post'] = updated_away_st_dev
+        ## write records to weekly ##
+        self.weekly.append(home_rec)
+        self.weekly.append(away_rec)
+        ## update current ##
+        self.current[row['home_team']] = {
+            'ranking_mean' : updated_home_mean,
+            'ranking_stdev' : updated_home_st_dev
+        }
+        self.current[row['away_team']] = {
+            'ranking_mean' : updated_away_mean,
+            'ranking_stdev' : updated_away_st_dev
+        }
+
+    def smooth(self):
+        '''
+        Runs a Rauch-Tung-Striebel smoother back over the filter, giving each
+        team's rating after every game given all of the games played, and adds
+        bayesian_ranking_smoothed and bayesian_stdev_smoothed to the weekly
+        records
+
+        Each team's ranking is a random walk that gains process noise before
+        every game, so the filter's prediction for a game is the prior game's
+        posterior with its variance widened by process noise. The smoother
+        only needs the recorded posteriors, so the filter is not rerun. Records
+        are laid out as (teams, games) arrays and the backward pass steps
+        through game positions for every team at once, which is O(games)
+
+        Returns:
+            the weekly records as a frame, and sets smoothed_preseason to the
+            smoothed ranking of each team before its first game
+        '''
+        weekly = pd.DataFrame(self.weekly)
+        ## teams without a game keep their prior ##
+        self.smoothed_preseason = {
+            team : dict(prior) for team, prior in self.current.items()
+        }
+        if len(weekly) == 0:
+            return weekly
+        noise_var = self.process_noise**2
+        ## (team, game position) posteriors ##
+        team_codes, teams = pd.factorize(weekly['team'])
+        position = weekly.groupby('team').cumcount().values
+        n_games = numpy.bincount(team_codes)
+        means = numpy.full((len(teams), n_games.max()), numpy.nan)
+        variances = numpy.full((len(teams), n_games.max()), numpy.nan)
+        means[team_codes, position] = weekly['bayesian_ranking_post'].values
+        variances[team_codes, position] = weekly['bayesian_stdev_post'].values**2
+        smoothed_means = means.copy()
+        smoothed_variances = variances.copy()
+        ## backward pass. The last game's posterior is already smoothed ##
+        for k in range(means.shape[1] - 2, -1, -1):
+            has_next = n_games > k + 1
+            predicted_var = variances[has_next, k] + noise_var
+            gain = variances[has_next, k] / predicted_var
+            smoothed_means[has_next, k] = (
+                means[has_next, k] +
+                gain * (smoothed_means[has_next, k + 1] - means[has_next, k])
             )
-            ## update the records ##
-            home_rec['bayesian_ranking_post'] = updated_home_mean
-            home_rec['bayesian_stdev_post'] = updated_home_st_dev
-            away_rec['bayesian_ranking_post'] = updated_away_mean
-            away_rec['bayesian_stdev_post'] = updated_away_st_dev
-            ## write records to weekly ##
-            self.weekly.append(home_rec)
-            self.weekly.append(away_rec)
-            ## update current ##
-            self.current[row['home_team']] = {
-                'ranking_mean' : updated_home_mean,
-                'ranking_stdev' : updated_home_st_dev
-            }
-            self.current[row['away_team']] = {
-                'ranking_mean' : updated_away_mean,
-                'ranking_stdev' : updated_away_st_dev
+            smoothed_variances[has_next, k] = (
+                variances[has_next, k] +
+                gain**2 * (smoothed_variances[has_next, k + 1] - predicted_var)
+            )
+        weekly['bayesian_ranking_smoothed'] = smoothed_means[team_codes, position]
+        weekly['bayesian_stdev_smoothed'] = numpy.sqrt(smoothed_variances[team_codes, position])
+        for rec, mean, stdev in zip(
+            self.weekly, weekly['bayesian_ranking_smoothed'], weekly['bayesian_stdev_smoothed']
+        ):
+            rec['bayesian_ranking_smoothed'] = mean
+            rec['bayesian_stdev_smoothed'] = stdev
+        ## the preseason prior, one step back from the first game ##
+        first = weekly[position == 0]
+        prior_var = first['bayesian_stdev_pre'].values**2
+        gain = prior_var / (prior_var + noise_var)
+        preseason_means = (
+            first['bayesian_ranking_pre'].values +
+            gain * (first['bayesian_ranking_smoothed'].values - first['bayesian_ranking_pre'].values)
+        )
+        preseason_vars = (
+            prior_var +
+            gain**2 * (first['bayesian_stdev_smoothed'].values**2 - (prior_var + noise_var))
+        )
+        for team, mean, var in zip(first['team'], preseason_means, preseason_vars):
+            self.smoothed_preseason[team] = {
+                'ranking_mean' : mean,
+                'ranking_stdev' : numpy.sqrt(var)
             }
+        return weekly
+
+    def smoothed_by_week(self, weeks):
+        '''
+        Returns each team's smoothed ranking as of each week passed, which is
+        the smoothed posterior of its last game through the week, or its
+        smoothed preseason ranking before its first game
+        '''
+        weekly = self.smooth()
+        output = {}
+        for column, key in [
+            ('bayesian_ranking_smoothed', 'ranking_mean'),
+            ('bayesian_stdev_smoothed', 'ranking_stdev')
+        ]:
+            preseason = pd.Series({
+                team : prior[key] for team, prior in self.smoothed_preseason.items()
+            })
+            if len(weekly) > 0:
+                by_week = weekly.groupby(['week', 'team']).tail(1).pivot(
+                    index='week', columns='team', values=column
+                )
+            else:
+                by_week = pd.DataFrame(columns=preseason.index, dtype=float)
+            ## carry each team's last game forward through the weeks asked for ##
+            by_week = by_week.reindex(
+                sorted(set(by_week.index) | set(weeks))
+            ).ffill().reindex(weeks).reindex(columns=preseason.index)
+            output[column] = by_week.fillna(preseason).stack()
+        df = pd.DataFrame(output)
+        df.index.names = ['week', 'team']
+        df = df.reset_index()
+        df.insert(0, 'season', self.season)
+        return df.rename(columns={
+            'bayesian_ranking_smoothed' : 'bayesian_rating_smoothed'
+        })
 
     ## utility functions ##
     def return_updated_priors(self):
@@ -1,2 +1,3 @@
 from .update_distributions import update_distributions
-from .BayesianRankings import BayesianRankings
\ No newline at end of file
+from .BayesianRankings import BayesianRankings
+from .BayesTuner import BayesTuner
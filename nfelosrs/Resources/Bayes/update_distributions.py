@@ -1,21 +1,19 @@
-import pandas as pd
-import numpy
-import pathlib
 import json
 
+from ... import Utilities as utils
+from ..Features import FeatureCache
+
+## bootstrap intervals, keyed by the stdev they bound ##
+CI_KEYS = ['rankings_ci', 'margins_ci']
+
+
 def calc_margin_distributions(games):
     '''
     Determines the standard deviation of NFL game margins against
     spreads to estimate single game uncertainty
     '''
-    ## only played games ##
-    games = games[
-        ~pd.isnull(games['result'])
-    ].copy()
-    ## calc error ##
-    games['spread_error'] = games['result'] - games['spread_line']
     ## return std ##
-    return games['spread_error'].std()
+    return utils.calc_margin_errors(games)['spread_error'].std()
 
 
 def calc_ranking_distributions(qbs):
@@ -23,72 +21,42 @@ def calc_ranking_distributions(qbs):
     Determines the standard deviation of preseason rankings using 
     the qbelo to estiamte pre season ranking uncertainty
     '''
-    ## only take played games in teh same time period as the games file ##
-    qbs = qbs[
-        (qbs['season'] >= 1999) &
-        (~pd.isnull(qbs['score1']))
-    ].copy()
-    ## flatten teams by season ##
-    qbs = pd.concat([
-        qbs[[
-            'season', 'date', 'team1', 'qbelo1_pre',
-            'qbelo1_post', 'qb1_adj'
-        ]].rename(columns={
-            'team1' : 'team',
-            'qbelo1_pre' : 'qbelo_pre',
-            'qbelo1_post' : 'qbelo_post',
-            'qb1_adj' : 'qb_adj'
-        }),
-        qbs[[
-            'season', 'date', 'team2', 'qbelo2_pre',
-            'qbelo2_post', 'qb2_adj'
-        ]].rename(columns={
-            'team2' : 'team',
-            'qbelo2_pre' : 'qbelo_pre',
-            'qbelo2_post' : 'qbelo_post',
-            'qb2_adj' : 'qb_adj'
-        })
-    ])
-    ## chrono sort ##
-    qbs = qbs.sort_values(
-        by=['date', 'team'],
-        ascending=[True, True]
-    ).reset_index(drop=True)
-    ## since we are measuring ranking uncertainty for rankings set as points
-    ## against and average, we do not want to include QB variance and we need to rescale
-    ## the values and add back the QB adj ##
-    qbs['qbelo_pre'] = ((qbs['qbelo_pre'] + qbs['qb_adj']) - 1505) / 25
-    qbs['qbelo_post'] = ((qbs['qbelo_post'] + qbs['qb_adj']) - 1505) / 25
-    ## get the starting and ending values for the seaosn plus games played ##
-    seasons = qbs.groupby(['season', 'team']).agg(
-        gp = ('season', 'count'),
-        pre_season_rank=('qbelo_pre', lambda x: x.head(1)),
-        end_of_season_rank=('qbelo_post', lambda x: x.tail(1)),
-    ).reset_index(drop=True)
-    ## drop incomplete seasons ##
-    seasons = seasons[
-        seasons['gp']>14
-    ].copy()
     ## return the std of the delta between actual and expected ##
-    return (seasons['end_of_season_rank']-seasons['pre_season_rank']).std()
+    return utils.calc_ranking_deltas(qbs)['delta'].std()
 
 
 
-def update_distributions(games, qbs):
+def update_distributions(games, qbs, feature_cache=None, n_boot=0, seed=None):
     '''
-    Wrapper that updates the config file
+    Wrapper that updates the config file. Season level moments come from
+    the derived feature cache, so only seasons with changed inputs are recomputed.
+
+    If n_boot is above 0, bootstrap confidence intervals for each stdev are
+    written alongside the point estimates as [low, high]. They resample the raw
+    deltas and errors of the full history, so they are off by default, and
+    intervals from an earlier refresh are dropped rather than left stale.
+    Values this does not estimate (ie the process_noise written by
+    BayesTuner.write_best) are kept
     '''
     ## get values ##
-    rankings = calc_ranking_distributions(qbs)
-    margins = calc_margin_distributions(games)
-    ## create new dict ##
-    ## note numpy values need to be converted to python native ##
-    ## for json serialization, so use item() ##
-    distros = {
-        'rankings' : rankings.item(),
-        'margins' : margins.item()
+    if feature_cache is None:
+        feature_cache = FeatureCache(games, qbs)
+    distros = feature_cache.update().distributions()
+    ## bootstrap intervals need the raw deltas and errors ##
+    if n_boot > 0:
+        distros['rankings_ci'] = utils.bootstrap_std_ci(
+            utils.calc_ranking_deltas(qbs)['delta'].values,
+            n_boot=n_boot, seed=seed
+        )
+        distros['margins_ci'] = utils.bootstrap_std_ci(
+            utils.calc_margin_errors(games)['spread_error'].values,
+            n_boot=n_boot, seed=seed
+        )
+    ## merge into the existing file and write to package ##
+    existing = {
+        k : v for k, v in utils.load_distributions().items() if k not in CI_KEYS
     }
-    ## write to package ##
-    folder = pathlib.Path(__file__).parent.resolve()
-    with open('{0}/distributions.json'.format(folder), 'w') as fp:
+    distros = {**existing, **distros}
+    with open(utils.get_distributions_path(), 'w') as fp:
         json.dump(distros, fp, indent=2)
+    return distros
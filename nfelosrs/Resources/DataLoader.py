@@ -1,29 +1,36 @@
 import pandas as pd
 import numpy
 
-import nfelodcm as dcm
-
 from .. import Utilities as utils
-from ..Utilities import get_package_dir, TEAM_REPLACEMENTS
+from ..Utilities import get_package_dir, TeamIndex
+from .Features import FeatureCache
+from .DataSource import DcmSource
 
 
 class DataLoader():
     ## this class loads, formats, and merges, necessary data ##
-    def __init__(self):
+    ## upstream tables come from source, which defaults to nfelodcm ##
+    def __init__(self, source=None):
         ## package path ##
         self.package_dir = get_package_dir()
+        self.source = source if source is not None else DcmSource()
         ## states ##
-        self.current_season, self.current_week = dcm.get_season_state()
+        self.current_season, self.current_week = self.source.get_season_state()
         ## data frames ##
-        self.db = dcm.load(['games', 'qbelo'])
+        self.db = self.source.load(['games', 'qbelo'])
         self.wts = None ## win total lines ##
+        self.wt_quotes = None ## multi book win total quotes ##
         self.games = None ## fastr game file ##
         self.qbs = None ## nfeloqb file rankings ##
         self.wt_ratings = None ## win total ratings ##
         self.seasonal_srs = None ## season 
         self.weekly_srs = None ## where the weekly srs will be outputed ##
+        self.features = None ## cached season level aggregates ##
+        self.team_index = None ## integer team ids ##
         ## init ##
         self.load_dfs()
+        self.load_team_index()
+        self.load_features()
         self.compute_simple_hfa()
     
     def load_dfs(self):
@@ -33,13 +40,15 @@ class DataLoader():
             '{0}/nfelosrs/Manual Data/win_totals.csv'.format(self.package_dir),
             index_col=0
         )
-        self.wts['team'] = self.wts['team'].replace(TEAM_REPLACEMENTS)
+        self.wts['team'] = TeamIndex.canonical(self.wts['team'])
+        ## multi book quotes ##
+        self.wt_quotes = self.load_wt_quotes()
         ## games ##
         self.games = self.db['games'].copy()
         self.qbs = self.db['qbelo'].copy()
         ## repl qb names ##
-        self.qbs['team1'] = self.qbs['team1'].replace(TEAM_REPLACEMENTS)
-        self.qbs['team2'] = self.qbs['team2'].replace(TEAM_REPLACEMENTS)
+        self.qbs['team1'] = TeamIndex.canonical(self.qbs['team1'])
+        self.qbs['team2'] = TeamIndex.canonical(self.qbs['team2'])
         ## existing wts ##
         try:
             self.wt_ratings = pd.read_csv(
@@ -65,42 +74,85 @@ class DataLoader():
         except FileNotFoundError:
             pass
     
+    def load_team_index(self):
+        '''
+        Builds the team index once from every loaded table and adds id
+        columns to games and qbs for the models to index on
+        '''
+        self.team_index = TeamIndex.from_columns(
+            self.games['home_team'], self.games['away_team'],
+            self.qbs['team1'], self.qbs['team2'], self.wts['team'],
+            *([self.wt_ratings['team']] if self.wt_ratings is not None else [])
+        )
+        self.games = self.team_index.add_ids(self.games, ['home_team', 'away_team'])
+        self.qbs = self.team_index.add_ids(self.qbs, ['team1', 'team2'])
+
+    def load_wt_quotes(self):
+        '''
+        Loads the multi book, multi timestamp win total file column by column
+        and indexes it by (season, team, source, source_date)
+        '''
+        try:
+            quotes = pd.read_csv(
+                '{0}/nfelosrs/Manual Data/win_totals_full.csv'.format(self.package_dir),
+                usecols=[
+                    'season', 'team', 'line', 'over_odds',
+                    'under_odds', 'source', 'source_date'
+                ],
+                dtype={
+                    'season' : 'int16',
+                    'team' : 'str',
+                    'line' : 'float64',
+                    'over_odds' : 'float64',
+                    'under_odds' : 'float64',
+                    'source' : 'category'
+                }
+            )
+        except FileNotFoundError:
+            return None
+        quotes['team'] = TeamIndex.canonical(quotes['team']).astype('category')
+        quotes['source_date'] = pd.to_datetime(quotes['source_date'], utc=True, format='ISO8601')
+        return quotes.set_index(utils.WT_QUOTE_INDEX).sort_index()
+
+    def combine_wts(self, method='median'):
+        '''
+        Returns win totals for WTRatings where any team with multi book quotes
+        uses the consensus line in place of the single line file. Teams without
+        quotes keep their line from the file
+        '''
+        config = utils.load_config('config.json', ['wt_ratings'])
+        wts = utils.add_odds_and_line_adj(self.wts.copy(), config['over_prob_logit_coef'])
+        if self.wt_quotes is None or len(self.wt_quotes) == 0:
+            return wts
+        consensus = utils.calc_consensus_lines(
+            self.wt_quotes, config['over_prob_logit_coef'], method
+        )
+        consensus['source_date'] = consensus['source_date'].dt.strftime('%Y-%m-%dT%H:%M:%S.%f+00:00')
+        quoted = pd.MultiIndex.from_frame(wts[['season', 'team']]).isin(
+            pd.MultiIndex.from_frame(consensus[['season', 'team']])
+        )
+        return pd.concat([
+            wts[~quoted],
+            consensus.drop(columns=['n_sources', 'n_quotes'])
+        ]).sort_values(by=['season', 'team']).reset_index(drop=True)
+
+    def load_features(self):
+        '''
+        Loads the derived feature cache and recomputes any season whose
+        games or qbelo inputs changed since it was written
+        '''
+        self.features = FeatureCache(self.games, self.qbs)
+        self.features.update()
+
     def compute_simple_hfa(self):
         '''
-        Calculates a simple rolling homefield advantage expecation
+        Calculates a simple rolling homefield advantage expecation from the
+        cached average margin by season
         '''
-        ## average margin by season ##
-        seasonal_margin = self.games[
-            self.games['game_type'] == 'REG'
-        ].groupby(['season']).agg(
-            avg_margin = ('result', 'mean')
-        ).reset_index()
-        ## shift forward so no forward data is used ##
-        seasonal_margin['last_margin'] = seasonal_margin['avg_margin'].shift()
-        ## drop 2020 ##
-        seasonal_margin = seasonal_margin[
-            seasonal_margin['season']!=2020
-        ].copy()
-        ## calc a trailing rolling average ##
-        seasonal_margin['rolling_hfa'] = seasonal_margin['last_margin'].ewm(span=5).mean()
-        ## add 2020 ##
-        seasonal_margin = pd.concat([
-            seasonal_margin,
-            pd.DataFrame([{
-                'season' : 2020,
-                'avg_margin' : numpy.nan,
-                'last_margin' : numpy.nan,
-                'rolling_hfa' : 0,
-            }])
-        ])
         ## add to games ##
         self.games = pd.merge(
             self.games,
-            seasonal_margin[[
-                'season', 'rolling_hfa'
-            ]].rename(columns={
-                'rolling_hfa' : 'modeled_hfa'
-            }),
+            self.features.hfa(),
             on=['season'],
             how='left'
         )
@@ -0,0 +1,153 @@
+import pandas as pd
+import json
+import hashlib
+import pathlib
+import datetime
+from abc import ABC, abstractmethod
+
+import nfelodcm as dcm
+
+from ..Utilities import get_package_dir
+
+## bump if the snapshot layout changes ##
+SNAPSHOT_FORMAT = 1
+
+
+class DataSource(ABC):
+    '''
+    Interface for the upstream data the models consume. A source returns
+    tables by name (games, qbelo) and the current season state
+    '''
+    @abstractmethod
+    def load(self, tables):
+        ## returns a dict of table name -> DataFrame ##
+        pass
+
+    @abstractmethod
+    def get_season_state(self):
+        ## returns the (season, week) the data is current through ##
+        pass
+
+
+class DcmSource(DataSource):
+    '''
+    Live data from nfelodcm. This is the default source
+    '''
+    def load(self, tables):
+        return dcm.load(tables)
+
+    def get_season_state(self):
+        return dcm.get_season_state()
+
+
+class SnapshotSource(DataSource):
+    '''
+    Versioned, file backed snapshots of the upstream tables and season state,
+    so runs are reproducible and need no network
+
+    Snapshots live at <root>/<version>/ as one gzipped csv per table and a
+    manifest.json holding the season state, each table's dtypes, row count, and
+    a sha256 of its file. If no version is passed, the latest version is used
+    '''
+    def __init__(self, root=None, version=None):
+        self.root = pathlib.Path(root or '{0}/snapshots'.format(get_package_dir()))
+        self.version = version or self.latest_version()
+        self.path = self.root / self.version
+        with open(self.path / 'manifest.json', 'r') as fp:
+            self.manifest = json.load(fp)
+        if self.manifest['format'] != SNAPSHOT_FORMAT:
+            raise ValueError('Snapshot {0} has format {1}, expected {2}'.format(
+                self.version, self.manifest['format'], SNAPSHOT_FORMAT
+            ))
+
+    def latest_version(self):
+        ## versions sort lexically, ie dates or zero padded numbers ##
+        versions = sorted(
+            p.name for p in self.root.iterdir() if (p / 'manifest.json').exists()
+        ) if self.root.exists() else []
+        if len(versions) == 0:
+            raise FileNotFoundError('No snapshots found in {0}'.format(self.root))
+        return versions[-1]
+
+    def load(self, tables):
+        output = {}
+        for table in tables:
+            meta = self.manifest['tables'][table]
+            file = self.path / meta['file']
+            if hashlib.sha256(file.read_bytes()).hexdigest() != meta['sha256']:
+                raise ValueError('Snapshot file {0} does not match its manifest'.format(file))
+            df = pd.read_csv(
+                file,
+                dtype={c : d for c, d in meta['dtypes'].items() if d in ['object', 'str']},
+                float_precision='round_trip',
+                keep_default_na=False,
+                na_values=['']
+            )
+            ## restore non string dtypes ##
+            output[table] = df.astype({
+                c : d for c, d in meta['dtypes'].items() if d not in ['object', 'str']
+            })
+        return output
+
+    def get_season_state(self):
+        return self.manifest['season'], self.manifest['week']
+
+    @staticmethod
+    def write(source, root=None, version=None, tables=['games', 'qbelo']):
+        '''
+        Writes a snapshot of another source's tables and season state
+
+        Parameters:
+            source: DataSource to snapshot, ie DcmSource()
+            root: snapshot folder, defaults to <package>/snapshots
+            version: version name, defaults to the current UTC time
+            tables: tables to include
+
+        Returns:
+            the version written
+        '''
+        root = pathlib.Path(root or '{0}/snapshots'.format(get_package_dir()))
+        version = version or datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        path = root / version
+        path.mkdir(parents=True, exist_ok=False)
+        season, week = source.get_season_state()
+        manifest = {
+            'format' : SNAPSHOT_FORMAT,
+            'version' : version,
+            'season' : int(season),
+            'week' : int(week),
+            'tables' : {}
+        }
+        for table, df in source.load(tables).items():
+            file = '{0}.csv.gz'.format(table)
+            ## mtime=0 keeps the gzip bytes deterministic ##
+            df.to_csv(
+                path / file, index=False,
+                compression={'method' : 'gzip', 'mtime' : 0}
+            )
+            manifest['tables'][table] = {
+                'file' : file,
+                'rows' : len(df),
+                'dtypes' : {c : str(d) for c, d in df.dtypes.items()},
+                'sha256' : hashlib.sha256((path / file).read_bytes()).hexdigest()
+            }
+        with open(path / 'manifest.json', 'w') as fp:
+            json.dump(manifest, fp, indent=2)
+        return version
+
+
+class FrameSource(DataSource):
+    '''
+    In memory tables and season state, ie for tests or for snapshotting
+    frames that did not come from nfelodcm
+    '''
+    def __init__(self, tables, season, week):
+        self.tables = tables
+        self.season = season
+        self.week = week
+
+    def load(self, tables):
+        return {table : self.tables[table].copy() for table in tables}
+
+    def get_season_state(self):
+        return self.season, self.week
@@ -0,0 +1,207 @@
+import pandas as pd
+import numpy
+import json
+import hashlib
+
+from ... import Utilities as utils
+from ...Utilities import get_package_dir
+
+## columns whose content feeds the season level features ##
+GAMES_FEATURE_COLUMNS = ['game_id', 'game_type', 'week', 'result', 'spread_line']
+QBS_FEATURE_COLUMNS = [
+    'date', 'team1', 'team2', 'score1', 'qbelo1_pre', 'qbelo2_pre',
+    'qbelo1_post', 'qbelo2_post', 'qb1_adj', 'qb2_adj'
+]
+
+
+class FeatureCache():
+    '''
+    A cache of season level aggregates derived from the games and qbelo files
+
+    For each season the cache stores fingerprints of the season's inputs along with
+    the aggregates needed downstream -- average regular season margin (for the
+    simple HFA) and the moments of the margin and ranking distributions. On update,
+    only seasons whose fingerprints changed are recomputed. HFA and the pooled
+    distributions are then rebuilt from the stored aggregates, which is trivial.
+
+    The cache file is keyed by a hash of the input season range, so a new season
+    or a different slice of history is visible at a glance, but per season entries
+    are still reused across keys when their fingerprints match. A cache stored
+    under a different key is verified against the fingerprints before any of its
+    values are used
+    '''
+    def __init__(self, games, qbs=None, path=None):
+        self.path = path or '{0}/derived_features.json'.format(get_package_dir())
+        self.games = games
+        self.qbs = qbs
+        self.seasons = sorted(self.games['season'].unique().tolist())
+        self.key = self.calc_key()
+        self.stored_key = None
+        self.entries = self.load()
+        self.recomputed = []
+
+    def calc_key(self):
+        ## hash of the season range the cache was built from ##
+        seasons = ','.join(str(s) for s in self.seasons)
+        if self.qbs is not None:
+            seasons += '|' + ','.join(str(s) for s in sorted(self.qbs['season'].unique().tolist()))
+        return hashlib.sha1(seasons.encode()).hexdigest()[:16]
+
+    def load(self):
+        '''
+        Loads stored season entries
+        '''
+        try:
+            with open(self.path, 'r') as fp:
+                stored = json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        self.stored_key = stored.get('key')
+        return {int(k) : v for k, v in stored.get('seasons', {}).items()}
+
+    def save(self):
+        '''
+        Writes the cache
+        '''
+        with open(self.path, 'w') as fp:
+            json.dump({
+                'key' : self.key,
+                'seasons' : {str(k) : v for k, v in sorted(self.entries.items())}
+            }, fp, indent=2)
+
+    def fingerprints(self):
+        '''
+        Current fingerprints of each season's games and qb inputs
+        '''
+        prints = utils.calc_fingerprints(
+            self.games, GAMES_FEATURE_COLUMNS, ['season']
+        ).rename(columns={'fingerprint' : 'games'}).set_index('season')
+        if self.qbs is not None:
+            prints = prints.join(
+                utils.calc_fingerprints(
+                    self.qbs, QBS_FEATURE_COLUMNS, ['season']
+                ).rename(columns={'fingerprint' : 'qbs'}).set_index('season'),
+                how='outer'
+            )
+        return prints
+
+    def update(self, save=True):
+        '''
+        Recomputes aggregates for seasons whose inputs changed
+        '''
+        prints = self.fingerprints()
+        dirty = []
+        for season, row in prints.iterrows():
+            entry = self.entries.get(season, {})
+            if (
+                entry.get('games_fingerprint') != row.get('games') or
+                (self.qbs is not None and entry.get('qbs_fingerprint') != row.get('qbs'))
+            ):
+                dirty.append(season)
+        if len(dirty) > 0:
+            self.compute_seasons(dirty, prints)
+        self.recomputed = dirty
+        if save and (len(dirty) > 0 or self.stored_key != self.key):
+            self.save()
+        self.stored_key = self.key
+        return self
+
+    def compute_seasons(self, seasons, prints):
+        '''
+        Computes the aggregates for the passed seasons in one pass
+        '''
+        games = self.games[self.games['season'].isin(seasons)]
+        ## average regular season margin ##
+        avg_margin = games[
+            games['game_type'] == 'REG'
+        ].groupby(['season'])['result'].mean()
+        ## margin errors against the spread ##
+        errors = utils.calc_margin_errors(games)
+        margin_moments = utils.calc_moments(errors['spread_error'].values, errors['season'].values)
+        ## ranking deltas ##
+        ranking_moments = None
+        if self.qbs is not None:
+            deltas = utils.calc_ranking_deltas(self.qbs[self.qbs['season'].isin(seasons)])
+            ranking_moments = utils.calc_moments(deltas['delta'].values, deltas['season'].values)
+        for season in seasons:
+            entry = {
+                'games_fingerprint' : prints.loc[season].get('games'),
+                'avg_margin' : avg_margin.get(season, numpy.nan),
+            }
+            for prefix, moments in [('margin', margin_moments), ('ranking', ranking_moments)]:
+                if moments is None:
+                    continue
+                has_season = season in moments.index
+                entry['{0}_n'.format(prefix)] = int(moments.loc[season, 'n']) if has_season else 0
+                entry['{0}_mean'.format(prefix)] = float(moments.loc[season, 'mean']) if has_season else 0.0
+                entry['{0}_m2'.format(prefix)] = float(moments.loc[season, 'm2']) if has_season else 0.0
+            if self.qbs is not None:
+                entry['qbs_fingerprint'] = prints.loc[season].get('qbs')
+            ## json can not hold numpy types ##
+            entry = {
+                k : (v.item() if hasattr(v, 'item') else v)
+                for k, v in entry.items()
+            }
+            self.entries[season] = entry
+
+    def season_frame(self):
+        '''
+        Returns stored aggregates for the seasons in the inputs as a frame
+        '''
+        ## entries stored for another season range are checked first ##
+        if self.stored_key != self.key:
+            self.update()
+        return pd.DataFrame([
+            dict(season=season, **self.entries[season])
+            for season in self.seasons if season in self.entries
+        ])
+
+    def hfa(self):
+        '''
+        Returns the simple rolling HFA expectation by season. See
+        DataLoader.compute_simple_hfa
+        '''
+        ## average margin by season, regular season only. Seasons without a ##
+        ## result yet are kept, so the upcoming season gets the prior seasons' HFA ##
+        seasonal_margin = self.season_frame()[
+            ['season', 'avg_margin']
+        ].reset_index(drop=True)
+        ## shift forward so no forward data is used ##
+        seasonal_margin['last_margin'] = seasonal_margin['avg_margin'].shift()
+        ## drop 2020 ##
+        seasonal_margin = seasonal_margin[
+            seasonal_margin['season']!=2020
+        ].copy()
+        ## calc a trailing rolling average ##
+        seasonal_margin['rolling_hfa'] = seasonal_margin['last_margin'].ewm(span=5).mean()
+        ## add 2020 ##
+        seasonal_margin = pd.concat([
+            seasonal_margin,
+            pd.DataFrame([{
+                'season' : 2020,
+                'avg_margin' : numpy.nan,
+                'last_margin' : numpy.nan,
+                'rolling_hfa' : 0,
+            }])
+        ])
+        return seasonal_margin[[
+            'season', 'rolling_hfa'
+        ]].rename(columns={
+            'rolling_hfa' : 'modeled_hfa'
+        })
+
+    def distributions(self):
+        '''
+        Returns the ranking and margin stdevs pooled from the season aggregates
+        '''
+        seasons = self.season_frame()
+        output = {}
+        for prefix, key in [('ranking', 'rankings'), ('margin', 'margins')]:
+            if '{0}_n'.format(prefix) not in seasons.columns:
+                continue
+            output[key] = float(utils.pool_std(
+                seasons['{0}_n'.format(prefix)],
+                seasons['{0}_mean'.format(prefix)],
+                seasons['{0}_m2'.format(prefix)]
+            ))
+        return output
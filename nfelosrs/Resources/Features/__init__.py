@@ -0,0 +1 @@
+from .FeatureCache import FeatureCache
@@ -21,14 +21,19 @@ class GamesPit:
     To combat this, the wt_rankings are updated with a bayesian approach each week so that they
     stay as relevant as possible.
 
+    If week is passed, results are taken through that week rather than through
+    the last week of qb_adjs (see LiveSRS, which uses the current week's QB
+    adjustments with results through the prior week)
+
     '''
     
-    def __init__(self, games, qb_adjs):
+    def __init__(self, games, qb_adjs, week=None):
         self.games = games.copy()
         self.qb_adjs = qb_adjs
         ## infer season and week from where qb_adjs cuts off ##
         self.season = qb_adjs['season'].max()
-        self.week = qb_adjs['week'].max()
+        self.week = week if week is not None else qb_adjs['week'].max()
+        self.bayesian_rankings = None
         ## filter games to passed season ##
         self.games = self.games[self.games['season']==self.season].copy()
         ## add qbs to games ##
@@ -76,6 +81,7 @@ class GamesPit:
         ## init a rankigns obj ##
         br = BayesianRankings(self.games, self.season, self.week)
         br.update_priors()
+        self.bayesian_rankings = br
         return br.return_updated_priors(), br.return_updated_deviations(), br.return_wt_ratings()
     
     def construct_synthetic_results(self):
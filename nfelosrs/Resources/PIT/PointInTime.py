@@ -15,10 +15,16 @@ class PointInTime:
     This game file represents all info available through the week in question, and
     no information beyond it, so we can then use these game results to calcualte
     point in time, prior informed SRS rankings for each week
+
+    If a QBSeason for the season is passed, the week's QB adjustments are sliced
+    from it rather than recalculated with QBPit
     '''
 
-    def __init__(self, qb_df, games, season, week):
-        self.qb_pit = QBPit.QBPit(qb_df, games, season, week)
+    def __init__(self, qb_df, games, season, week, qb_season=None):
+        if qb_season is not None:
+            self.qb_pit = qb_season.snapshot(week)
+        else:
+            self.qb_pit = QBPit.QBPit(qb_df, games, season, week)
         self.games_pit = GamesPit.GamesPit(games, self.qb_pit.weekly_qb_adjustments)
         ## unpack some data for convenience in the SRS class
         self.games = self.games_pit.games
@@ -0,0 +1,170 @@
+import pandas as pd
+import numpy
+
+
+class QBSnapshot:
+    '''
+    A week's slice of a QBSeason. Exposes the same interface PointInTime uses
+    from QBPit (weekly_qb_adjustments and get_last_qb_adjs)
+    '''
+    def __init__(self, weekly_qb_adjustments, last_qb_adjs):
+        self.weekly_qb_adjustments = weekly_qb_adjustments
+        self.last_qb_adjs = last_qb_adjs
+
+    def get_last_qb_adjs(self):
+        '''
+        returns the most recent QB rating adjustment
+        '''
+        return self.last_qb_adjs
+
+
+class QBSeason:
+    '''
+    Season wide version of QBPit. Rather than refiltering and reflattening the QB
+    file for every week, the season is flattened once and every week's adjustments
+    are computed at once:
+
+    * Each (team, qb)'s latest value through each week comes from a running max of
+      the week index in which that pair last appeared
+    * The team max through each week is a reduction over the team's pairs
+    * The adjustment for every (week, pair) is then their difference
+
+    Any week's weekly_qb_adjustments and last adj map are slices of these arrays.
+    Logic matches QBPit, which remains the reference implementation
+    '''
+
+    def __init__(self, qb_df, season):
+        self.season = season
+        ## flatten once ##
+        self.flat = self.flatten_qbs(qb_df)
+        self.weeks = numpy.sort(self.flat['week'].unique())
+        ## structure ##
+        self.teams = None
+        self.pair_team = None
+        self.row_week = None
+        self.row_pair = None
+        self.row_team = None
+        ## (weeks, pairs) adjustments and (weeks, teams) last adjustments ##
+        self.pair_adjs = None
+        self.last_adjs = None
+        self.has_played = None
+        ## calculate ##
+        self.calc_adjs()
+
+    def flatten_qbs(self, qb_df):
+        '''
+        Flattens the season's qb games into team<>qb<>week records, sorted
+        as QBPit sorts them
+        '''
+        qb_df = qb_df[qb_df['season'] == self.season].rename(columns={
+            'team1' : 'home_team',
+            'team2' : 'away_team'
+        })
+        return pd.concat([
+            qb_df[[
+                'game_id', 'season', 'week', 'home_team',
+                'qb1', 'qb1_value_pre'
+            ]].rename(columns={
+                'home_team' : 'team',
+                'qb1' : 'qb',
+                'qb1_value_pre' : 'qb_value'
+            }),
+            qb_df[[
+                'game_id', 'season', 'week', 'away_team',
+                'qb2', 'qb2_value_pre'
+            ]].rename(columns={
+                'away_team' : 'team',
+                'qb2' : 'qb',
+                'qb2_value_pre' : 'qb_value'
+            }),
+        ]).sort_values(
+            by=['team', 'season', 'week'],
+            ascending=[True, True, True],
+            kind='mergesort'
+        ).reset_index(drop=True)
+
+    def calc_adjs(self):
+        '''
+        Calculates the adjustment for every (week, team, qb) at once
+        '''
+        n_weeks = len(self.weeks)
+        ## index rows by week, team, and (team, qb) pair. Pairs are ordered ##
+        ## by team so team reductions are contiguous ##
+        self.row_week = numpy.searchsorted(self.weeks, self.flat['week'].values)
+        team_codes, self.teams = pd.factorize(self.flat['team'], sort=True)
+        self.row_team = team_codes
+        has_qb = ~pd.isnull(self.flat['qb']).values
+        pair_keys = pd.MultiIndex.from_arrays([self.flat['team'], self.flat['qb']])
+        pair_codes, pairs = pd.factorize(pair_keys[has_qb], sort=True)
+        self.row_pair = numpy.full(len(self.flat), -1)
+        self.row_pair[has_qb] = pair_codes
+        n_pairs = len(pairs)
+        self.pair_team = self.teams.get_indexer(pairs.get_level_values(0))
+        ## (weeks, pairs) week index of each appearance, carried forward ##
+        appeared = numpy.full((n_weeks, n_pairs), -1)
+        appeared[self.row_week[has_qb], pair_codes] = self.row_week[has_qb]
+        last_seen = numpy.maximum.accumulate(appeared, axis=0)
+        ## value at each appearance, then the latest value through each week ##
+        values = numpy.full((n_weeks, n_pairs), numpy.nan)
+        values[self.row_week[has_qb], pair_codes] = self.flat['qb_value'].values[has_qb] / 25
+        latest = numpy.where(
+            last_seen >= 0,
+            values[numpy.maximum(last_seen, 0), numpy.arange(n_pairs)],
+            numpy.nan
+        )
+        ## team max through each week, ignoring qbs that have not played ##
+        team_starts = numpy.searchsorted(self.pair_team, numpy.arange(len(self.teams)))
+        team_max = numpy.full((n_weeks, len(self.teams)), numpy.nan)
+        if n_pairs > 0:
+            present = numpy.unique(self.pair_team)
+            team_max[:, present] = numpy.fmax.reduceat(latest, team_starts[present], axis=1)
+        self.pair_adjs = latest - team_max[:, self.pair_team]
+        ## (weeks, teams) adjustment of the qb in each team's most recent game ##
+        last_row = numpy.full((n_weeks, len(self.teams)), -1)
+        last_row[self.row_week, team_codes] = numpy.arange(len(self.flat))
+        last_row = numpy.maximum.accumulate(last_row, axis=0)
+        self.has_played = last_row >= 0
+        last_pair = self.row_pair[numpy.maximum(last_row, 0)]
+        self.last_adjs = numpy.where(
+            self.has_played & (last_pair >= 0),
+            self.pair_adjs[numpy.arange(n_weeks)[:, None], numpy.maximum(last_pair, 0)],
+            numpy.nan
+        )
+
+    def week_index(self, week):
+        ## index of the last week with qb data on or before the week passed ##
+        return numpy.searchsorted(self.weeks, week, side='right') - 1
+
+    def weekly_qb_adjustments(self, week):
+        '''
+        Returns the weekly adjustments as QBPit.weekly_qb_adjustments would
+        for a snapshot taken at the week passed
+        '''
+        i = self.week_index(week)
+        mask = self.row_week <= i
+        weekly = self.flat[mask].reset_index(drop=True)
+        pairs = self.row_pair[mask]
+        weekly['qb_adj'] = numpy.where(
+            pairs >= 0,
+            self.pair_adjs[max(i, 0), numpy.maximum(pairs, 0)] if i >= 0 else numpy.nan,
+            numpy.nan
+        )
+        return weekly
+
+    def get_last_qb_adjs(self, week):
+        '''
+        Returns the most recent QB rating adjustment for each team as of the week
+        '''
+        i = self.week_index(week)
+        if i < 0:
+            return {}
+        played = self.has_played[i]
+        ## tolist returns python floats, as QBPit's iterrows does, which keeps ##
+        ## downstream rounding identical ##
+        return dict(zip(self.teams[played].tolist(), self.last_adjs[i, played].tolist()))
+
+    def snapshot(self, week):
+        '''
+        Returns a QBPit-like snapshot for the week
+        '''
+        return QBSnapshot(self.weekly_qb_adjustments(week), self.get_last_qb_adjs(week))
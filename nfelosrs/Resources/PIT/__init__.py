@@ -1,3 +1,4 @@
 from .PointInTime import PointInTime
 from .QBPit import QBPit
-from .GamesPit import GamesPit
\ No newline at end of file
+from .GamesPit import GamesPit
+from .QBSeason import QBSeason
\ No newline at end of file
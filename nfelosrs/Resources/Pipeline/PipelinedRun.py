@@ -0,0 +1,186 @@
+import threading
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ... import Utilities as utils
+from ...Utilities import calc_rsq_by_week, calc_rmse_by_week, calc_sos_by_week
+from ..WT import WTRatings
+from ..SRS import SRSRunner
+
+## sentinel that tells the writer to stop ##
+_STOP = object()
+
+
+class BackgroundWriter():
+    '''
+    Writes outputs from a background thread. Write tasks pass through a bounded
+    queue, so producers block rather than buffer unbounded output. The first
+    error raised by a write is re-raised in the calling thread by the next put
+    or by close
+    '''
+    def __init__(self, max_queued=4):
+        self.tasks = queue.Queue(maxsize=max_queued)
+        self.error = None
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def work(self):
+        while True:
+            task = self.tasks.get()
+            if task is _STOP:
+                return
+            if self.error is not None:
+                ## after a failure, drain without writing ##
+                continue
+            try:
+                task[0](*task[1:])
+            except BaseException as e:
+                self.error = e
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def put(self, fn, *args):
+        '''
+        Queues a write
+        '''
+        self.raise_error()
+        self.tasks.put((fn,) + args)
+
+    def close(self):
+        '''
+        Waits for queued writes to finish and re-raises any error
+        '''
+        self.tasks.put(_STOP)
+        self.thread.join()
+        self.raise_error()
+
+
+class PipelinedRun():
+    '''
+    Pipelined version of nfelosrs.run. Output is identical to the sequential run,
+    but stages overlap:
+
+    * WTRatings.update runs on a background thread. SRS snapshots for seasons whose
+      win total ratings already exist, and which the update will not rewrite, start
+      right away. Later seasons wait for the update to finish
+    * SRS snapshots run on a small thread pool, with at most queue_size weeks in
+      flight, and are collected in week order
+    * Ratings are written from a background writer while RSQ and RMSE are calculated
+      concurrently (each on its own copy, as calc_rmse_by_week modifies its input)
+
+    Any error in a stage cancels outstanding work and is re-raised from run
+    '''
+    def __init__(self, data, wts, rebuild=False, diff_sample=0, workers=2, queue_size=8, bands=False, smoothed=False):
+        self.data = data
+        self.wts = wts
+        self.rebuild = rebuild
+        self.diff_sample = diff_sample
+        self.workers = workers
+        self.queue_size = queue_size
+        ## stages ##
+        self.wt_ratings = WTRatings(wts, data.games, data.wt_ratings, rebuild)
+        self.srs_runner = SRSRunner(
+            data.games, data.qbs,
+            data.current_season, data.current_week,
+            rebuild, diff_sample, bands, smoothed
+        )
+
+    def ready_seasons(self):
+        '''
+        Seasons whose SRS can run before the win total update finishes, ie
+        seasons already in wt_ratings that the update will not rewrite
+        '''
+        if self.rebuild or self.data.wt_ratings is None:
+            return set()
+        return set(
+            s for s in self.data.wt_ratings['season'].unique()
+            if s <= self.wt_ratings.wt_ratings_season
+        )
+
+    def calc_week(self, season, week, wt_future, ready):
+        ## waits on the wt update if the season depends on it ##
+        if season not in ready:
+            wt_future.result()
+        return self.srs_runner.calc_week(season, week)
+
+    def calc_weeks(self, pool, weeks_to_run, wt_future):
+        '''
+        Runs every week on the pool with a bounded number in flight and
+        returns the records in week order
+        '''
+        ready = self.ready_seasons()
+        in_flight = deque()
+        new_dfs = []
+        try:
+            for season, week in weeks_to_run:
+                if len(in_flight) >= self.queue_size:
+                    new_dfs.append(in_flight.popleft().result())
+                print('     On week {0}, {1}'.format(week, season))
+                in_flight.append(pool.submit(self.calc_week, season, week, wt_future, ready))
+            while len(in_flight) > 0:
+                new_dfs.append(in_flight.popleft().result())
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+        return new_dfs
+
+    def write_outputs(self, pool, writer, new_df, weeks_to_run):
+        '''
+        Writes the ratings in the background while the metrics are calculated
+        '''
+        package_dir = self.srs_runner.package_dir
+        ## the writer holds the only reference to new_df, metrics get copies ##
+        rsq_future = pool.submit(calc_rsq_by_week, new_df.copy())
+        rmse_future = pool.submit(calc_rmse_by_week, self.srs_runner.games, new_df.copy())
+        sos_future = pool.submit(calc_sos_by_week, self.srs_runner.games, new_df.copy())
+        writer.put(utils.to_csv_atomic, new_df, '{0}/srs_ratings.csv'.format(package_dir))
+        writer.put(self.srs_runner.save_fingerprints)
+        writer.put(self.srs_runner.save_cube, new_df, weeks_to_run)
+        if self.srs_runner.smoothed:
+            writer.put(self.srs_runner.save_smoothed, new_df, weeks_to_run)
+        writer.put(utils.to_csv_atomic, rsq_future.result(), '{0}/srs_rating_rsqs.csv'.format(package_dir))
+        writer.put(utils.to_csv_atomic, rmse_future.result(), '{0}/srs_rating_rmse.csv'.format(package_dir))
+        writer.put(utils.to_csv_atomic, sos_future.result(), '{0}/srs_sos.csv'.format(package_dir))
+
+    def run(self):
+        '''
+        Runs the pipeline
+        '''
+        writer = BackgroundWriter()
+        pool = ThreadPoolExecutor(max_workers=self.workers + 1)
+        error = None
+        try:
+            ## one thread for the wt update, the rest for srs ##
+            wt_future = pool.submit(self.wt_ratings.update)
+            weeks_to_run = self.srs_runner.prepare_run()
+            if len(weeks_to_run) > 0:
+                print('SRS Ratings are not up to date. Updating...')
+                new_dfs = self.calc_weeks(pool, weeks_to_run, wt_future)
+                if self.diff_sample > 0:
+                    self.srs_runner.check_against_reference(weeks_to_run, new_dfs)
+                self.write_outputs(
+                    pool, writer, self.srs_runner.combine_ratings(weeks_to_run, new_dfs),
+                    weeks_to_run
+                )
+            elif (
+                self.srs_runner.existing_fingerprints is None and
+                self.srs_runner.existing_ratings is not None
+            ):
+                writer.put(self.srs_runner.save_fingerprints)
+            ## surface any wt error even if no srs week needed it ##
+            wt_future.result()
+        except BaseException as e:
+            error = e
+        ## stop outstanding work, then let queued writes finish. The first ##
+        ## error, from any stage, is the one raised ##
+        pool.shutdown(wait=True, cancel_futures=True)
+        try:
+            writer.close()
+        except BaseException as e:
+            error = error or e
+        if error is not None:
+            raise error
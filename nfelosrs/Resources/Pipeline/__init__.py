@@ -0,0 +1 @@
+from .PipelinedRun import PipelinedRun, BackgroundWriter
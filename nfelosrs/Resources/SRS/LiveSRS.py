@@ -0,0 +1,186 @@
+import numpy
+
+from ...Utilities import index_teams
+from ..PIT import QBSeason
+from ..PIT.GamesPit import GamesPit
+from .SRS import SRS
+from .UpdatableSRS import UpdatableSRS
+
+
+class LiveSRS:
+    '''
+    Game level point in time SRS for a week in progress
+
+    PointInTime only knows whole weeks, so a week's early games can not be rated
+    without treating the whole week as played. LiveSRS starts from the state
+    before the week (bayesian rankings through the prior week, with the week's
+    QB adjustments) and applies final scores one game at a time:
+
+    * The game's teams get a bayesian update, exactly as BayesianRankings does
+    * The game's prior based result becomes its real result, and the prior based
+      results of the two teams' unplayed games move with their new rankings
+    * Only the SRS constants change, as every scheduled game is already in the
+      system, so UpdatableSRS re-solves without refactoring
+
+    Games are applied in kickoff order (gameday, gametime, then file order). If a
+    score arrives for a game that kicked off before one already applied, or a
+    final score is corrected, the week is replayed from the start in order. Once
+    every game is final, the ratings match the week's SRS if the games file is in
+    kickoff order, as BayesianRankings updates in file order
+    '''
+
+    def __init__(self, games, qbs, season, week, qb_season=None):
+        self.season = season
+        self.week = week
+        qb_season = qb_season if qb_season is not None else QBSeason(qbs, season)
+        self.qb_pit = qb_season.snapshot(week)
+        self.current_qb_adjs = self.qb_pit.get_last_qb_adjs()
+        ## games and rankings as of the end of the prior week ##
+        self.games_pit = GamesPit(games, self.qb_pit.weekly_qb_adjustments, week - 1)
+        self.bayesian_rankings = self.games_pit.bayesian_rankings
+        self.wt_ratings = self.games_pit.wt_ratings
+        self.baseline = {
+            team : dict(prior) for team, prior in self.bayesian_rankings.current.items()
+        }
+        self.baseline_records = len(self.bayesian_rankings.weekly)
+        ## flat game arrays ##
+        games = self.games_pit.games
+        self.rows = games.to_dict('records')
+        self.teams, self.home_index, self.away_index = index_teams(games)
+        self.is_reg = (games['game_type'] == 'REG').values
+        self.unplayed = (games['week'] > week - 1).values
+        self.hfa = games['modeled_hfa'].values
+        self.baseline_adjusted = SRS.calc_adjusted_results(games).values
+        ## the week's games in kickoff order ##
+        in_week = games[games['week'] == week]
+        order = in_week.sort_values(
+            by=['gameday', 'gametime'], kind='stable'
+        ).index.tolist()
+        self.game_position = {games.loc[i, 'game_id'] : games.index.get_loc(i) for i in order}
+        self.kickoff_order = {game_id : i for i, game_id in enumerate(self.game_position.keys())}
+        ## state ##
+        self.results = {}
+        self.applied = []
+        self.reset()
+
+    def reset(self):
+        '''
+        Returns to the state before any of the week's games were final
+        '''
+        self.bayesian_rankings.current = {
+            team : dict(prior) for team, prior in self.baseline.items()
+        }
+        del self.bayesian_rankings.weekly[self.baseline_records:]
+        self.unplayed_now = self.unplayed.copy()
+        self.adjusted = self.baseline_adjusted.copy()
+        self.system = UpdatableSRS(
+            self.teams,
+            self.home_index[self.is_reg],
+            self.away_index[self.is_reg],
+            self.adjusted[self.is_reg]
+        )
+        self.applied = []
+
+    def apply_result(self, game_id, result):
+        '''
+        Applies a final (or corrected) score for one of the week's games and
+        returns the updated records
+        '''
+        if game_id not in self.game_position:
+            raise ValueError('{0} is not a week {1} game'.format(game_id, self.week))
+        replay = (
+            game_id in self.results or
+            any(self.kickoff_order[g] > self.kickoff_order[game_id] for g in self.applied)
+        )
+        self.results[game_id] = result
+        if replay:
+            self.reset()
+            for g in sorted(self.results, key=self.kickoff_order.get):
+                self.advance(g)
+        else:
+            self.advance(game_id)
+        return self.records()
+
+    def advance(self, game_id):
+        '''
+        Moves the bayesian and SRS state forward by one final score
+        '''
+        i = self.game_position[game_id]
+        row = dict(self.rows[i], result=self.results[game_id])
+        self.bayesian_rankings.update_game(row)
+        self.unplayed_now[i] = False
+        self.applied.append(game_id)
+        ## games whose adjusted result moved ##
+        home, away = self.home_index[i], self.away_index[i]
+        affected = numpy.flatnonzero(
+            self.unplayed_now & (
+                (self.home_index == home) | (self.home_index == away) |
+                (self.away_index == home) | (self.away_index == away)
+            )
+        )
+        current = self.bayesian_rankings.current
+        new_adjusted = self.adjusted.copy()
+        new_adjusted[i] = (
+            self.results[game_id] - self.hfa[i] -
+            row['home_qb_adj'] + row['away_qb_adj']
+        )
+        for j in affected:
+            ## prior based result, as GamesPit constructs it ##
+            new_adjusted[j] = (
+                current[self.teams[self.home_index[j]]]['ranking_mean'] +
+                self.hfa[j] -
+                current[self.teams[self.away_index[j]]]['ranking_mean'] -
+                self.hfa[j] -
+                self.rows[j]['home_qb_adj'] +
+                self.rows[j]['away_qb_adj']
+            )
+        for j in numpy.append(affected, i):
+            if self.is_reg[j] and new_adjusted[j] != self.adjusted[j]:
+                self.system.change_result(
+                    self.teams[self.home_index[j]], self.teams[self.away_index[j]],
+                    self.adjusted[j], new_adjusted[j]
+                )
+        self.adjusted = new_adjusted
+
+    def pending(self):
+        '''
+        Returns the week's games without a final score, in kickoff order
+        '''
+        return [g for g in self.kickoff_order if g not in self.results]
+
+    def records(self):
+        '''
+        Returns the current ratings in the format of SRS records
+        '''
+        srs_ratings = self.system.ratings()
+        rankings = self.bayesian_rankings.return_updated_priors()
+        stdevs = self.bayesian_rankings.return_updated_deviations()
+        ## normalize to be on same scale as the bayesian ##
+        bayes = [rankings[team] for team in self.teams]
+        scaler = (
+            (max(max(bayes), 0) - min(min(bayes), 0)) /
+            (numpy.max(srs_ratings) - numpy.min(srs_ratings))
+        )
+        records = []
+        for team, rating in zip(self.teams, srs_ratings):
+            rating_norm = rating * scaler
+            qb_adj = self.current_qb_adjs.get(team, 0)
+            records.append({
+                'season' : self.season,
+                'week' : self.week,
+                'team' : team,
+                'games_final' : len(self.results),
+                ## ratings ##
+                'srs_rating' : round(rating,2),
+                'srs_rating_normalized' : round(rating_norm,2),
+                'bayesian_rating' : round(rankings[team],2),
+                'bayesian_stdev' : round(stdevs[team],2),
+                'pre_season_wt_rating' : round(self.wt_ratings[team],2),
+                ## qb adjusted ratings ##
+                'qb_adjustment' : round(qb_adj,2),
+                'srs_rating_w_qb_adj' : round(rating + qb_adj,2),
+                'srs_rating_normalized_w_qb_adj' : round(rating_norm + qb_adj,2),
+                'bayesian_rating_w_qb_adj' : round(rankings[team] + qb_adj,2),
+                'pre_season_wt_rating_w_qb_adj' : round(self.wt_ratings[team] + qb_adj,2),
+            })
+        return records
@@ -0,0 +1,227 @@
+import pandas as pd
+import numpy
+import json
+import os
+import pathlib
+import tempfile
+import time
+import uuid
+
+from ...Utilities import TeamIndex, get_package_dir
+
+## fields that index the cube rather than fill it ##
+INDEX_COLUMNS = ['season', 'week', 'team']
+## times open rereads the sidecar if its data file was replaced underneath it ##
+OPEN_ATTEMPTS = 5
+
+
+class RatingsCube():
+    '''
+    The ratings history as a dense float32 (season, week, team, metric) array on
+    disk, with a json sidecar holding the axes. Readers open the array read only
+    with numpy.memmap, so any number of processes share one page cached copy and
+    a season, week, team or metric slice is a view rather than a csv parse.
+    Slots without a rating (byes before a team's first game, weeks not yet
+    played, teams not in a season) are nan
+
+    Writes never change what a reader already has open:
+
+    * A full write goes to a new data file, then the sidecar pointing at it is
+      swapped into place with os.replace. The old data file is removed, which
+      leaves it readable to anyone who already mapped it. A reader that read
+      the old sidecar but had not yet mapped its data file rereads the sidecar
+      and maps the new file
+    * When every updated week is new and fits the existing axes (ie the next
+      week of the current season), its slots are written into the current data
+      file and flushed before the sidecar lists the week as rated. Readers only
+      see rated weeks, so a half written week is never read. Recomputed weeks,
+      new seasons and new teams take a full write
+    '''
+    def __init__(self, path=None, n_weeks=None):
+        self.path = path or '{0}/srs_ratings_cube.json'.format(get_package_dir())
+        ## week slots per season, at least the longest season rated ##
+        self.n_weeks = n_weeks
+        self.folder = pathlib.Path(self.path).parent
+        self.sidecar = None
+        self.values = None
+
+    def load_sidecar(self):
+        '''
+        Returns the current sidecar, or None if the cube has not been written
+        '''
+        try:
+            with open(self.path, 'r') as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return None
+
+    def open(self):
+        '''
+        Maps the cube read only and returns it
+        '''
+        for attempt in range(OPEN_ATTEMPTS):
+            self.sidecar = self.load_sidecar()
+            if self.sidecar is None:
+                raise FileNotFoundError('No ratings cube at {0}'.format(self.path))
+            try:
+                self.values = numpy.memmap(
+                    self.folder / self.sidecar['data'],
+                    dtype=self.sidecar['dtype'],
+                    mode='r',
+                    shape=tuple(self.sidecar['shape'])
+                )
+                break
+            except FileNotFoundError:
+                ## a full write removed the data file between reading the ##
+                ## sidecar and mapping it, so the sidecar has moved on ##
+                if attempt == OPEN_ATTEMPTS - 1:
+                    raise
+        self.season_index = {s : i for i, s in enumerate(self.sidecar['seasons'])}
+        self.week_index = {w : i for i, w in enumerate(self.sidecar['weeks'])}
+        self.team_index = TeamIndex(self.sidecar['teams'])
+        self.metric_index = {m : i for i, m in enumerate(self.sidecar['metrics'])}
+        self.rated = set(tuple(w) for w in self.sidecar['rated'])
+        return self
+
+    def slice(self, season, week=None, team=None, metric=None):
+        '''
+        Returns a view of the cube for a season, optionally narrowed to a week,
+        team and metric. Weeks that are not rated raise a KeyError
+        '''
+        if self.values is None:
+            self.open()
+        if week is not None and (season, week) not in self.rated:
+            raise KeyError('{0} week {1} is not rated'.format(season, week))
+        key = [self.season_index[season]]
+        for value, index in [
+            (week, self.week_index),
+            (team, self.team_index.team_to_id),
+            (metric, self.metric_index)
+        ]:
+            key.append(slice(None) if value is None else index[value])
+        return self.values[tuple(key)]
+
+    def frame(self, season, week):
+        '''
+        Returns a rated week as a frame in the layout of srs_ratings.csv
+        '''
+        values = self.slice(season, week)
+        df = pd.DataFrame(numpy.asarray(values, dtype=numpy.float64), columns=self.sidecar['metrics'])
+        df.insert(0, 'team', self.sidecar['teams'])
+        df.insert(0, 'week', week)
+        df.insert(0, 'season', season)
+        return df[~numpy.isnan(values).all(axis=1)].reset_index(drop=True)
+
+    def calc_axes(self, ratings):
+        '''
+        Axes of a cube holding the ratings. Every season gets as many week slots
+        as the longest season rated or n_weeks, so later weeks of the current
+        season can be written in place
+        '''
+        n_weeks = max(int(ratings['week'].max()), self.n_weeks or 0)
+        return {
+            'seasons' : sorted(int(s) for s in ratings['season'].unique()),
+            'weeks' : list(range(1, n_weeks + 1)),
+            'teams' : sorted(ratings['team'].unique().tolist()),
+            'metrics' : [
+                c for c in ratings.columns
+                if c not in INDEX_COLUMNS and pd.api.types.is_numeric_dtype(ratings[c])
+            ]
+        }
+
+    @staticmethod
+    def calc_positions(ratings, axes):
+        ## cube position of each rating row ##
+        return (
+            numpy.searchsorted(axes['seasons'], ratings['season'].values),
+            ratings['week'].values.astype(numpy.int64) - axes['weeks'][0],
+            TeamIndex(axes['teams']).encode(ratings['team'].values)
+        )
+
+    def fits(self, ratings, sidecar):
+        ## whether the ratings are all new weeks within the existing axes ##
+        if sidecar is None:
+            return False
+        rated = set(tuple(w) for w in sidecar['rated'])
+        return (
+            rated.isdisjoint(ratings[['season', 'week']].itertuples(index=False, name=None)) and
+            set(ratings['season'].unique()).issubset(sidecar['seasons']) and
+            set(ratings['week'].unique()).issubset(sidecar['weeks']) and
+            set(ratings['team'].unique()).issubset(sidecar['teams']) and
+            self.calc_axes(ratings)['metrics'] == sidecar['metrics']
+        )
+
+    def write_sidecar(self, sidecar):
+        ## swaps the sidecar into place atomically ##
+        sidecar['updated_at'] = time.time()
+        fd, tmp = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as fp:
+                json.dump(sidecar, fp, indent=2)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def write(self, ratings):
+        '''
+        Writes the full ratings history to a new data file and points the
+        sidecar at it
+        '''
+        previous = self.load_sidecar()
+        axes = self.calc_axes(ratings)
+        shape = (len(axes['seasons']), len(axes['weeks']), len(axes['teams']), len(axes['metrics']))
+        data = '{0}.{1}.f32'.format(pathlib.Path(self.path).stem, uuid.uuid4().hex[:12])
+        values = numpy.memmap(self.folder / data, dtype=numpy.float32, mode='w+', shape=shape)
+        values[:] = numpy.nan
+        seasons, weeks, teams = self.calc_positions(ratings, axes)
+        values[seasons, weeks, teams] = ratings[axes['metrics']].values.astype(numpy.float32)
+        values.flush()
+        del values
+        self.write_sidecar(dict(
+            axes,
+            version=1,
+            data=data,
+            dtype='float32',
+            shape=list(shape),
+            rated=sorted(ratings[['season', 'week']].drop_duplicates().values.tolist())
+        ))
+        ## readers that mapped the old file keep it until they close it, and ##
+        ## readers that only read the old sidecar reopen from the new one ##
+        if previous is not None and previous['data'] != data:
+            try:
+                os.remove(self.folder / previous['data'])
+            except OSError:
+                pass
+
+    def update(self, ratings, weeks=None):
+        '''
+        Brings the cube in line with the ratings. The weeks passed (or every
+        week if None) are written in place when they are new and fit the
+        existing axes, otherwise the cube is rewritten
+        '''
+        sidecar = self.load_sidecar()
+        if weeks is None:
+            updated = ratings
+        else:
+            keys = pd.MultiIndex.from_arrays([ratings['season'], ratings['week']])
+            updated = ratings[keys.isin([tuple(w) for w in weeks])]
+        if not self.fits(updated, sidecar):
+            self.write(ratings)
+            return
+        values = numpy.memmap(
+            self.folder / sidecar['data'],
+            dtype=sidecar['dtype'],
+            mode='r+',
+            shape=tuple(sidecar['shape'])
+        )
+        seasons, weeks_, teams = self.calc_positions(updated, sidecar)
+        values[seasons, weeks_, teams] = updated[sidecar['metrics']].values.astype(numpy.float32)
+        values.flush()
+        del values
+        rated = set(tuple(w) for w in sidecar['rated'])
+        rated.update(updated[['season', 'week']].drop_duplicates().itertuples(index=False, name=None))
+        sidecar['rated'] = sorted([int(s), int(w)] for s, w in rated)
+        self.write_sidecar(sidecar)
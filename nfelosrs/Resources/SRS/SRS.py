@@ -2,24 +2,38 @@ import pandas as pd
 import numpy
 
 from ..PIT import PointInTime
+from ...Utilities import (
+    assemble_srs, solve_srs_components, index_teams, calc_opponent_margins,
+    bootstrap_srs
+)
+
+## above this many teams, each connected component of the schedule is solved ##
+## sparsely rather than with a dense solve of the whole system ##
+DENSE_MAX_TEAMS = 64
+## bootstrap resamples and the percentile bands of srs_rating they give, ##
+## when bands are requested ##
+BOOTSTRAP_SAMPLES = 1000
+BOOTSTRAP_PERCENTILES = [5, 95]
 
 
 class SRS:
     '''
     A class for managing the calculation and return of a point in time
-    SRS
+    SRS. If bands is True, records also carry bootstrapped percentile bands
+    of srs_rating, which roughly doubles the cost of a snapshot
     '''
 
-    def __init__(self, games, qbs, season, week):
+    def __init__(self, games, qbs, season, week, qb_season=None, bands=False):
         ## data and meta ##
         self.season = season
         self.week = week
-        self.PointInTime = PointInTime(qbs.copy(), games.copy(), season, week)
+        self.bands = bands
+        self.PointInTime = PointInTime(qbs.copy(), games.copy(), season, week, qb_season)
         self.games = self.PointInTime.games
         self.avg_margins = self.calc_margins()
         ## set up some structure for the SRS ##
-        self.teams = self.games[['home_team', 'away_team']].stack().unique().tolist()
-        self.team_to_index = {team : i for i, team in enumerate(self.teams)}
+        self.teams, home_index, away_index = index_teams(self.games)
+        self.games = self.games.assign(home_index=home_index, away_index=away_index)
         self.coefficients = numpy.zeros((len(self.teams), len(self.teams)))
         self.constants = numpy.zeros(len(self.teams))
         self.records = []
@@ -38,17 +52,24 @@ class SRS:
             self.games['game_type'] == 'REG'
         ].copy()
         ## adjusted result ##
-        self.games['adjusted_result'] = (
+        self.games['adjusted_result'] = SRS.calc_adjusted_results(self.games)
+
+    @staticmethod
+    def calc_adjusted_results(games):
+        '''
+        Returns each game's result adjusted for HFA and QBs
+        '''
+        return (
             ## start with the home margin, which here uses
             ## real results and prior based results
-            self.games['results_with_rankings'] -
+            games['results_with_rankings'] -
             ## subtract homefield advantage ##
-            self.games['modeled_hfa'] -
+            games['modeled_hfa'] -
             ## subtract the home based QB adj, but add the
             ## the away adjustment since this result is
             ## with respect to the home team
-            self.games['home_qb_adj'] +
-            self.games['away_qb_adj']
+            games['home_qb_adj'] +
+            games['away_qb_adj']
         )
     
     def calc_margins(self):
@@ -79,21 +100,13 @@ class SRS:
             avg_mov = ('mov', 'mean')
         ).reset_index()
         ## calc opp margins, filtered for other teams only ##
-        avg_mov_against_records = []
-        for index, row in flat.iterrows():
-            ## filter flat for opp games where their opp
-            ## was not the team ##
-            flat_ = flat[
-                (flat['team'] == row['opponent']) &
-                (flat['opponent'] != row['team'])
-            ].copy()
-            if len(flat_) >= 0:
-                avg_mov_against_records.append({
-                    'team' : row['team'],
-                    'opp_avg_mov' : flat_['mov'].mean()
-                })
+        avg_mov_against = pd.DataFrame({
+            'team' : flat['team'].values,
+            'opp_avg_mov' : calc_opponent_margins(
+                flat['team'].values, flat['opponent'].values, flat['mov'].values
+            )
+        })
         ## merge ##
-        avg_mov_against = pd.DataFrame(avg_mov_against_records)
         avg_mov = pd.merge(
             avg_mov,
             avg_mov_against.groupby(['team']).agg(
@@ -112,49 +125,72 @@ class SRS:
         This is done with fully vectorized operations for speed. Refer to
         comments for whats going on
         '''
-        ## add indicies of the teams within the SRS structures as columns
-        ## in the games file
-        home_teams = self.games['home_team'].map(self.team_to_index).values
-        away_teams = self.games['away_team'].map(self.team_to_index).values
+        ## indicies of the teams within the SRS structures ##
+        home_teams = self.games['home_index'].values
+        away_teams = self.games['away_index'].values
         adjusted_results = self.games['adjusted_result'].values
-        ## populate the coefficients matrix using add.at ##
-        numpy.add.at(self.coefficients, (home_teams, home_teams), 1)
-        numpy.add.at(self.coefficients, (away_teams, away_teams), 1)
-        numpy.add.at(self.coefficients, (home_teams, away_teams), -1)
-        numpy.add.at(self.coefficients, (away_teams, home_teams), -1)
-        ## populate the constants
-        numpy.add.at(self.constants, home_teams, adjusted_results)
-        numpy.add.at(self.constants, away_teams, -1 * adjusted_results)
-        ## normailze the constants based on games played (ie avg margin) which 
-        ## are the units we want this expressed in ##
-        ## Initialize a game counts array to count the number of games each team plays ##
-        game_counts = numpy.zeros(len(self.teams))
-        numpy.add.at(game_counts, home_teams, 1)
-        numpy.add.at(game_counts, away_teams, 1)
-        ## normalize ##
-        ## constants ##
-        self.constants = self.constants / game_counts
-        ## coefs ##
-        for i in range(len(self.teams)):
-            self.coefficients[i, :] /= game_counts[i]
+        if len(self.teams) > DENSE_MAX_TEAMS:
+            ## large schedules are solved from the games directly ##
+            self.coefficients = None
+            self.constants = None
+            return
+        ## populate the coefficients matrix and constants with bincount, ##
+        ## normalized based on games played (ie avg margin) which are the ##
+        ## units we want this expressed in ##
+        self.coefficients, self.constants, _ = assemble_srs(
+            home_teams, away_teams, adjusted_results, len(self.teams)
+        )
     
+    @staticmethod
+    def band_columns():
+        '''
+        Returns the record columns of the srs_rating bands
+        '''
+        return ['srs_rating_p{0:02d}'.format(p) for p in BOOTSTRAP_PERCENTILES]
+
+    def calc_bands(self):
+        '''
+        Percentile bands of srs_rating from bootstrap resamples of the played
+        games, seeded by the week so reruns reproduce
+        '''
+        percentiles = bootstrap_srs(
+            self.games['home_index'].values,
+            self.games['away_index'].values,
+            self.games['adjusted_result'].values,
+            (self.games['week'] <= self.week).values,
+            len(self.teams),
+            n_boot=BOOTSTRAP_SAMPLES,
+            percentiles=BOOTSTRAP_PERCENTILES,
+            seed=self.season * 100 + self.week,
+            dense=len(self.teams) <= DENSE_MAX_TEAMS
+        )
+        return dict(zip(SRS.band_columns(), percentiles))
+
     def solve_srs(self):
         '''
         Solves the populated coefficient matrix and constants vector
         '''
         ## solve the system ##
-        try:
-            srs_ratings = numpy.linalg.solve(
-                self.coefficients,
-                self.constants
+        if self.coefficients is None:
+            srs_ratings, _ = solve_srs_components(
+                self.games['home_index'].values,
+                self.games['away_index'].values,
+                self.games['adjusted_result'].values,
+                len(self.teams)
             )
-        except Exception as e:
-            print('Linalg could not be solved. Will use least squares approx')
-            srs_ratings = numpy.linalg.lstsq(
-                self.coefficients,
-                self.constants,
-                rcond=None
-            )[0]
+        else:
+            try:
+                srs_ratings = numpy.linalg.solve(
+                    self.coefficients,
+                    self.constants
+                )
+            except Exception as e:
+                print('Linalg could not be solved. Will use least squares approx')
+                srs_ratings = numpy.linalg.lstsq(
+                    self.coefficients,
+                    self.constants,
+                    rcond=None
+                )[0]
         ## normalize around 0
         median_srs = numpy.median(srs_ratings)
         srs_ratings -= median_srs
@@ -170,8 +206,10 @@ class SRS:
             (numpy.max(srs_ratings) - numpy.min(srs_ratings))
         )
         srs_ratings_norm = srs_ratings * scaler
+        ## bootstrapped bands ##
+        bands = self.calc_bands() if self.bands else {}
         ## populate records ##
-        for team, rating, rating_norm in zip(self.teams, srs_ratings, srs_ratings_norm):
+        for i, (team, rating, rating_norm) in enumerate(zip(self.teams, srs_ratings, srs_ratings_norm)):
             self.records.append({
                 'season' : self.season,
                 'week' : self.week,
@@ -181,6 +219,7 @@ class SRS:
                 'avg_mov_of_opponents' : round(self.avg_margins[team]['avg_mov_of_opponents'] if team in self.avg_margins else numpy.nan, 2),
                 ## ratings ##
                 'srs_rating' : round(rating,2),
+                **{column : round(band[i],2) for column, band in bands.items()},
                 'srs_rating_normalized' : round(rating_norm,2),
                 'bayesian_rating' : round(self.PointInTime.current_bayesian_ratings[team],2),
                 'bayesian_stdev' : round(self.PointInTime.current_bayesian_stdevs[team],2),
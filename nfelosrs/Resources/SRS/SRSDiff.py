@@ -0,0 +1,159 @@
+import pandas as pd
+import numpy
+
+from ...Utilities import calc_rsq_by_week, calc_rmse_by_week, compare_frames
+from ..PIT import QBSeason
+from .SRS import SRS
+from .ReferenceSRS import ReferenceSRS
+
+## keys of each output ##
+RECORD_KEYS = ['season', 'week', 'team']
+RMSE_KEYS = ['week']
+RSQ_KEYS = ['gp']
+
+
+def reference_engine(games, qbs, season, week):
+    '''
+    The reference path -- the frozen original SRS, with QB adjustments
+    recalculated by QBPit
+    '''
+    return pd.DataFrame(ReferenceSRS(games, qbs, season, week).records)
+
+
+def srs_engine(games, qbs, season, week):
+    '''
+    The rewritten SRS, with QB adjustments recalculated by QBPit
+    '''
+    return pd.DataFrame(SRS(games, qbs, season, week).records)
+
+
+class QBSeasonEngine:
+    '''
+    The production path -- SRS with QB adjustments sliced from a QBSeason
+    built once per season
+    '''
+    def __init__(self):
+        self.qb_seasons = {}
+
+    def __call__(self, games, qbs, season, week):
+        if season not in self.qb_seasons:
+            self.qb_seasons[season] = QBSeason(qbs, season)
+        return pd.DataFrame(SRS(games, qbs, season, week, self.qb_seasons[season]).records)
+
+
+class SRSDiff:
+    '''
+    Differential testing of alternative SRS engines against the reference path
+
+    Each engine is a callable of (games, qbs, season, week) that returns the
+    week's records. Every engine is run on the same games and qbs for the weeks
+    passed, each output column is compared to the reference within tolerance, and
+    the first diverging (season, week, team) is reported. If metrics are requested,
+    the RMSE and RSQ calculated from each engine's combined records are compared as
+    well, over whichever weeks were run.
+
+    By default the rewritten SRS is run on its own and with QBSeason adjustments,
+    so a divergence points at either the SRS or the QB adjustments.
+
+    Records are rounded to two decimals, so the default tolerance only allows
+    float noise. Pass a larger atol to accept a rounding boundary flip
+    '''
+
+    def __init__(self, games, qbs, engines=None, atol=1e-9, rtol=0.0):
+        self.games = games
+        self.qbs = qbs
+        self.engines = engines if engines is not None else {
+            'srs' : srs_engine,
+            'qb_season' : QBSeasonEngine()
+        }
+        self.atol = atol
+        self.rtol = rtol
+        ## outputs ##
+        self.records = {}
+        self.report = None
+
+    @staticmethod
+    def sample_weeks(week_list, n, seed=None):
+        '''
+        Samples n [season, week] pairs from a week list, in order
+        '''
+        if n >= len(week_list):
+            return list(week_list)
+        rng = numpy.random.default_rng(seed)
+        index = numpy.sort(rng.choice(len(week_list), size=n, replace=False))
+        return [week_list[i] for i in index]
+
+    def run_engine(self, engine, weeks):
+        ## runs an engine for each week and combines the records ##
+        return pd.concat([
+            engine(self.games, self.qbs, season, week) for season, week in weeks
+        ]).reset_index(drop=True)
+
+    def compare_metrics(self, reference, candidate):
+        '''
+        Compares the RMSE and RSQ calculated from each set of records. Both
+        metrics modify their input, so each gets a copy
+        '''
+        divergence = compare_frames(
+            calc_rmse_by_week(self.games, reference.copy()),
+            calc_rmse_by_week(self.games, candidate.copy()),
+            RMSE_KEYS, self.atol, self.rtol
+        )
+        if divergence is not None:
+            return 'rmse', divergence
+        divergence = compare_frames(
+            calc_rsq_by_week(reference),
+            calc_rsq_by_week(candidate),
+            RSQ_KEYS, self.atol, self.rtol
+        )
+        if divergence is not None:
+            return 'rsq', divergence
+        return None, None
+
+    def run(self, weeks, reference=None, metrics=False):
+        '''
+        Runs the reference and every engine for the weeks passed
+
+        Parameters:
+            weeks: list of [season, week]
+            reference: optional precomputed reference records for the weeks
+            metrics: if True, also compare RMSE and RSQ
+
+        Returns:
+            DataFrame with one row per engine noting whether it matched and,
+            if not, the first divergence
+        '''
+        if reference is None:
+            reference = self.run_engine(reference_engine, weeks)
+        self.records['reference'] = reference
+        rows = []
+        for name, engine in self.engines.items():
+            candidate = self.run_engine(engine, weeks)
+            self.records[name] = candidate
+            output = 'records'
+            divergence = compare_frames(
+                reference, candidate, RECORD_KEYS, self.atol, self.rtol
+            )
+            if divergence is None and metrics:
+                output, divergence = self.compare_metrics(reference, candidate)
+            rows.append({
+                'engine' : name,
+                'weeks' : len(weeks),
+                'passed' : divergence is None,
+                'output' : output if divergence is not None else None,
+                'season' : (divergence or {}).get('season'),
+                'week' : (divergence or {}).get('week'),
+                'team' : (divergence or {}).get('team'),
+                'gp' : (divergence or {}).get('gp'),
+                'column' : (divergence or {}).get('column'),
+                'reference' : (divergence or {}).get('reference'),
+                'candidate' : (divergence or {}).get('candidate'),
+            })
+        self.report = pd.DataFrame(rows)
+        return self.report
+
+    def passed(self):
+        '''
+        True if every engine matched the reference
+        '''
+        return bool(self.report['passed'].all())
@@ -1,16 +1,41 @@
 import pandas as pd
 import numpy
 
-from ...Utilities import calc_rsq_by_week, calc_rmse_by_week, get_package_dir
+from ...Utilities import (
+    calc_rsq_by_week, calc_rmse_by_week, calc_sos_by_week, calc_fingerprints,
+    get_package_dir, to_csv_atomic
+)
+from ..PIT import QBSeason
+from ..PIT.GamesPit import GamesPit
 from .SRS import SRS
+from .SRSDiff import SRSDiff
+from .SRSVariants import SRSVariants
+from .RatingsCube import RatingsCube
 
+## game and qb fields that feed a week's SRS inputs ##
+GAMES_FINGERPRINT_COLUMNS = [
+    'game_id', 'game_type', 'gameday', 'home_team', 'away_team',
+    'result', 'modeled_hfa'
+]
+QBS_FINGERPRINT_COLUMNS = [
+    'game_id', 'team1', 'team2', 'qb1', 'qb2', 'qb1_value_pre', 'qb2_value_pre'
+]
 
 class SRSRunner:
     '''
     A wrapper for SRSs. Takes an existing SRS file, and the current season state
     to determine which weeks need to be updated.
+
+    Content fingerprints of each (season, week)'s game and QB rows are stored in
+    srs_fingerprints.csv next to the ratings. Weeks whose inputs changed since they
+    were rated (ie a score correction or QB change), and every later week of that
+    season, are recomputed along with any new weeks.
+
+    If bands is True, each week's ratings carry bootstrapped percentile bands of
+    srs_rating, and rated weeks without them are backfilled. If smoothed is True,
+    the smoothed bayesian rankings of every updated season are written as well.
     '''
-    def __init__(self, games, qbs, most_recent_season, most_recent_week, rebuild=False):
+    def __init__(self, games, qbs, most_recent_season, most_recent_week, rebuild=False, diff_sample=0, bands=False, smoothed=False):
         ## load data ##
         self.package_dir = get_package_dir()
         self.games = games
@@ -19,7 +44,25 @@ class SRSRunner:
         self.rebuild = rebuild
         self.most_recent_season = most_recent_season
         self.most_recent_week = most_recent_week
-        self.week_list = self.games[
+        self.week_list = self.calc_week_list()
+        self.existing_ratings, self.current_week_index = self.load_existing()
+        ## fingerprints of each week's inputs, now and when last rated ##
+        self.fingerprints = self.calc_week_fingerprints()
+        self.existing_fingerprints = self.load_existing_fingerprints()
+        ## season wide qb adjustments, built once per season ##
+        self.qb_seasons = {}
+        ## number of updated weeks to check against the reference path ##
+        self.diff_sample = diff_sample
+        ## bootstrapped bands on srs_rating ##
+        self.bands = bands
+        ## smoothed bayesian rankings, which rebuild each updated season ##
+        self.smoothed = smoothed
+
+    def calc_week_list(self):
+        '''
+        Returns the [season, week] pairs to rate
+        '''
+        return self.games[
             ## unique weeks after the first win totals are available
             ## but on or before the most recent full week of play
             (self.games['season'] >= 2003) &
@@ -35,12 +78,31 @@ class SRSRunner:
         ).reset_index(drop=True).groupby(['season', 'week']).head(1)[[
             'season', 'week'
         ]].values.tolist()
-        self.existing_ratings, self.current_week_index = self.load_existing()
+
+    def set_state(self, games, most_recent_season, most_recent_week, existing_ratings, existing_fingerprints):
+        '''
+        Points the runner at new games and season state with ratings and fingerprints
+        held in memory, rather than reloading them from disk (see RatingsService)
+        '''
+        self.games = games
+        self.most_recent_season = most_recent_season
+        self.most_recent_week = most_recent_week
+        self.week_list = self.calc_week_list()
+        self.existing_ratings = existing_ratings
+        mr_season = existing_ratings['season'].max()
+        mr_week = existing_ratings[existing_ratings['season']==mr_season]['week'].max()
+        self.current_week_index = self.week_list.index([mr_season, mr_week])
+        self.fingerprints = self.calc_week_fingerprints()
+        self.existing_fingerprints = existing_fingerprints
 
     def load_existing(self):
         '''
         Loads existing srs ratings and sets state
         '''
+        if self.rebuild:
+            ## a rebuild ignores existing ratings, which may not line up ##
+            ## with the week list of the data being run ##
+            return None, 0
         try:
             existing = pd.read_csv(
                 '{0}/srs_ratings.csv'.format(self.package_dir),
@@ -57,56 +119,307 @@ class SRSRunner:
             ## if no file exists, return none and start the index at 0
             return None, 0
     
-    def run(self):
+    def load_existing_fingerprints(self):
         '''
-        Determines what needs to be run and adds new data to storage
+        Loads the fingerprints of the inputs the existing ratings were built from
+        '''
+        if self.rebuild:
+            return None
+        try:
+            ## weeks without qb rows have an empty fingerprint, which reads as na ##
+            return pd.read_csv(
+                '{0}/srs_fingerprints.csv'.format(self.package_dir),
+                index_col=0,
+                dtype={'games_fingerprint' : 'str', 'qbs_fingerprint' : 'str'}
+            ).fillna({'games_fingerprint' : '', 'qbs_fingerprint' : ''})
+        except FileNotFoundError:
+            return None
+
+    def calc_week_fingerprints(self):
+        '''
+        Fingerprints each (season, week)'s game and qb rows
+        '''
+        fingerprints = pd.merge(
+            calc_fingerprints(
+                self.games, GAMES_FINGERPRINT_COLUMNS, ['season', 'week']
+            ).rename(columns={'fingerprint' : 'games_fingerprint'}),
+            calc_fingerprints(
+                self.qbs, QBS_FINGERPRINT_COLUMNS, ['season', 'week']
+            ).rename(columns={'fingerprint' : 'qbs_fingerprint'}),
+            on=['season', 'week'],
+            how='left'
+        )
+        fingerprints['qbs_fingerprint'] = fingerprints['qbs_fingerprint'].fillna('')
+        return fingerprints
+
+    def find_dirty_weeks(self):
+        '''
+        Returns the already rated weeks whose inputs changed, plus every later
+        week of the same season
+        '''
+        if self.existing_ratings is None or self.existing_fingerprints is None:
+            return []
+        rated = pd.DataFrame(
+            self.week_list[:self.current_week_index+1],
+            columns=['season', 'week']
+        )
+        compare = pd.merge(
+            pd.merge(rated, self.fingerprints, on=['season', 'week'], how='left'),
+            self.existing_fingerprints,
+            on=['season', 'week'],
+            how='left',
+            suffixes=('', '_existing')
+        )
+        changed = compare[
+            (compare['games_fingerprint'] != compare['games_fingerprint_existing']) |
+            (compare['qbs_fingerprint'] != compare['qbs_fingerprint_existing'])
+        ]
+        ## first changed week in each season ##
+        first_changed = changed.groupby('season')['week'].min().to_dict()
+        return [
+            [season, week] for season, week in rated.values.tolist()
+            if season in first_changed and week >= first_changed[season]
+        ]
+
+    def find_unbanded_weeks(self):
+        '''
+        Returns the already rated weeks without bootstrapped bands (ie rated
+        before the bands were added), so an incremental run with bands on
+        backfills them
+        '''
+        if not self.bands or self.existing_ratings is None:
+            return []
+        bands = SRS.band_columns()
+        missing = self.existing_ratings.reindex(columns=bands).isnull().any(axis=1)
+        unbanded = set(
+            self.existing_ratings[missing][['season', 'week']].itertuples(index=False, name=None)
+        )
+        return [
+            [season, week] for season, week in self.week_list[:self.current_week_index+1]
+            if (season, week) in unbanded
+        ]
+
+    def get_weeks_to_run(self):
+        '''
+        Returns the new weeks, and the dirty or unbanded weeks, in week list order
+        '''
+        new_weeks = self.week_list[self.current_week_index+1:]
+        stale = set(
+            tuple(w) for w in self.find_dirty_weeks() + self.find_unbanded_weeks()
+        )
+        return [
+            w for w in self.week_list[:self.current_week_index+1] if tuple(w) in stale
+        ] + new_weeks
+
+    def get_qb_season(self, season):
+        '''
+        Returns the season wide QB adjustments, building them on first use
+        '''
+        if season not in self.qb_seasons:
+            self.qb_seasons[season] = QBSeason(self.qbs, season)
+        return self.qb_seasons[season]
+
+    def check_against_reference(self, weeks, new_dfs):
+        '''
+        Recalculates a sample of the updated weeks with the reference path
+        and raises if any output diverges
+        '''
+        computed = {
+            (season, week) : df for (season, week), df in zip(weeks, new_dfs)
+        }
+        diff = SRSDiff(
+            self.games, self.qbs,
+            engines={'srs_runner' : lambda games, qbs, season, week: computed[(season, week)]}
+        )
+        report = diff.run(SRSDiff.sample_weeks(weeks, self.diff_sample))
+        if not diff.passed():
+            print(report.to_string())
+            raise ValueError('SRS ratings diverged from the reference implementation')
+        print('     {0} sampled weeks match the reference'.format(report['weeks'].iloc[0]))
+
+    def rated_fingerprints(self):
+        '''
+        Returns the fingerprints of the weeks the ratings now reflect
+        '''
+        rated = pd.DataFrame(self.week_list, columns=['season', 'week'])
+        return pd.merge(
+            rated, self.fingerprints, on=['season', 'week'], how='left'
+        )
+
+    def save_fingerprints(self):
+        '''
+        Saves the fingerprints of the weeks the ratings now reflect
+        '''
+        self.rated_fingerprints().to_csv(
+            '{0}/srs_fingerprints.csv'.format(self.package_dir)
+        )
+
+    def save_cube(self, ratings, weeks=None):
+        '''
+        Updates the memory mapped ratings cube, in place when only new weeks
+        of the current season landed
+        '''
+        RatingsCube(
+            '{0}/srs_ratings_cube.json'.format(self.package_dir),
+            n_weeks=int(self.games['week'].max())
+        ).update(ratings, weeks)
+
+    def calc_smoothed(self, season, weeks):
+        '''
+        Smoothed bayesian rankings for each week passed, given every game
+        through the last of them
+        '''
+        games_pit = GamesPit(
+            self.games,
+            self.get_qb_season(season).snapshot(max(weeks)).weekly_qb_adjustments
+        )
+        return games_pit.bayesian_rankings.smoothed_by_week(weeks)
+
+    def save_smoothed(self, ratings, weeks_to_run):
+        '''
+        Updates the smoothed bayesian rankings of every season with a week in
+        weeks_to_run. A new week changes the smoothed ranking of each earlier
+        week of its season, so the whole season is recomputed
+        '''
+        path = '{0}/srs_bayesian_smoothed.csv'.format(self.package_dir)
+        seasons = sorted(set(season for season, week in weeks_to_run))
+        existing = None
+        if not self.rebuild:
+            try:
+                existing = pd.read_csv(path, index_col=0)
+                existing = existing[~existing['season'].isin(seasons)]
+            except FileNotFoundError:
+                pass
+        smoothed = pd.concat([existing] + [
+            self.calc_smoothed(
+                season,
+                sorted(ratings[ratings['season'] == season]['week'].unique().tolist())
+            ) for season in seasons
+        ])
+        for column in ['bayesian_rating_smoothed', 'bayesian_stdev_smoothed']:
+            smoothed[column] = smoothed[column].round(2)
+        ## queued on the writer alongside the other atomic outputs ##
+        to_csv_atomic(
+            smoothed.sort_values(
+                by=['season', 'team', 'week'],
+                ascending=[True, True, True]
+            ).reset_index(drop=True),
+            path
+        )
+
+    def calc_week(self, season, week):
+        '''
+        Calculates a single week's SRS records
+        '''
+        srs_ = SRS(
+            self.games,
+            self.qbs,
+            season,
+            week,
+            self.get_qb_season(season),
+            self.bands
+        )
+        return pd.DataFrame(srs_.records)
+
+    def calc_variants(self, variants, weeks=None):
+        '''
+        Calculates each variant's SRS ratings side by side for the weeks passed,
+        or every week if none are
+        '''
+        weeks = weeks if weeks is not None else self.calc_week_list()
+        return pd.concat([
+            SRSVariants(
+                self.games,
+                self.qbs,
+                season,
+                week,
+                variants,
+                self.get_qb_season(season)
+            ).frame()
+            for season, week in weeks
+        ]).reset_index(drop=True)
+
+    def combine_ratings(self, weeks_to_run, new_dfs):
+        '''
+        Combines newly calculated weeks with the existing ratings, replacing
+        any weeks that were recomputed
+        '''
+        ## get a df of new data
+        new_df = pd.concat(new_dfs)
+        if self.existing_ratings is not None:
+            ## if existing data exists, replace any recomputed weeks and combine ##
+            rerun = pd.MultiIndex.from_tuples([tuple(w) for w in weeks_to_run])
+            existing_weeks = pd.MultiIndex.from_arrays([
+                self.existing_ratings['season'], self.existing_ratings['week']
+            ])
+            new_df = pd.concat([
+                self.existing_ratings[~existing_weeks.isin(rerun)],
+                new_df
+            ])
+        ## sort accordingly ##
+        return new_df.sort_values(
+            by=['season', 'team', 'week'],
+            ascending=[True, True, True]
+        ).reset_index(drop=True)
+
+    def prepare_run(self):
+        '''
+        Applies the rebuild flag and returns the weeks to run
         '''
         if self.rebuild:
             ## if we are rebuilding, force the index back to 0 ##
             self.current_week_index = 0
             self.existing_ratings = None
-        if self.current_week_index < len(self.week_list) -1:
+        return self.get_weeks_to_run()
+
+    def run(self):
+        '''
+        Determines what needs to be run and adds new data to storage
+        '''
+        weeks_to_run = self.prepare_run()
+        if len(weeks_to_run) > 0:
             print('SRS Ratings are not up to date. Updating...')
-            ## Only if the current week index is less than the index of the last week
-            ## do we have fresh weeks to pull
+            ## new weeks are those after the most recent week in the ratings, ##
+            ## dirty weeks are rated weeks whose inputs have changed ##
             ## storage for each run ##
             new_dfs = []
             ## run for each ##
-            for season_week_array in self.week_list[self.current_week_index+1:]:
+            for season_week_array in weeks_to_run:
                 print('     On week {0}, {1}'.format(
                     season_week_array[1],
                     season_week_array[0]
                 ))
-                srs_ = SRS(
-                    self.games,
-                    self.qbs,
-                    season_week_array[0],
-                    season_week_array[1]
-                )
-                new_dfs.append(pd.DataFrame(srs_.records))
+                new_dfs.append(self.calc_week(season_week_array[0], season_week_array[1]))
+            ## check sampled weeks against the reference before anything is written ##
+            if self.diff_sample > 0:
+                self.check_against_reference(weeks_to_run, new_dfs)
             ## combine and write to local as necessary ##
-            ## get a df of new data
-            new_df = pd.concat(new_dfs)
-            if self.existing_ratings is not None:
-                ## if existing data exists, combine
-                new_df = pd.concat([self.existing_ratings, new_df])
-            ## sort accordingly ##
-            new_df = new_df.sort_values(
-                by=['season', 'team', 'week'],
-                ascending=[True, True, True]
-            ).reset_index(drop=True)
+            new_df = self.combine_ratings(weeks_to_run, new_dfs)
             ## save ##
             new_df.to_csv(
                 '{0}/srs_ratings.csv'.format(self.package_dir)
             )
+            self.save_fingerprints()
+            self.save_cube(new_df, weeks_to_run)
+            if self.smoothed:
+                self.save_smoothed(new_df, weeks_to_run)
             ## calc rsq ##
             rsq = calc_rsq_by_week(new_df)
             ## save
             rsq.to_csv(
                 '{0}/srs_rating_rsqs.csv'.format(self.package_dir)
             )
-            ## calc rsme ##
-            rmse = calc_rmse_by_week(self.games, new_df)
+            ## calc rsme. calc_rmse shifts the weeks of the frame it is passed ##
+            rmse = calc_rmse_by_week(self.games, new_df.copy())
             rmse.to_csv(
                 '{0}/srs_rating_rmse.csv'.format(self.package_dir)
             )
+            ## calc past, remaining, and total sos ##
+            sos = calc_sos_by_week(self.games, new_df)
+            sos.to_csv(
+                '{0}/srs_sos.csv'.format(self.package_dir)
+            )
+        elif self.existing_fingerprints is None and self.existing_ratings is not None:
+            ## ratings are current but were written before fingerprints were ##
+            ## tracked, so record the inputs they reflect ##
+            self.save_fingerprints()
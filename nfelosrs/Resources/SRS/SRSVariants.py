@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy
+
+from ..PIT import PointInTime
+from ...Utilities import (
+    assemble_srs, assemble_srs_constants, solve_srs_components, index_teams
+)
+from .SRS import DENSE_MAX_TEAMS
+
+## a variant's settings. The defaults reproduce srs_rating ##
+## hfa: None uses modeled_hfa, otherwise a constant hfa for every game
+## qb_adj: adjust results for the QBs that played
+## margin_cap: cap on the absolute margin of played games, None for no cap
+## prior_weight: scale on the rating difference behind prior based results
+DEFAULT_VARIANT = {
+    'hfa' : None,
+    'qb_adj' : True,
+    'margin_cap' : None,
+    'prior_weight' : 1
+}
+
+
+class SRSVariants:
+    '''
+    Point in time SRS for many variants of the adjusted results at once
+
+    Variants that change only the results (HFA, QB adjustments, margin caps,
+    and the weight on GamesPit's prior based results) share the schedule, and
+    with it the coefficient matrix. The matrix is assembled once, each variant's
+    constants become a column of a (teams, variants) matrix, and every column is
+    solved against a single factorization, rather than a full SRS per variant.
+    Ratings are centered on the median as SRS does, and returned side by side
+    as srs_rating_{variant}
+
+    Variants are passed as a dict of name to settings, where any setting not
+    passed takes its DEFAULT_VARIANT value
+    '''
+
+    def __init__(self, games, qbs, season, week, variants=None, qb_season=None):
+        ## data and meta ##
+        self.season = season
+        self.week = week
+        self.variants = {
+            name : {**DEFAULT_VARIANT, **settings}
+            for name, settings in (variants or {'base' : {}}).items()
+        }
+        self.PointInTime = PointInTime(qbs.copy(), games.copy(), season, week, qb_season)
+        self.games = self.PointInTime.games
+        self.games = self.games[self.games['game_type'] == 'REG'].copy()
+        self.teams, self.home_index, self.away_index = index_teams(self.games)
+        self.records = []
+        ## actions ##
+        self.results = self.calc_variant_results()
+        self.ratings = self.solve_variants()
+        self.populate_records()
+
+    def calc_variant_results(self):
+        '''
+        Returns a (games, variants) array of each variant's adjusted results
+        '''
+        played = (self.games['week'] <= self.week).values
+        prior_difference = (
+            self.games['home_team_current_prior'] -
+            self.games['away_team_current_prior']
+        ).values
+        columns = []
+        for variant in self.variants.values():
+            hfa = (
+                self.games['modeled_hfa'].values if variant['hfa'] is None else
+                numpy.full(len(self.games), float(variant['hfa']))
+            )
+            margin = self.games['results_with_rankings'].values
+            if variant['margin_cap'] is not None:
+                margin = numpy.where(
+                    played,
+                    numpy.clip(margin, -variant['margin_cap'], variant['margin_cap']),
+                    margin
+                )
+            ## prior based results are rebuilt only when they change, so the ##
+            ## default variant matches SRS exactly ##
+            if variant['hfa'] is not None or variant['prior_weight'] != 1:
+                margin = numpy.where(
+                    played,
+                    margin,
+                    variant['prior_weight'] * prior_difference + hfa
+                )
+            ## adjusted in the order SRS.calc_adjusted_results uses ##
+            adjusted = margin - hfa
+            if variant['qb_adj']:
+                adjusted = (
+                    adjusted -
+                    self.games['home_qb_adj'].values +
+                    self.games['away_qb_adj'].values
+                )
+            columns.append(adjusted)
+        return numpy.stack(columns, axis=1)
+
+    def solve_variants(self):
+        '''
+        Solves every variant against one factorization of the shared schedule
+        '''
+        if len(self.teams) > DENSE_MAX_TEAMS:
+            ratings, _ = solve_srs_components(
+                self.home_index, self.away_index, self.results, len(self.teams)
+            )
+        else:
+            ## one assembly of the coefficients, then constants per variant ##
+            coefficients, _, game_counts = assemble_srs(
+                self.home_index, self.away_index, self.results[:, 0], len(self.teams)
+            )
+            constants = assemble_srs_constants(
+                self.home_index, self.away_index, self.results, game_counts
+            )
+            ## the system is singular, so 1 is added to every coefficient, ##
+            ## which gives each column's mean 0 solution ##
+            try:
+                ratings = numpy.linalg.solve(coefficients + 1, constants)
+            except numpy.linalg.LinAlgError:
+                print('Linalg could not be solved. Will use least squares approx')
+                ratings = numpy.linalg.lstsq(coefficients, constants, rcond=None)[0]
+        ## normalize around 0 ##
+        return ratings - numpy.median(ratings, axis=0)
+
+    def populate_records(self):
+        '''
+        Populates a record for each team with every variant's rating
+        '''
+        for i, team in enumerate(self.teams):
+            self.records.append({
+                'season' : self.season,
+                'week' : self.week,
+                'team' : team,
+                **{
+                    'srs_rating_{0}'.format(name) : round(self.ratings[i, j], 2)
+                    for j, name in enumerate(self.variants.keys())
+                }
+            })
+
+    def frame(self):
+        '''
+        Returns the records as a frame
+        '''
+        return pd.DataFrame(self.records)
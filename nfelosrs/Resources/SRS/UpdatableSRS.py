@@ -0,0 +1,152 @@
+import numpy
+
+from ...Utilities import assemble_laplacian
+
+
+class UpdatableSRS:
+    '''
+    An SRS system that can be updated one game at a time without a full
+    rebuild and solve
+
+    SRS solves L x = s, where L is the schedule's graph laplacian (games played
+    on the diagonal, minus games between each pair off it) and s is each team's
+    summed adjusted margin. Normalizing rows by games played, as SRS does, does not
+    change the solution. L is singular, as ratings are only defined up to a
+    constant, so the system is regularized to (L + 11ᵀ) x = s, which for a
+    connected schedule has the single solution with mean 0.
+
+    A game between i and j adds e eᵀ to L, where e = e_i - e_j, and result * e to
+    s. The inverse of L + 11ᵀ is kept and updated with Sherman-Morrison, so adding,
+    removing, or correcting a game costs O(n²) rather than a fresh O(n³) solve.
+    The inverse is rebuilt when an update's denominator gets close to 0 (ie a
+    removal that disconnects a team), when the residual drifts past tolerance, or
+    after max_updates updates
+    '''
+
+    def __init__(self, teams, home=None, away=None, results=None,
+                 max_updates=64, min_denominator=1e-8, tolerance=1e-9):
+        self.teams = list(teams)
+        self.team_to_index = {team : i for i, team in enumerate(self.teams)}
+        self.max_updates = max_updates
+        self.min_denominator = min_denominator
+        self.tolerance = tolerance
+        ## system ##
+        n = len(self.teams)
+        self.laplacian = numpy.zeros((n, n))
+        self.constants = numpy.zeros(n)
+        if home is not None:
+            home = numpy.asarray(home, dtype=numpy.int64)
+            away = numpy.asarray(away, dtype=numpy.int64)
+            results = numpy.asarray(results, dtype=numpy.float64)
+            self.laplacian = assemble_laplacian(home, away, n)[0].toarray()
+            self.constants += (
+                numpy.bincount(home, weights=results, minlength=n) -
+                numpy.bincount(away, weights=results, minlength=n)
+            )
+        ## state ##
+        self.inverse = None
+        self.solution = None
+        self.updates = 0
+        self.refactorizations = 0
+        self.refactor()
+
+    @staticmethod
+    def from_srs(srs):
+        '''
+        Creates an updatable system from the games of a solved SRS
+        '''
+        return UpdatableSRS(
+            srs.teams,
+            srs.games['home_index'].values,
+            srs.games['away_index'].values,
+            srs.games['adjusted_result'].values
+        )
+
+    def refactor(self):
+        '''
+        Rebuilds the inverse of the regularized system from scratch
+        '''
+        system = self.laplacian + 1
+        try:
+            self.inverse = numpy.linalg.inv(system)
+        except numpy.linalg.LinAlgError:
+            ## a disconnected schedule has no unique solution. Fall back to ##
+            ## the least squares (minimum norm) one ##
+            self.inverse = numpy.linalg.pinv(system)
+        self.solution = self.inverse @ self.constants
+        self.updates = 0
+        self.refactorizations += 1
+
+    def residual(self):
+        ## max abs error of the current solution ##
+        return numpy.max(numpy.abs(
+            self.laplacian @ self.solution + self.solution.sum() - self.constants
+        ))
+
+    def rank_one_update(self, i, j, sign):
+        '''
+        Applies sign * e eᵀ to the inverse with Sherman-Morrison. Returns False
+        if the update was too ill conditioned to apply
+        '''
+        ## inverse @ e and eᵀ @ inverse, with e = e_i - e_j ##
+        column = self.inverse[:, i] - self.inverse[:, j]
+        row = self.inverse[i, :] - self.inverse[j, :]
+        denominator = 1 + sign * (column[i] - column[j])
+        if abs(denominator) < self.min_denominator:
+            return False
+        self.inverse -= sign * numpy.outer(column, row) / denominator
+        return True
+
+    def update(self, home, away, sign, result):
+        ## updates the system for sign * a game and re-solves ##
+        i = self.team_to_index[home]
+        j = self.team_to_index[away]
+        self.laplacian[i, i] += sign
+        self.laplacian[j, j] += sign
+        self.laplacian[i, j] -= sign
+        self.laplacian[j, i] -= sign
+        self.constants[i] += sign * result
+        self.constants[j] -= sign * result
+        self.updates += 1
+        if self.updates > self.max_updates or not self.rank_one_update(i, j, sign):
+            self.refactor()
+            return
+        self.solution = self.inverse @ self.constants
+        if self.residual() > self.tolerance:
+            self.refactor()
+
+    def add_game(self, home, away, result):
+        '''
+        Adds a game with its adjusted home margin
+        '''
+        self.update(home, away, 1, result)
+
+    def remove_game(self, home, away, result):
+        '''
+        Removes a game previously added with the adjusted home margin passed
+        '''
+        self.update(home, away, -1, result)
+
+    def change_result(self, home, away, old_result, new_result):
+        '''
+        Corrects a game's adjusted home margin. The schedule is unchanged, so
+        only the constants move and the inverse is reused
+        '''
+        i = self.team_to_index[home]
+        j = self.team_to_index[away]
+        delta = new_result - old_result
+        self.constants[i] += delta
+        self.constants[j] -= delta
+        self.solution = self.solution + delta * (self.inverse[:, i] - self.inverse[:, j])
+
+    def ratings(self):
+        '''
+        Returns the ratings centered on the median, the srs_rating scale of SRS
+        '''
+        return self.solution - numpy.median(self.solution)
+
+    def rating_dict(self):
+        '''
+        Returns the ratings keyed by team
+        '''
+        return dict(zip(self.teams, self.ratings().tolist()))
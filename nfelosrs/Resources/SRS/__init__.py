@@ -1,2 +1,8 @@
 from .SRS import SRS
 from .SRSRunner import SRSRunner
+from .SRSDiff import SRSDiff
+from .ReferenceSRS import ReferenceSRS
+from .UpdatableSRS import UpdatableSRS
+from .LiveSRS import LiveSRS
+from .RatingsCube import RatingsCube
+from .SRSVariants import SRSVariants, DEFAULT_VARIANT
@@ -0,0 +1,273 @@
+import pandas as pd
+import numpy
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from ... import Utilities as utils
+from ...Utilities import calc_rsq_by_week, calc_rmse_by_week, calc_sos_by_week
+from ..DataLoader import DataLoader
+from ..WT import WTRatings
+from ..SRS import SRSRunner
+from ..Pipeline import BackgroundWriter
+
+
+class RatingsService():
+    '''
+    Holds the loaded data and SRS ratings in memory so new results can be applied
+    without a cold run, and answers point in time rating queries
+
+    A results event updates a copy of the games, then the runner's fingerprints
+    pick out the affected week (and any later weeks of the season) to recompute.
+    Updated ratings are indexed by (season, week) and swapped in whole, so queries
+    never wait on an update. If persist is True, outputs are written by a
+    background writer
+    '''
+    def __init__(self, runner, persist=True):
+        self.runner = runner
+        self.persist = persist
+        ## updates are applied one at a time ##
+        self.lock = threading.Lock()
+        self.writer = BackgroundWriter() if persist else None
+        ## in memory state ##
+        self.ratings = self.runner.existing_ratings
+        self.index = {}
+        self.updated_at = None
+        ## bring everything current ##
+        self.update(self.runner.prepare_run())
+
+    @staticmethod
+    def start(source=None, persist=True, bands=False, smoothed=False):
+        '''
+        Loads the data once, updates the win total ratings, and returns a
+        service with the SRS ratings current. bands and smoothed are passed to
+        the SRSRunner
+        '''
+        data = DataLoader(source)
+        WTRatings(data.wts, data.games, data.wt_ratings).update()
+        return RatingsService(
+            SRSRunner(
+                data.games, data.qbs, data.current_season, data.current_week,
+                bands=bands, smoothed=smoothed
+            ),
+            persist
+        )
+
+    def update(self, weeks_to_run):
+        '''
+        Recomputes the weeks passed, swaps in the new ratings, and queues writes
+        '''
+        if len(weeks_to_run) > 0:
+            new_dfs = [self.runner.calc_week(season, week) for season, week in weeks_to_run]
+            self.ratings = self.runner.combine_ratings(weeks_to_run, new_dfs)
+            if self.persist:
+                self.writer.put(
+                    utils.to_csv_atomic, self.ratings,
+                    '{0}/srs_ratings.csv'.format(self.runner.package_dir)
+                )
+                self.writer.put(
+                    utils.to_csv_atomic, self.runner.rated_fingerprints(),
+                    '{0}/srs_fingerprints.csv'.format(self.runner.package_dir)
+                )
+                self.writer.put(self.runner.save_cube, self.ratings, weeks_to_run)
+                if self.runner.smoothed:
+                    self.writer.put(self.runner.save_smoothed, self.ratings, weeks_to_run)
+                self.writer.put(self.write_metrics, self.ratings, self.runner.games)
+        ## the runner now reflects the ratings, whether or not anything ran ##
+        if self.ratings is not None:
+            self.runner.existing_ratings = self.ratings
+            self.runner.existing_fingerprints = self.runner.rated_fingerprints()
+            self.runner.current_week_index = len(self.runner.week_list) - 1
+            self.index = {
+                key : group.to_dict('records')
+                for key, group in self.ratings.groupby(['season', 'week'])
+            }
+        self.updated_at = time.time()
+        return weeks_to_run
+
+    def write_metrics(self, ratings, games):
+        ## metrics for the writer thread. calc_rmse_by_week modifies its input ##
+        utils.to_csv_atomic(
+            calc_rsq_by_week(ratings.copy()),
+            '{0}/srs_rating_rsqs.csv'.format(self.runner.package_dir)
+        )
+        utils.to_csv_atomic(
+            calc_rmse_by_week(games, ratings.copy()),
+            '{0}/srs_rating_rmse.csv'.format(self.runner.package_dir)
+        )
+        utils.to_csv_atomic(
+            calc_sos_by_week(games, ratings),
+            '{0}/srs_sos.csv'.format(self.runner.package_dir)
+        )
+
+    @staticmethod
+    def completed_through(games, season):
+        '''
+        Returns the last week of the season whose games, and every earlier
+        week's games, all have results. 0 if week 1 is not finished
+        '''
+        season_games = games[games['season'] == season]
+        unplayed = season_games[pd.isnull(season_games['result'])]['week']
+        if len(unplayed) == 0:
+            return int(season_games['week'].max()) if len(season_games) > 0 else 0
+        return int(unplayed.min()) - 1
+
+    def apply_results(self, season, week, results):
+        '''
+        Applies new or corrected results for a week and recomputes what changed
+
+        Results can be posted for any played week or for the next unplayed week.
+        The service only advances once every game of a week has a result, so a
+        partially posted week is held until it is complete
+
+        Parameters:
+            season, week: the week the results belong to
+            results: list of {'game_id', 'result'} with the home margin
+
+        Returns:
+            list of [season, week] that were recomputed
+        '''
+        with self.lock:
+            games = self.runner.games.copy()
+            next_unplayed = self.completed_through(games, season) + 1
+            if week > next_unplayed:
+                raise ValueError('{0} week {1} is after the next unplayed week, {2}'.format(
+                    season, week, next_unplayed
+                ))
+            result_map = {r['game_id'] : r['result'] for r in results}
+            in_week = (games['season'] == season) & (games['week'] == week)
+            unknown = set(result_map) - set(games.loc[in_week, 'game_id'])
+            if len(unknown) > 0:
+                raise ValueError('Games not in {0} week {1}: {2}'.format(
+                    season, week, ', '.join(sorted(unknown))
+                ))
+            update = in_week & games['game_id'].isin(result_map.keys())
+            games.loc[update, 'result'] = games.loc[update, 'game_id'].map(result_map).astype(float)
+            ## advance the season state only through completed weeks, since ##
+            ## unplayed games in a rated week would have no result ##
+            most_recent_season = self.runner.most_recent_season
+            most_recent_week = self.runner.most_recent_week
+            completed = self.completed_through(games, season)
+            if completed > 0 and (season, completed) > (most_recent_season, most_recent_week):
+                most_recent_season, most_recent_week = season, completed
+            self.runner.set_state(
+                games, most_recent_season, most_recent_week,
+                self.ratings, self.runner.existing_fingerprints
+            )
+            return self.update(self.runner.get_weeks_to_run())
+
+    def query(self, season, week, team=None):
+        '''
+        Returns the ratings as of a season and week. If the week has not been
+        rated (ie a bye week or a future week), the latest rated week before it
+        in the season is returned
+        '''
+        index = self.index
+        if (season, week) not in index:
+            weeks = [w for s, w in index.keys() if s == season and w <= week]
+            if len(weeks) == 0:
+                return []
+            week = max(weeks)
+        records = index[(season, week)]
+        if team is not None:
+            records = [r for r in records if r['team'] == team]
+        return records
+
+    def status(self):
+        '''
+        Returns the state the service is current through
+        '''
+        return {
+            'season' : int(self.runner.most_recent_season),
+            'week' : int(self.runner.most_recent_week),
+            'rated_weeks' : len(self.index),
+            'updated_at' : self.updated_at
+        }
+
+    def close(self):
+        '''
+        Waits for pending writes
+        '''
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _json_default(value):
+    ## numpy scalars and nans for json ##
+    if isinstance(value, numpy.generic):
+        value = value.item()
+    if isinstance(value, float) and numpy.isnan(value):
+        return None
+    return value
+
+
+class RatingsRequestHandler(BaseHTTPRequestHandler):
+    '''
+    HTTP interface for a RatingsService
+
+    GET  /status
+    GET  /ratings?season=2023&week=5[&team=KC]
+    POST /results  {"season": 2023, "week": 5, "results": [{"game_id": ..., "result": ...}]}
+    '''
+    def send_json(self, code, body):
+        payload = json.dumps(body, default=_json_default).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k : v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == '/status':
+                return self.send_json(200, self.server.service.status())
+            if url.path == '/ratings':
+                records = self.server.service.query(
+                    int(params['season']), int(params['week']), params.get('team')
+                )
+                ## nans are not valid json, send them as null ##
+                records = [
+                    {k : _json_default(v) for k, v in r.items()} for r in records
+                ]
+                return self.send_json(200, records)
+            return self.send_json(404, {'error' : 'unknown path {0}'.format(url.path)})
+        except (KeyError, ValueError) as e:
+            return self.send_json(400, {'error' : str(e)})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/results':
+            return self.send_json(404, {'error' : 'unknown path {0}'.format(url.path)})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            weeks = self.server.service.apply_results(
+                int(body['season']), int(body['week']), body['results']
+            )
+            return self.send_json(200, {'recomputed' : [[int(s), int(w)] for s, w in weeks]})
+        except (KeyError, ValueError) as e:
+            return self.send_json(400, {'error' : str(e)})
+
+    def log_message(self, format, *args):
+        ## quiet by default ##
+        pass
+
+
+def serve_ratings(service, host='127.0.0.1', port=8765):
+    '''
+    Serves a RatingsService over HTTP until interrupted
+    '''
+    server = ThreadingHTTPServer((host, port), RatingsRequestHandler)
+    server.service = service
+    print('Serving ratings on http://{0}:{1}'.format(host, server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return server
@@ -0,0 +1 @@
+from .RatingsService import RatingsService, RatingsRequestHandler, serve_ratings
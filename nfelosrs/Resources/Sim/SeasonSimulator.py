@@ -0,0 +1,262 @@
+import pandas as pd
+import numpy
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from ...Utilities import get_package_dir, DIVISIONS, TeamIndex
+
+
+def simulate_chunk(n_sims, seed, means, stdevs, home, away, hfa, margin_stdev,
+                   played_wins, division_index):
+    '''
+    Simulates one chunk of seasons and returns accumulators that can be
+    summed across chunks. This is a module level function so it can be
+    pickled and sent to worker processes
+
+    Parameters:
+        n_sims: number of seasons to simulate in this chunk
+        seed: numpy SeedSequence (or int) for the chunk's generator
+        means, stdevs: (teams,) arrays of current rating means and stdevs
+        home, away: (games,) team indices for the unplayed games
+        hfa: (games,) modeled hfa for the unplayed games
+        margin_stdev: single game margin stdev
+        played_wins: (teams,) wins already banked
+        division_index: (divisions, teams_per_division) team indices
+
+    Returns:
+        dict of accumulators
+    '''
+    rng = numpy.random.default_rng(seed)
+    n_teams = len(means)
+    n_games = len(home)
+    ## draw team strengths -- (n_sims, teams) ##
+    strengths = means + stdevs * rng.standard_normal((n_sims, n_teams))
+    ## draw game margins -- (n_sims, games) ##
+    margins = (
+        strengths[:, home] -
+        strengths[:, away] +
+        hfa +
+        margin_stdev * rng.standard_normal((n_sims, n_games))
+    )
+    home_win = (margins > 0).astype(numpy.float32)
+    ## home and away incidence matrices to translate game outcomes into team wins ##
+    home_incidence = numpy.zeros((n_games, n_teams), dtype=numpy.float32)
+    away_incidence = numpy.zeros((n_games, n_teams), dtype=numpy.float32)
+    home_incidence[numpy.arange(n_games), home] = 1
+    away_incidence[numpy.arange(n_games), away] = 1
+    wins = (
+        played_wins +
+        home_win @ home_incidence +
+        (1 - home_win) @ away_incidence
+    )
+    ## rest of season sos is the average simulated strength of remaining opponents ##
+    opponents = home_incidence.T @ away_incidence
+    opponents = opponents + opponents.T
+    remaining = opponents.sum(axis=1)
+    sos = (strengths @ opponents.T) / numpy.where(remaining > 0, remaining, numpy.nan)
+    ## division winners, with a random tiebreak ##
+    winners = numpy.zeros(0, dtype=numpy.int64)
+    if division_index.size > 0:
+        jittered = wins + rng.random(wins.shape) * 1e-3
+        winners = division_index[
+            numpy.arange(division_index.shape[0]),
+            numpy.argmax(jittered[:, division_index], axis=2)
+        ]
+    ## wins can be halves due to ties, so count on a half win grid ##
+    win_bins = numpy.rint(wins * 2).astype(numpy.int64)
+    n_bins = win_bins.max() + 1
+    histogram = numpy.bincount(
+        (numpy.arange(n_teams) * n_bins + win_bins).ravel(),
+        minlength=n_teams * n_bins
+    ).reshape(n_teams, n_bins)
+    return {
+        'n' : n_sims,
+        'wins' : wins.sum(axis=0, dtype=numpy.float64),
+        'wins_sq' : (wins.astype(numpy.float64) ** 2).sum(axis=0),
+        'histogram' : histogram,
+        'division' : numpy.bincount(winners.ravel(), minlength=n_teams),
+        'sos' : numpy.nansum(sos, axis=0),
+        'sos_sq' : numpy.nansum(sos ** 2, axis=0),
+    }
+
+
+class SeasonSimulator:
+    '''
+    Monte Carlo simulation of the remainder of a season
+
+    GamesPit fills unplayed games with a single point estimate (the spread between
+    the current bayesian rankings). The simulator instead draws team strengths from
+    the bayesian means and stdevs and game margins from the single game margin
+    distribution in distributions.json, which gives full distributions of win totals,
+    division odds, and rest of season strength of schedule.
+
+    Simulations are drawn as (n_sims, games) arrays in chunks of chunk_size to bound
+    memory, and chunks can be spread across processes
+    '''
+
+    def __init__(self, games, rankings, stdevs, season, week,
+                 n_sims=100000, chunk_size=10000, seed=None, margin_stdev=None):
+        ## meta ##
+        self.package_dir = get_package_dir()
+        self.season = season
+        self.week = week
+        self.n_sims = n_sims
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.margin_stdev = margin_stdev if margin_stdev is not None else self.load_margin_stdev()
+        ## season games, regular season only ##
+        self.games = games[
+            (games['season'] == season) &
+            (games['game_type'] == 'REG')
+        ].copy()
+        ## structure ##
+        self.team_index = TeamIndex.from_columns(self.games['home_team'], self.games['away_team'])
+        self.teams = self.team_index.teams.tolist()
+        self.games = self.games.assign(
+            home_index=self.team_index.encode(self.games['home_team']),
+            away_index=self.team_index.encode(self.games['away_team'])
+        )
+        self.means = numpy.array([rankings[team] for team in self.teams])
+        self.stdevs = numpy.array([stdevs[team] for team in self.teams])
+        self.division_names, self.division_index = self.build_divisions()
+        self.played_wins, self.remaining = self.split_schedule()
+        ## output ##
+        self.accumulators = None
+
+    def load_margin_stdev(self):
+        '''
+        Loads the single game margin stdev used by the bayesian model
+        '''
+        with open(
+            '{0}/nfelosrs/Resources/Bayes/distributions.json'.format(self.package_dir),
+            'r'
+        ) as fp:
+            return json.load(fp)['margins']
+
+    def build_divisions(self):
+        '''
+        Creates a (divisions, teams_per_division) index array for the teams
+        in the schedule
+        '''
+        names = []
+        index = []
+        for division, teams in DIVISIONS.items():
+            if all(team in self.team_index.team_to_id for team in teams):
+                names.append(division)
+                index.append(self.team_index.encode(teams))
+        if len(index) == 0:
+            return names, numpy.zeros((0, 0), dtype=numpy.int64)
+        return names, numpy.array(index, dtype=numpy.int64)
+
+    def split_schedule(self):
+        '''
+        Banks wins for games played through the week and returns the
+        remaining games to simulate
+        '''
+        played = (
+            (self.games['week'] <= self.week) &
+            (~pd.isnull(self.games['result']))
+        )
+        done = self.games[played]
+        home = done['home_index'].values
+        away = done['away_index'].values
+        result = done['result'].values
+        ## ties count as half a win for each team ##
+        played_wins = (
+            numpy.bincount(home, weights=(result > 0) + 0.5 * (result == 0), minlength=len(self.teams)) +
+            numpy.bincount(away, weights=(result < 0) + 0.5 * (result == 0), minlength=len(self.teams))
+        )
+        return played_wins, self.games[~played].copy()
+
+    def chunk_args(self):
+        '''
+        Splits the simulations into chunks, each with an independent seed
+        '''
+        n_chunks = int(numpy.ceil(self.n_sims / self.chunk_size))
+        seeds = numpy.random.SeedSequence(self.seed).spawn(n_chunks)
+        home = self.remaining['home_index'].values
+        away = self.remaining['away_index'].values
+        hfa = self.remaining['modeled_hfa'].fillna(0).values
+        args = []
+        for i, seed in enumerate(seeds):
+            args.append((
+                min(self.chunk_size, self.n_sims - i * self.chunk_size), seed,
+                self.means, self.stdevs, home, away, hfa, self.margin_stdev,
+                self.played_wins, self.division_index
+            ))
+        return args
+
+    def run(self, processes=None):
+        '''
+        Runs all simulations. If processes is greater than 1, chunks are
+        distributed across a process pool
+        '''
+        args = self.chunk_args()
+        if processes is not None and processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                chunks = list(pool.map(simulate_chunk, *zip(*args)))
+        else:
+            chunks = [simulate_chunk(*a) for a in args]
+        ## reduce ##
+        n_bins = max(c['histogram'].shape[1] for c in chunks)
+        self.accumulators = {
+            'n' : sum(c['n'] for c in chunks),
+            'histogram' : sum(
+                numpy.pad(c['histogram'], ((0, 0), (0, n_bins - c['histogram'].shape[1])))
+                for c in chunks
+            )
+        }
+        for key in ['wins', 'wins_sq', 'division', 'sos', 'sos_sq']:
+            self.accumulators[key] = sum(c[key] for c in chunks)
+        return self.results()
+
+    def win_percentile(self, q):
+        '''
+        Returns the win total at percentile q for each team from the histogram
+        '''
+        cdf = numpy.cumsum(self.accumulators['histogram'], axis=1) / self.accumulators['n']
+        return numpy.argmax(cdf >= q, axis=1) / 2
+
+    def results(self):
+        '''
+        Returns a team level summary of the simulations
+        '''
+        n = self.accumulators['n']
+        mean_wins = self.accumulators['wins'] / n
+        ## teams with no games left have no rest of season sos ##
+        has_remaining = numpy.isin(
+            numpy.arange(len(self.teams)),
+            self.remaining[['home_index', 'away_index']].values.ravel()
+        )
+        mean_sos = numpy.where(has_remaining, self.accumulators['sos'] / n, numpy.nan)
+        team_division = {}
+        for name, index in zip(self.division_names, self.division_index):
+            for i in index:
+                team_division[self.teams[i]] = name
+        return pd.DataFrame({
+            'season' : self.season,
+            'week' : self.week,
+            'team' : self.teams,
+            'division' : [team_division.get(team) for team in self.teams],
+            'current_wins' : self.played_wins,
+            'mean_wins' : numpy.round(mean_wins, 3),
+            'wins_stdev' : numpy.round(numpy.sqrt(numpy.maximum(self.accumulators['wins_sq'] / n - mean_wins ** 2, 0)), 3),
+            'wins_p05' : self.win_percentile(0.05),
+            'wins_p50' : self.win_percentile(0.50),
+            'wins_p95' : self.win_percentile(0.95),
+            'division_odds' : numpy.round(self.accumulators['division'] / n, 4),
+            'ros_sos' : numpy.round(mean_sos, 3),
+            'ros_sos_stdev' : numpy.round(numpy.sqrt(numpy.maximum(self.accumulators['sos_sq'] / n - mean_sos ** 2, 0)), 3),
+        })
+
+    def win_distribution(self):
+        '''
+        Returns the probability of each team finishing with each win total
+        '''
+        n = self.accumulators['n']
+        histogram = self.accumulators['histogram']
+        return pd.DataFrame(
+            histogram / n,
+            index=pd.Index(self.teams, name='team'),
+            columns=numpy.arange(histogram.shape[1]) / 2
+        )
@@ -0,0 +1 @@
+from .SeasonSimulator import SeasonSimulator
@@ -0,0 +1,136 @@
+import pandas as pd
+import numpy
+from scipy import sparse
+from scipy.optimize import minimize
+
+from ...Utilities import spread_to_prob, ELO_TO_POINTS_DIVISOR
+
+
+class WTOptimizer():
+    '''
+    Fits schedule aware win total ratings
+
+    Each team is assigned a rating that, when played against the schedule, produces
+    game win probabilities (via spread_to_prob) that sum to the market implied win total.
+    The optimizer minimizes the squared error between the market and modeled win totals.
+
+    All seasons are stacked into a single block diagonal problem. Rows of the incidence
+    matrix are (season, team) pairs and columns are games, with +1 for the home team
+    and -1 for the away team, so the objective and its gradient are a handful of
+    sparse products regardless of how many seasons are being fit
+    '''
+    def __init__(self, wts, games, coef=ELO_TO_POINTS_DIVISOR, use_hfa=True):
+        ## conversion from points to elo used in spread_to_prob ##
+        self.coef = coef
+        self.use_hfa = use_hfa
+        ## win totals need season, team, and the adjusted line ##
+        self.wts = wts[['season', 'team', 'line_adj']].reset_index(drop=True)
+        self.games = games[
+            (games['game_type'] == 'REG') &
+            (games['season'].isin(self.wts['season'].unique()))
+        ].copy()
+        ## structure ##
+        self.incidence = None
+        self.away_counts = None
+        self.hfa = None
+        self.season_rows = None
+        self.targets = None
+        self.has_games = None
+        self.ratings = None
+        ## init ##
+        self.build_incidence()
+
+    def build_incidence(self):
+        '''
+        Builds the (season, team) x game incidence matrix and the
+        normalized win total targets
+        '''
+        row_index = pd.Series(
+            numpy.arange(len(self.wts)),
+            index=pd.MultiIndex.from_frame(self.wts[['season', 'team']])
+        )
+        home_rows = row_index.reindex(
+            pd.MultiIndex.from_frame(self.games[['season', 'home_team']])
+        ).values
+        away_rows = row_index.reindex(
+            pd.MultiIndex.from_frame(self.games[['season', 'away_team']])
+        ).values
+        ## drop games that involve a team without a win total ##
+        keep = ~(numpy.isnan(home_rows) | numpy.isnan(away_rows))
+        home_rows = home_rows[keep].astype(numpy.int64)
+        away_rows = away_rows[keep].astype(numpy.int64)
+        n_games = len(home_rows)
+        cols = numpy.arange(n_games)
+        self.incidence = sparse.csr_matrix(
+            (
+                numpy.concatenate([numpy.ones(n_games), -numpy.ones(n_games)]),
+                (numpy.concatenate([home_rows, away_rows]), numpy.concatenate([cols, cols]))
+            ),
+            shape=(len(self.wts), n_games)
+        )
+        self.away_counts = numpy.bincount(away_rows, minlength=len(self.wts)).astype(float)
+        self.hfa = (
+            self.games['modeled_hfa'].fillna(0).values[keep]
+            if self.use_hfa and 'modeled_hfa' in self.games.columns else
+            numpy.zeros(n_games)
+        )
+        self.season_rows = pd.factorize(self.wts['season'])[0]
+        ## teams without a schedule can not be fit ##
+        self.has_games = (
+            numpy.bincount(home_rows, minlength=len(self.wts)) +
+            self.away_counts
+        ) > 0
+        ## targets are the adjusted lines, scaled so each season's wins sum to its games ##
+        n_seasons = self.season_rows.max() + 1
+        games_by_season = numpy.bincount(self.season_rows[home_rows], minlength=n_seasons)
+        line_adj = numpy.where(self.has_games, self.wts['line_adj'].values, 0)
+        line_by_season = numpy.bincount(self.season_rows, weights=line_adj, minlength=n_seasons)
+        scale = numpy.divide(
+            games_by_season, line_by_season,
+            out=numpy.zeros(len(line_by_season)), where=line_by_season > 0
+        )
+        self.targets = line_adj * scale[self.season_rows]
+
+    def objective(self, ratings):
+        '''
+        Squared win total error plus a penalty that centers each season at 0,
+        returned with its analytic gradient
+        '''
+        ## game spreads and probabilities ##
+        spreads = self.incidence.T @ ratings + self.hfa
+        probs = spread_to_prob(spreads * self.coef / ELO_TO_POINTS_DIVISOR)
+        ## modeled wins are away games plus the net home incidence of the probs ##
+        errors = (self.away_counts + self.incidence @ probs - self.targets) * self.has_games
+        centers = numpy.bincount(self.season_rows, weights=ratings * self.has_games)
+        loss = errors @ errors + centers @ centers
+        ## gradient ##
+        dprobs = probs * (1 - probs) * numpy.log(10) * self.coef / 400
+        gradient = (
+            2 * (self.incidence @ (dprobs * (self.incidence.T @ errors))) +
+            2 * centers[self.season_rows] * self.has_games
+        )
+        return loss, gradient
+
+    def solve(self, max_iter=1000):
+        '''
+        Solves all seasons at once with L-BFGS and returns the ratings
+        '''
+        result = minimize(
+            self.objective,
+            numpy.zeros(len(self.wts)),
+            jac=True,
+            method='L-BFGS-B',
+            options={'maxiter' : max_iter, 'gtol' : 1e-9, 'ftol' : 1e-15}
+        )
+        if not result.success:
+            print('     WT optimizer did not fully converge: {0}'.format(result.message))
+        ratings = result.x
+        spreads = self.incidence.T @ ratings + self.hfa
+        expected_wins = self.away_counts + self.incidence @ spread_to_prob(
+            spreads * self.coef / ELO_TO_POINTS_DIVISOR
+        )
+        self.ratings = self.wts[['season', 'team']].copy()
+        self.ratings['wt_schedule_rating'] = numpy.where(self.has_games, ratings, numpy.nan)
+        self.ratings['target_wins'] = numpy.where(self.has_games, self.targets, numpy.nan)
+        self.ratings['expected_wins'] = numpy.where(self.has_games, expected_wins, numpy.nan)
+        return self.ratings
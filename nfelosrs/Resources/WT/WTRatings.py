@@ -2,7 +2,8 @@ import pandas as pd
 import numpy
 
 from ... import Utilities as utils
-from ...Utilities import get_package_dir, add_line_rating, ELO_CENTER
+from ...Utilities import get_package_dir, add_line_rating, ELO_CENTER, ELO_TO_POINTS_DIVISOR
+from .WTOptimizer import WTOptimizer
 
 
 class WTRatings():
@@ -36,8 +37,9 @@ class WTRatings():
         self.wts_season = self.wts['season'].max()
     
     def format_wts(self):
-        ## format win total lines ##
-        self.wts = utils.add_odds_and_line_adj(self.wts, self.config['over_prob_logit_coef'])
+        ## format win total lines, unless they come in formatted (ie consensus lines) ##
+        if 'line_adj' not in self.wts.columns:
+            self.wts = utils.add_odds_and_line_adj(self.wts, self.config['over_prob_logit_coef'])
         ## add line_rating (normalized to 16-game season, centered at 0) ##
         self.wts = add_line_rating(self.wts)
     
@@ -53,6 +55,15 @@ class WTRatings():
         elo_scale = self.config.get('elo_scale', 56.0573)
         self.wts['wt_rating_elo'] = self.wts['wt_rating'] * elo_scale + ELO_CENTER
     
+    def calc_schedule_ratings(self, seasons):
+        ## fit schedule aware ratings for all passed seasons in a single solve ##
+        optimizer = WTOptimizer(
+            self.wts[self.wts['season'].isin(seasons)],
+            self.games,
+            coef=self.config.get('coef', ELO_TO_POINTS_DIVISOR)
+        )
+        return optimizer.solve()[['season', 'team', 'wt_schedule_rating']]
+    
     def calc_sos(self, season):
         ## calculate SOS using line_ratings ##
         season_games = self.games[
@@ -123,6 +134,12 @@ class WTRatings():
         ## create new df and merge with wts data ##
         if len(new_data) > 0:
             new_df = pd.DataFrame(new_data)
+            new_df = pd.merge(
+                new_df,
+                self.calc_schedule_ratings(seasons_to_process),
+                on=['season', 'team'],
+                how='left'
+            )
             new_df = pd.merge(
                 new_df,
                 self.wts.rename(columns={
@@ -133,7 +150,7 @@ class WTRatings():
                 how='left'
             )
             ## round ratings ##
-            for col in ['line_rating', 'wt_rating', 'wt_rating_elo', 'sos', 'hold', 'over_probability', 'under_probability', 'line_adj']:
+            for col in ['line_rating', 'wt_rating', 'wt_rating_elo', 'sos', 'wt_schedule_rating', 'hold', 'over_probability', 'under_probability', 'line_adj']:
                 if col in new_df.columns:
                     new_df[col] = new_df[col].round(4)
             ## add to existing or replace ##
@@ -142,5 +159,6 @@ class WTRatings():
             else:
                 self.wt_ratings = pd.concat([self.wt_ratings, new_df])
                 self.wt_ratings = self.wt_ratings.reset_index(drop=True)
-            ## save ##
-            self.wt_ratings.to_csv('{0}/wt_ratings.csv'.format(self.package_dir))
+            ## save. The swap is atomic so SRS snapshots reading the file while ##
+            ## a pipelined run updates it never see a partial write ##
+            utils.to_csv_atomic(self.wt_ratings, '{0}/wt_ratings.csv'.format(self.package_dir))
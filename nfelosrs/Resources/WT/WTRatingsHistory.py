@@ -0,0 +1,201 @@
+import pandas as pd
+import numpy
+
+from ... import Utilities as utils
+from ...Utilities import ELO_CENTER, get_league, TeamIndex
+
+
+class SeasonLineState():
+    '''
+    Holds the current book lines for a single season, along with a growable
+    float32 history of the consensus and line_rating after every snapshot
+    '''
+    def __init__(self, teams, sources):
+        self.team_index = TeamIndex(teams)
+        self.teams = self.team_index.teams.tolist()
+        self.sources = sources
+        self.source_to_index = {source : i for i, source in enumerate(sources)}
+        ## each book's latest line_adj for each team ##
+        self.book_lines = numpy.full((len(teams), len(sources)), numpy.nan)
+        ## consensus line_adj by team and its running season sum ##
+        self.consensus = numpy.full(len(teams), numpy.nan)
+        self.consensus_sum = 0.0
+        self.n_quoted = 0
+        self.line_rating = numpy.full(len(teams), numpy.nan)
+        ## history ##
+        self.n_snapshots = 0
+        self.dates = numpy.zeros(16, dtype='int64')
+        self.consensus_history = numpy.zeros((16, len(teams)), dtype=numpy.float32)
+        self.line_rating_history = numpy.zeros((16, len(teams)), dtype=numpy.float32)
+
+    def record(self, date):
+        ## append the current state to history, doubling capacity as needed ##
+        if self.n_snapshots == len(self.dates):
+            self.dates = numpy.concatenate([self.dates, numpy.zeros_like(self.dates)])
+            self.consensus_history = numpy.concatenate([
+                self.consensus_history, numpy.zeros_like(self.consensus_history)
+            ])
+            self.line_rating_history = numpy.concatenate([
+                self.line_rating_history, numpy.zeros_like(self.line_rating_history)
+            ])
+        self.dates[self.n_snapshots] = date
+        self.consensus_history[self.n_snapshots] = self.consensus
+        self.line_rating_history[self.n_snapshots] = self.line_rating
+        self.n_snapshots += 1
+
+
+class WTRatingsHistory():
+    '''
+    Recomputes WT ratings for every source_date snapshot of the multi book
+    win total quotes, so ratings can be tracked as lines move during the offseason
+
+    Each snapshot only touches the season it belongs to. The changed teams' consensus
+    lines are recomputed from the book lines, the season's line_adj sum is updated
+    incrementally, and the add_line_rating normalization is reapplied to that season only
+    '''
+    def __init__(self, quotes, config_override=None):
+        ## config ##
+        self.config = utils.load_config('config.json', ['wt_ratings'])
+        if config_override:
+            self.config.update(config_override)
+        self.adjustments = {
+            int(k) : v for k, v in self.config.get('wt_rating_adjustments', {}).items()
+        }
+        self.elo_scale = self.config.get('elo_scale', 56.0573)
+        ## league wide wins, see add_line_rating ##
+        league = get_league()
+        self.standard_total_wins = league['standard_games'] * league['teams'] // 2
+        self.average_wins = league['standard_games'] / 2
+        ## per book values for each snapshot ##
+        self.book_values = self.aggregate_books(quotes)
+        ## season states ##
+        self.seasons = {}
+        for season, season_values in self.book_values.groupby('season'):
+            self.seasons[season] = SeasonLineState(
+                sorted(season_values['team'].unique().tolist()),
+                sorted(season_values['source'].unique().tolist())
+            )
+
+    def aggregate_books(self, quotes):
+        '''
+        Calculates line_adj for every quote and reduces alternate lines posted by a book
+        at the same time to its main line, as calc_consensus_lines does
+        '''
+        quotes = utils.main_lines(utils.add_quote_odds(
+            quotes.copy(), self.config['over_prob_logit_coef']
+        ))
+        book_values = quotes[['line_adj']].reset_index()
+        book_values['team'] = book_values['team'].astype(str)
+        book_values['source'] = book_values['source'].astype(str)
+        return book_values.sort_values(
+            by=['source_date', 'source', 'season', 'team']
+        ).reset_index(drop=True)
+
+    def apply_snapshot(self, season, source, source_date, teams, line_adjs):
+        '''
+        Applies one book's lines for one or more teams and re-rates the season
+
+        Parameters:
+            season: season of the quotes
+            source: book that posted the lines
+            source_date: timestamp of the snapshot
+            teams: list of teams quoted
+            line_adjs: line_adj for each team
+        '''
+        state = self.seasons[season]
+        team_index = state.team_index.encode(teams)
+        state.book_lines[team_index, state.source_to_index[source]] = line_adjs
+        ## update the changed teams' consensus and the season sum incrementally ##
+        old = state.consensus[team_index]
+        new = numpy.nanmedian(state.book_lines[team_index], axis=1)
+        state.consensus[team_index] = new
+        state.consensus_sum += numpy.nansum(new) - numpy.nansum(old)
+        state.n_quoted += numpy.count_nonzero(~numpy.isnan(new)) - numpy.count_nonzero(~numpy.isnan(old))
+        ## renormalize the season (see add_line_rating). Until every team is quoted ##
+        ## the total wins are scaled down to the share of teams with a line ##
+        total_wins = self.standard_total_wins * state.n_quoted / len(state.teams)
+        state.line_rating = (
+            state.consensus * (total_wins / state.consensus_sum)
+        ) - self.average_wins
+        state.record(pd.Timestamp(source_date).value)
+
+    def apply_quote(self, season, team, source, source_date, line_adj):
+        '''
+        Applies a single line move
+        '''
+        self.apply_snapshot(season, source, source_date, [team], [line_adj])
+
+    def run(self):
+        '''
+        Replays every snapshot in chronological order
+        '''
+        values = self.book_values
+        ## a snapshot is one book, one timestamp, one season ##
+        breaks = numpy.flatnonzero(
+            (values['source_date'].values[1:] != values['source_date'].values[:-1]) |
+            (values['source'].values[1:] != values['source'].values[:-1]) |
+            (values['season'].values[1:] != values['season'].values[:-1])
+        ) + 1
+        starts = numpy.concatenate([[0], breaks])
+        ends = numpy.concatenate([breaks, [len(values)]])
+        seasons = values['season'].values
+        sources = values['source'].values
+        dates = values['source_date'].values
+        teams = values['team'].values
+        line_adjs = values['line_adj'].values
+        for start, end in zip(starts, ends):
+            self.apply_snapshot(
+                seasons[start], sources[start], dates[start],
+                teams[start:end], line_adjs[start:end]
+            )
+        return self.to_frame()
+
+    def wt_rating(self, season, line_rating):
+        ## applies the season's mean reversion adjustment (see WTRatings.calc_ratings) ##
+        return line_rating + line_rating * self.adjustments.get(season, -0.40)
+
+    def ratings_at(self, season, source_date):
+        '''
+        Returns the ratings for a season as they stood at source_date
+        '''
+        state = self.seasons[season]
+        i = numpy.searchsorted(
+            state.dates[:state.n_snapshots],
+            pd.Timestamp(source_date).value,
+            side='right'
+        ) - 1
+        if i < 0:
+            return None
+        line_rating = state.line_rating_history[i].astype(numpy.float64)
+        wt_rating = self.wt_rating(season, line_rating)
+        return pd.DataFrame({
+            'season' : season,
+            'team' : state.teams,
+            'line_adj' : state.consensus_history[i],
+            'line_rating' : line_rating,
+            'wt_rating' : wt_rating,
+            'wt_rating_elo' : wt_rating * self.elo_scale + ELO_CENTER
+        })
+
+    def to_frame(self):
+        '''
+        Returns the full history in long format
+        '''
+        frames = []
+        for season, state in self.seasons.items():
+            n = state.n_snapshots
+            n_teams = len(state.teams)
+            line_rating = state.line_rating_history[:n].astype(numpy.float64).ravel()
+            wt_rating = self.wt_rating(season, line_rating)
+            frames.append(pd.DataFrame({
+                'season' : season,
+                'source_date' : pd.to_datetime(numpy.repeat(state.dates[:n], n_teams), utc=True),
+                'team' : numpy.tile(state.teams, n),
+                'line_adj' : state.consensus_history[:n].ravel(),
+                'line_rating' : line_rating,
+                'wt_rating' : wt_rating,
+                'wt_rating_elo' : wt_rating * self.elo_scale + ELO_CENTER
+            }))
+        if len(frames) == 0:
+            return None
+        return pd.concat(frames).reset_index(drop=True)
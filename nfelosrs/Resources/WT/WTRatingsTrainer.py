@@ -3,24 +3,24 @@ import numpy
 import json
 import statsmodels.api as sm
 
-import nfelodcm as dcm
-
 from ... import Utilities as utils
 from ...Utilities import (
-    get_package_dir, add_line_rating, 
-    TEAM_REPLACEMENTS, ELO_CENTER, ELO_TO_POINTS_DIVISOR
+    get_package_dir, add_line_rating, get_league,
+    TeamIndex, ELO_CENTER, ELO_TO_POINTS_DIVISOR
 )
+from ..DataSource import DcmSource
 
 
 class WTRatingsTrainer():
     ## trains regression coefficients for win total ratings ##
-    def __init__(self):
+    def __init__(self, source=None):
         ## package path ##
         self.package_dir = get_package_dir()
         ## config ##
         self.config = utils.load_config('config.json', ['wt_ratings'])
-        ## data ##
-        self.db = dcm.load(['games', 'qbelo'])
+        ## data, from nfelodcm unless another source is passed ##
+        self.source = source if source is not None else DcmSource()
+        self.db = self.source.load(['games', 'qbelo'])
         self.games = None
         self.qbelo_spine = None
         self.wts = None
@@ -41,7 +41,7 @@ class WTRatingsTrainer():
             '{0}/nfelosrs/Manual Data/win_totals.csv'.format(self.package_dir),
             index_col=0
         )
-        self.wts['team'] = self.wts['team'].replace(TEAM_REPLACEMENTS)
+        self.wts['team'] = TeamIndex.canonical(self.wts['team'])
         ## add line_adj and line_rating to win totals ##
         self.wts = utils.add_odds_and_line_adj(self.wts, self.config['over_prob_logit_coef'])
         self.wts = add_line_rating(self.wts)
@@ -70,7 +70,7 @@ class WTRatingsTrainer():
                 'qbelo2_post': 'qbelo_post'
             })
         ])
-        flat['team'] = flat['team'].replace(TEAM_REPLACEMENTS)
+        flat['team'] = TeamIndex.canonical(flat['team'])
         ## join with games to get week ##
         flat = pd.merge(
             flat,
@@ -83,7 +83,7 @@ class WTRatingsTrainer():
         flat['qbelo_pre_pts'] = (flat['qbelo_pre'] - ELO_CENTER) / ELO_TO_POINTS_DIVISOR
         ## create complete spine of season x week combinations ##
         seasons = flat['season'].unique()
-        weeks = list(range(1, 19))
+        weeks = list(range(1, get_league()['regular_season_weeks'] + 1))
         teams = flat['team'].unique()
         spine = pd.DataFrame([
             {'season': s, 'week': w, 'team': t}
@@ -1,2 +1,4 @@
 from .WTRatings import WTRatings
 from .WTRatingsTrainer import WTRatingsTrainer
+from .WTOptimizer import WTOptimizer
+from .WTRatingsHistory import WTRatingsHistory
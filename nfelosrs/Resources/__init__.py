@@ -1,4 +1,10 @@
 from .DataLoader import DataLoader
+from .DataSource import DataSource, DcmSource, SnapshotSource, FrameSource
 from .WT import WTRatings, WTRatingsTrainer
-from .SRS import SRS, SRSRunner
-from .Bayes import update_distributions
+from .SRS import SRS, SRSRunner, SRSDiff, UpdatableSRS, LiveSRS, RatingsCube, SRSVariants
+from .Bayes import update_distributions, BayesTuner
+from .Sim import SeasonSimulator
+from .Features import FeatureCache
+from .Pipeline import PipelinedRun
+from .Service import RatingsService, serve_ratings
+from .Backtest import Backtest
@@ -4,14 +4,17 @@ import pandas as pd
 import numpy
 
 from ..constants import SRS_RATING_COLUMNS
+from ..league import get_league
 
 
 def calc_rmse(games, srs_file):
     '''
-    Calcs an RMSE to margin by week
+    Calcs an RMSE to margin by week for every week after the first
+    through the end of the regular season
     '''
     ## output structure ##
     output = {}
+    last_week = get_league()['regular_season_weeks']
     ## srs ratings are through the week, so the rating
     ## to join is the one from the previous week. Add 1
     srs_file['week'] = srs_file['week'] + 1
@@ -21,7 +24,7 @@ def calc_rmse(games, srs_file):
         temp = pd.merge(
             games[
                 (games['week'] > 1) &
-                (games['week'] < 19)
+                (games['week'] <= last_week)
             ],
             srs_file[[
                 'season', 'week', 'team', rating
@@ -54,21 +57,15 @@ def calc_rmse(games, srs_file):
         temp = temp.groupby(['week']).agg(
             mse = ('se', 'mean')
         ).reset_index()
-        ## iter and add to output ##
-        for index, row in temp.iterrows():
-            ## add week to the output if necessary ##
-            if 'week' in output.keys():
-                if row['week'] not in output['week']:
-                    output['week'].append(row['week'])
-            else:
-                output['week'] = [row['week']]
-            ## init rating if necessary ##
-            if rating not in output.keys():
-                output[rating] = [None] * 17
-            ## populate ##
-            output[rating][output['week'].index(row['week'])] = row['mse'] ** (1/2)
-    ## create a df ##
-    return pd.DataFrame(output).sort_values(
+        ## add to output, keyed by week ##
+        output[rating] = dict(zip(
+            temp['week'].astype(float).tolist(),
+            [mse ** (1/2) for mse in temp['mse'].tolist()]
+        ))
+    ## create a df. Weeks are the union across ratings ##
+    output = pd.DataFrame(output)
+    output.index.name = 'week'
+    return output.reset_index().sort_values(
         by=['week'],
         ascending=[True]
     ).reset_index(drop=True)
@@ -4,6 +4,7 @@ import pandas as pd
 import numpy
 
 from .base import grouped_rsq
+from ..league import get_league
 
 
 def calc_future_margin(srs_ratings):
@@ -32,7 +33,7 @@ def calc_rsq(srs_rating_df):
     Wrapper to calculate the RSQ to future mov for each week and rating type
     '''
     temp = srs_rating_df[
-        srs_rating_df['gp'] < 16
+        srs_rating_df['gp'] < get_league()['standard_games']
     ].copy()
     ## add future mov ##
     temp = calc_future_margin(temp)
@@ -1,6 +1,24 @@
 from .odds_formatting import *
+from .odds_arrays import *
 from .config_loader import *
 from .constants import *
 from .line_rating import add_line_rating
 from .flatten import flatten_home_away
+from .wt_consensus import calc_consensus_lines, add_quote_odds, main_lines, WT_QUOTE_INDEX
+from .fingerprints import calc_fingerprints
+from .distributions import (
+    load_distributions, get_distributions_path, calc_margin_errors,
+    calc_ranking_deltas, calc_moments, pool_std, bootstrap_std_ci
+)
+from .diff import compare_frames
+from .file_io import to_csv_atomic
 from .Metrics import calc_rsq_by_week, calc_rmse_by_week
+from .srs_assembly import (
+    assemble_srs, assemble_srs_weeks, assemble_srs_constants, assemble_laplacian,
+    solve_srs_components
+)
+from .team_index import TeamIndex, index_teams
+from .league import get_league, calc_league_dims
+from .opponent_margins import calc_opponent_margins
+from .schedule_strength import calc_sos_by_week, SOS_RATING_COLUMNS
+from .srs_bootstrap import bootstrap_srs
@@ -17,6 +17,13 @@ ELO_TO_POINTS_DIVISOR = 25
 STANDARD_NFL_GAMES = 16
 AVERAGE_WINS = 8
 
+## league dimensions used when config.json has no league section ##
+LEAGUE_DEFAULTS = {
+    'teams' : 32,
+    'standard_games' : STANDARD_NFL_GAMES,
+    'regular_season_weeks' : 18
+}
+
 ## SRS rating columns used in metrics calculations ##
 SRS_RATING_COLUMNS = [
     'avg_mov',
@@ -29,3 +36,15 @@ SRS_RATING_COLUMNS = [
     'bayesian_rating_w_qb_adj',
     'pre_season_wt_rating_w_qb_adj'
 ]
+
+## current division alignment, keyed by the standardized team names ##
+DIVISIONS = {
+    'AFC East': ['BUF', 'MIA', 'NE', 'NYJ'],
+    'AFC North': ['BAL', 'CIN', 'CLE', 'PIT'],
+    'AFC South': ['HOU', 'IND', 'JAX', 'TEN'],
+    'AFC West': ['DEN', 'KC', 'LAC', 'OAK'],
+    'NFC East': ['DAL', 'NYG', 'PHI', 'WAS'],
+    'NFC North': ['CHI', 'DET', 'GB', 'MIN'],
+    'NFC South': ['ATL', 'CAR', 'NO', 'TB'],
+    'NFC West': ['ARI', 'LAR', 'SEA', 'SF']
+}
@@ -0,0 +1,74 @@
+## differential comparison of reference and candidate outputs ##
+
+import pandas as pd
+import numpy
+
+
+def compare_frames(reference, candidate, keys, atol=1e-9, rtol=0.0):
+    '''
+    Compares two frames row by row after aligning them on keys and returns
+    the first divergence, or None if every shared column matches
+
+    Numeric columns match within atol + rtol * |reference| and missing values
+    match each other. Other columns must be equal. Rows or columns present in
+    only one frame are divergences
+
+    Parameters:
+        reference: output of the reference implementation
+        candidate: output of the implementation under test
+        keys: columns that identify a row, ie ['season', 'week', 'team']
+        atol, rtol: absolute and relative tolerance for numeric columns
+
+    Returns:
+        dict of the diverging keys, column, and both values, or None
+    '''
+    missing_columns = [c for c in reference.columns if c not in candidate.columns]
+    if len(missing_columns) > 0:
+        return {'column' : missing_columns[0], 'reference' : 'present', 'candidate' : 'missing'}
+    reference = reference.sort_values(by=keys, kind='mergesort').reset_index(drop=True)
+    candidate = candidate.sort_values(by=keys, kind='mergesort').reset_index(drop=True)
+    ## align rows ##
+    merged = pd.merge(
+        reference, candidate[reference.columns],
+        on=keys, how='outer', suffixes=('_ref', '_cand'), indicator=True,
+        sort=True
+    )
+    for i, side in enumerate(merged['_merge'].values):
+        if side != 'both':
+            return {
+                **{k : merged[k].values[i] for k in keys},
+                'column' : None,
+                'reference' : 'present' if side == 'left_only' else 'missing',
+                'candidate' : 'present' if side == 'right_only' else 'missing'
+            }
+    ## find the first mismatched row across all value columns ##
+    columns = [c for c in reference.columns if c not in keys]
+    first_row = len(merged)
+    first_column = None
+    for column in columns:
+        ref = merged['{0}_ref'.format(column)].values
+        cand = merged['{0}_cand'.format(column)].values
+        if (
+            pd.api.types.is_numeric_dtype(merged['{0}_ref'.format(column)]) and
+            pd.api.types.is_numeric_dtype(merged['{0}_cand'.format(column)])
+        ):
+            ref = ref.astype(numpy.float64)
+            cand = cand.astype(numpy.float64)
+            matched = (
+                numpy.isclose(ref, cand, atol=atol, rtol=rtol) |
+                (numpy.isnan(ref) & numpy.isnan(cand))
+            )
+        else:
+            matched = (ref == cand) | (pd.isnull(ref) & pd.isnull(cand))
+        diverged = numpy.flatnonzero(~matched)
+        if len(diverged) > 0 and diverged[0] < first_row:
+            first_row = diverged[0]
+            first_column = column
+    if first_column is None:
+        return None
+    return {
+        **{k : merged[k].values[first_row] for k in keys},
+        'column' : first_column,
+        'reference' : merged['{0}_ref'.format(first_column)].values[first_row],
+        'candidate' : merged['{0}_cand'.format(first_column)].values[first_row]
+    }
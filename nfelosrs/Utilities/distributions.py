@@ -0,0 +1,169 @@
+## shared calculations behind the bayesian distributions ##
+
+import pandas as pd
+import numpy
+import json
+import os
+
+from .config_loader import get_package_dir
+
+## memo of the distributions file, keyed by its modification time ##
+_distributions_memo = {}
+
+
+def get_distributions_path():
+    ## path of the distributions file used by the bayesian model ##
+    return '{0}/nfelosrs/Resources/Bayes/distributions.json'.format(get_package_dir())
+
+def load_distributions():
+    '''
+    Loads distributions.json once and reuses it until the file changes, so the
+    many BayesianRankings created during a run do not each reread it
+    '''
+    path = get_distributions_path()
+    mtime = os.path.getmtime(path)
+    if _distributions_memo.get('mtime') != mtime:
+        with open(path, 'r') as fp:
+            _distributions_memo['values'] = json.load(fp)
+        _distributions_memo['mtime'] = mtime
+    return dict(_distributions_memo['values'])
+
+def calc_margin_errors(games):
+    '''
+    Calculates the error of each played game's margin against the spread
+    '''
+    ## only played games ##
+    games = games[
+        ~pd.isnull(games['result'])
+    ].copy()
+    ## calc error ##
+    games['spread_error'] = games['result'] - games['spread_line']
+    return games[['season', 'spread_error']]
+
+def calc_ranking_deltas(qbs):
+    '''
+    Calculates the change from pre season to end of season qbelo ranking
+    (in points, without QB variance) for each complete team season
+    '''
+    ## only take played games in teh same time period as the games file ##
+    qbs = qbs[
+        (qbs['season'] >= 1999) &
+        (~pd.isnull(qbs['score1']))
+    ].copy()
+    ## flatten teams by season ##
+    qbs = pd.concat([
+        qbs[[
+            'season', 'date', 'team1', 'qbelo1_pre',
+            'qbelo1_post', 'qb1_adj'
+        ]].rename(columns={
+            'team1' : 'team',
+            'qbelo1_pre' : 'qbelo_pre',
+            'qbelo1_post' : 'qbelo_post',
+            'qb1_adj' : 'qb_adj'
+        }),
+        qbs[[
+            'season', 'date', 'team2', 'qbelo2_pre',
+            'qbelo2_post', 'qb2_adj'
+        ]].rename(columns={
+            'team2' : 'team',
+            'qbelo2_pre' : 'qbelo_pre',
+            'qbelo2_post' : 'qbelo_post',
+            'qb2_adj' : 'qb_adj'
+        })
+    ])
+    ## order rows chronologically within each team season. Keys are factorized ##
+    ## to ints so a single lexsort replaces the full frame sort ##
+    season_codes = pd.factorize(qbs['season'], sort=True)[0]
+    team_codes = pd.factorize(qbs['team'], sort=True)[0]
+    date_codes = pd.factorize(qbs['date'], sort=True)[0]
+    order = numpy.lexsort((date_codes, team_codes, season_codes))
+    season_codes = season_codes[order]
+    team_codes = team_codes[order]
+    ## group boundaries in the sorted array ##
+    breaks = numpy.flatnonzero(
+        (season_codes[1:] != season_codes[:-1]) |
+        (team_codes[1:] != team_codes[:-1])
+    ) + 1
+    starts = numpy.concatenate([[0], breaks]).astype(numpy.int64)
+    ends = numpy.concatenate([breaks, [len(order)]]).astype(numpy.int64)
+    ## since we are measuring ranking uncertainty for rankings set as points
+    ## against and average, we do not want to include QB variance and we need to rescale
+    ## the values and add back the QB adj ##
+    qb_adj = qbs['qb_adj'].values[order]
+    qbelo_pre = ((qbs['qbelo_pre'].values[order] + qb_adj) - 1505) / 25
+    qbelo_post = ((qbs['qbelo_post'].values[order] + qb_adj) - 1505) / 25
+    ## starting and ending values for the season are the first and last rows ##
+    ## of each group, plus games played ##
+    seasons = pd.DataFrame({
+        'season' : qbs['season'].values[order][starts],
+        'team' : qbs['team'].values[order][starts],
+        'gp' : ends - starts,
+        'pre_season_rank' : qbelo_pre[starts],
+        'end_of_season_rank' : qbelo_post[ends - 1],
+    }) if len(order) > 0 else pd.DataFrame(columns=[
+        'season', 'team', 'gp', 'pre_season_rank', 'end_of_season_rank'
+    ])
+    ## drop incomplete seasons ##
+    seasons = seasons[
+        seasons['gp']>14
+    ].copy()
+    ## delta between actual and expected ##
+    seasons['delta'] = seasons['end_of_season_rank']-seasons['pre_season_rank']
+    return seasons[['season', 'team', 'delta']].reset_index(drop=True)
+
+def calc_moments(values, groups):
+    '''
+    Calculates the count, mean, and sum of squared deviations of values by group,
+    which can be stored per season and pooled later
+
+    Returns:
+        DataFrame indexed by group with n, mean, and m2
+    '''
+    df = pd.DataFrame({'group' : groups, 'value' : values}).dropna()
+    agg = df.groupby('group')['value'].agg(['count', 'mean'])
+    deviations = df['value'] - df['group'].map(agg['mean'])
+    agg['m2'] = (deviations ** 2).groupby(df['group']).sum()
+    return agg.rename(columns={'count' : 'n'})
+
+def pool_std(n, mean, m2):
+    '''
+    Pools per group moments into a single sample standard deviation
+    (Chan et al's parallel variance)
+    '''
+    n = numpy.asarray(n, dtype=numpy.float64)
+    mean = numpy.asarray(mean, dtype=numpy.float64)
+    m2 = numpy.asarray(m2, dtype=numpy.float64)
+    total = n.sum()
+    if total < 2:
+        return numpy.nan
+    pooled_mean = (n * mean).sum() / total
+    pooled_m2 = m2.sum() + (n * (mean - pooled_mean) ** 2).sum()
+    return numpy.sqrt(pooled_m2 / (total - 1))
+
+def bootstrap_std_ci(values, n_boot=1000, alpha=0.05, seed=None, chunk_size=250):
+    '''
+    Bootstrap confidence interval for the sample standard deviation. Resamples
+    are drawn as a (chunk_size, n) index matrix and reduced along the rows, so
+    there is no python loop per resample
+
+    Parameters:
+        values: observations
+        n_boot: number of bootstrap resamples
+        alpha: two sided significance, ie 0.05 for a 95% interval
+        seed: seed for numpy's default_rng
+        chunk_size: resamples drawn at once, which bounds memory
+
+    Returns:
+        [low, high] as python floats
+    '''
+    values = numpy.asarray(values, dtype=numpy.float64)
+    values = values[~numpy.isnan(values)]
+    if len(values) < 2 or n_boot < 1:
+        return [numpy.nan, numpy.nan]
+    rng = numpy.random.default_rng(seed)
+    stds = numpy.empty(n_boot)
+    for start in range(0, n_boot, chunk_size):
+        n = min(chunk_size, n_boot - start)
+        samples = values[rng.integers(0, len(values), size=(n, len(values)))]
+        stds[start:start + n] = samples.std(axis=1, ddof=1)
+    return numpy.quantile(stds, [alpha / 2, 1 - alpha / 2]).tolist()
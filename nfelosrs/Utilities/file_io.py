@@ -0,0 +1,24 @@
+## file writing helpers ##
+
+import os
+import pathlib
+import tempfile
+
+
+def to_csv_atomic(df, path, **kwargs):
+    '''
+    Writes a frame to csv through a temporary file in the same folder and
+    swaps it into place, so readers never see a partially written file
+    '''
+    folder = pathlib.Path(path).parent
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as fp:
+            df.to_csv(fp, **kwargs)
+        ## mkstemp files are owner only, match a normally written file ##
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -0,0 +1,35 @@
+## content fingerprints for detecting changed inputs ##
+
+import pandas as pd
+import numpy
+
+
+def calc_fingerprints(df, columns, by):
+    '''
+    Hashes the passed columns of every row and combines the row hashes into
+    a single fingerprint per group. Row hashes are summed (mod 2^64) so the
+    fingerprint does not depend on row order.
+
+    Parameters:
+        df: DataFrame to fingerprint
+        columns: columns whose content should be captured
+        by: list of grouping columns, ie ['season'] or ['season', 'week']
+
+    Returns:
+        DataFrame with the grouping columns and a hex 'fingerprint' column
+    '''
+    row_hashes = pd.util.hash_pandas_object(
+        df[columns], index=False
+    ).values
+    groups = df[by].reset_index(drop=True).copy()
+    groups['hash'] = row_hashes
+    ## include the row count so added or dropped duplicate rows are caught ##
+    agg = groups.groupby(by).agg(
+        hash = ('hash', 'sum'),
+        rows = ('hash', 'count')
+    ).reset_index()
+    agg['fingerprint'] = [
+        '{0:016x}{1:04x}'.format(h, n)
+        for h, n in zip(agg['hash'].values.astype(numpy.uint64).tolist(), agg['rows'].tolist())
+    ]
+    return agg.drop(columns=['hash', 'rows'])
@@ -0,0 +1,39 @@
+## league dimensions ##
+## the models were built for the NFL, but nothing in them depends on its shape.
+## Dimensions come from the league section of config.json, or from the data
+
+import pandas as pd
+
+from .config_loader import load_config
+from .constants import LEAGUE_DEFAULTS
+
+
+def get_league():
+    '''
+    Returns the league dimensions (teams, standard_games, and
+    regular_season_weeks) from config, falling back to the NFL's
+    '''
+    league = dict(LEAGUE_DEFAULTS)
+    try:
+        league.update(load_config('config.json', ['league']))
+    except KeyError:
+        pass
+    return league
+
+def calc_league_dims(games):
+    '''
+    Infers the league dimensions from a games file, ie for a league without
+    a config. Teams and weeks are the most in any season, and standard games
+    is the most common regular season games played by a team
+    '''
+    reg = games[games['game_type'] == 'REG']
+    ## games played by each team in each season ##
+    games_played = pd.concat([
+        reg[['season', 'home_team']].rename(columns={'home_team' : 'team'}),
+        reg[['season', 'away_team']].rename(columns={'away_team' : 'team'})
+    ]).groupby(['season', 'team']).size()
+    return {
+        'teams' : int(games_played.groupby(level='season').size().max()),
+        'standard_games' : int(games_played.mode().iloc[0]),
+        'regular_season_weeks' : int(reg['week'].max())
+    }
@@ -1,8 +1,8 @@
 ## line rating calculation utility ##
 
-from .constants import STANDARD_NFL_GAMES, AVERAGE_WINS
+from .league import get_league
 
-def add_line_rating(df):
+def add_line_rating(df, league=None):
     '''
     Adds line_rating column to a dataframe containing line_adj values.
     Line rating is effectively projected wins over 8, normalized for 
@@ -10,11 +10,15 @@ def add_line_rating(df):
     
     Parameters:
         df: DataFrame with 'season' and 'line_adj' columns
+        league: league dimensions, defaults to get_league()
         
     Returns:
         DataFrame with 'line_rating' column added
     '''
-    STANDARD_TOTAL_WINS = STANDARD_NFL_GAMES * 16
+    league = league if league is not None else get_league()
+    ## every game is one win, so a standard season has games * teams / 2 ##
+    STANDARD_TOTAL_WINS = league['standard_games'] * league['teams'] // 2
+    AVERAGE_WINS = league['standard_games'] / 2
     df['line_rating'] = (
         df['line_adj'] *
         (STANDARD_TOTAL_WINS / df.groupby('season')['line_adj'].transform('sum'))
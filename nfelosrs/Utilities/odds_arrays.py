@@ -0,0 +1,127 @@
+## array first odds conversions ##
+## each function accepts scalars or arrays. Scalars return python floats, arrays
+## return numpy arrays. Passing out= writes results into an existing float buffer
+## so bulk conversions do not allocate intermediates
+
+import numpy
+
+
+def _as_float_array(values):
+    ## returns a float array view of the input and whether it was a scalar ##
+    is_scalar = numpy.ndim(values) == 0
+    return numpy.asarray(values, dtype=numpy.float64), is_scalar
+
+def _return(out, is_scalar):
+    ## unwraps 0-d results for the scalar api ##
+    return out.item() if is_scalar else out
+
+def american_to_prob_array(odds, out=None, scratch=None):
+    '''
+    Converts american odds to an implied probability. Same result as
+    american_to_prob for valid odds (|odds| >= 100), but branch free and done
+    in place on out, with scratch as an optional second buffer
+    '''
+    odds, is_scalar = _as_float_array(odds)
+    if out is None:
+        out = numpy.empty_like(odds)
+    if scratch is None:
+        scratch = numpy.empty_like(odds)
+    ## favorites are |odds| / (100 + |odds|) and underdogs 100 / (100 + odds), ##
+    ## so the numerator is max(-odds, 100) and the denominator 100 + |odds| ##
+    numpy.negative(odds, out=out)
+    numpy.maximum(out, 100, out=out)
+    numpy.absolute(odds, out=scratch)
+    numpy.add(scratch, 100, out=scratch)
+    numpy.divide(out, scratch, out=out)
+    return _return(out, is_scalar)
+
+def prob_to_american_array(prob, out=None):
+    '''
+    Converts an implied probability to american odds. The inverse of
+    american_to_prob_array, so probabilities of at least 0.5 are favorites
+    '''
+    prob, is_scalar = _as_float_array(prob)
+    if out is None:
+        out = numpy.empty_like(prob)
+    ## favorites are -100 * prob / (1 - prob) and underdogs 100 * (1 - prob) / prob ##
+    ratio = prob / (1 - prob)
+    numpy.copyto(out, numpy.where(prob >= 0.5, -100 * ratio, 100 / ratio))
+    return _return(out, is_scalar)
+
+def spread_to_prob_array(spread, divisor=400, out=None):
+    '''
+    Converts a spread to a win probability with the elo formula. Same logic
+    as spread_to_prob, but done in place on out
+    '''
+    spread, is_scalar = _as_float_array(spread)
+    if out is None:
+        out = numpy.empty_like(spread)
+    ## 1 / (10 ** (-spread * 25 / divisor) + 1) ##
+    numpy.multiply(spread, -25 / divisor, out=out)
+    numpy.power(10, out, out=out)
+    numpy.add(out, 1, out=out)
+    numpy.reciprocal(out, out=out)
+    return _return(out, is_scalar)
+
+def probs_and_hold_arrays(over, under, out=None):
+    '''
+    Converts over and under american odds to vig free over and under
+    probabilities and hold
+
+    Parameters:
+        over, under: american odds
+        out: optional (3, n) float buffer for the results
+
+    Returns:
+        over_prob_vf, under_prob_vf, hold
+    '''
+    over, is_scalar = _as_float_array(over)
+    under, _ = _as_float_array(under)
+    if out is None:
+        out = numpy.empty((3,) + over.shape)
+    over_prob_vf, under_prob_vf, hold = out[0, ...], out[1, ...], out[2, ...]
+    ## raw implied probabilities, the hold row is used as scratch ##
+    american_to_prob_array(over, out=over_prob_vf, scratch=hold)
+    american_to_prob_array(under, out=under_prob_vf, scratch=hold)
+    ## total implied probability, then hold ##
+    numpy.add(over_prob_vf, under_prob_vf, out=hold)
+    numpy.divide(over_prob_vf, hold, out=over_prob_vf)
+    numpy.subtract(1, over_prob_vf, out=under_prob_vf)
+    numpy.subtract(hold, 1, out=hold)
+    return (
+        _return(over_prob_vf, is_scalar),
+        _return(under_prob_vf, is_scalar),
+        _return(hold, is_scalar)
+    )
+
+WT_ODDS_FIELDS = ['over_prob_vf', 'under_prob_vf', 'hold', 'logit_over_prob_vf', 'line_adj']
+
+def line_adj_arrays(line, over, under, over_prob_logit_coef, out=None):
+    '''
+    Calculates vig free probabilities, hold and the adjusted win total line
+    for arrays of win total quotes in a single (5, n) buffer
+
+    Parameters:
+        line: win total lines
+        over, under: american odds
+        over_prob_logit_coef: coefficient on the logit of the vig free over prob
+        out: optional (5, n) float buffer for the results
+
+    Returns:
+        dict of WT_ODDS_FIELDS -> arrays (views of out)
+    '''
+    line, is_scalar = _as_float_array(line)
+    if out is None:
+        out = numpy.empty((len(WT_ODDS_FIELDS),) + line.shape)
+    probs_and_hold_arrays(over, under, out=out[:3])
+    logit, line_adj = out[3, ...], out[4, ...]
+    ## logit of the vig free over prob ##
+    numpy.divide(out[0, ...], out[1, ...], out=logit)
+    numpy.log(logit, out=logit)
+    ## adjust total line by the regression coefficient ##
+    numpy.multiply(logit, over_prob_logit_coef, out=line_adj)
+    numpy.add(line_adj, line, out=line_adj)
+    return {
+        field : _return(out[i, ...], is_scalar)
+        for i, field in enumerate(WT_ODDS_FIELDS)
+    }
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy
 
+from .odds_arrays import line_adj_arrays
+
 
 def american_to_prob(series):
     ## convert ameriacn odds to a probability ##
@@ -44,23 +46,14 @@ def calc_probs_and_hold(over, under):
 
 def add_odds_and_line_adj(wts, over_prob_logit_coef):
     ## translates over and under odds probabilities and an adjusted line ##
-    ## translate american odds to probabilities ##
-    wts['over_prob'] = american_to_prob(wts['over_odds'])
-    wts['under_prob'] = american_to_prob(wts['under_odds'])
-    wts['hold'] = wts['over_prob'] + wts['under_prob'] - 1
-    ## get vig free probabilities ##
-    wts['over_prob_vf'] = calc_vf_over_prob(wts['over_prob'], wts['under_prob'])
-    wts['under_prob_vf'] = 1 - wts['over_prob_vf']
-    ## take the logit of the over prob for regression ##
-    wts['logit_over_prob_vf'] = numpy.log(
-        wts['over_prob_vf'] /
-        (1 - wts['over_prob_vf'])
-    )
-    ## adjust total line by using regression ##
-    wts['line_adj'] = (
-        wts['line'] +
-        wts['logit_over_prob_vf'] * over_prob_logit_coef
+    ## all fields are calculated in a single numpy buffer and assigned ##
+    ## directly, so no intermediate columns are created or dropped ##
+    fields = line_adj_arrays(
+        wts['line'].values,
+        wts['over_odds'].values,
+        wts['under_odds'].values,
+        over_prob_logit_coef
     )
-    ## drop ##
-    wts = wts.drop(columns=['over_prob', 'under_prob'])
+    for field in ['hold', 'over_prob_vf', 'under_prob_vf', 'logit_over_prob_vf', 'line_adj']:
+        wts[field] = fields[field]
     return wts
@@ -0,0 +1,54 @@
+## opponent margins without a row by row filter ##
+
+import numpy
+import pandas as pd
+
+
+def calc_opponent_margins(teams, opponents, movs):
+    '''
+    For each team game row, returns the opponent's average margin in its games
+    against everyone other than the team, skipping na as pandas does
+
+    Each row's subset is the opponent's rows in file order, so the subsets are
+    gathered as (row, opponent row) pairs. Rows are then summed in groups of equal
+    subset length, as numpy sums a row of a 2d array exactly as it sums the same
+    values in 1d, which keeps results identical to filtering and taking the mean
+    of each subset
+
+    Parameters:
+        teams, opponents: team and opponent of each row
+        movs: margin of each row
+
+    Returns:
+        (rows,) array of opponent average margins, na where the opponent has
+        no other games
+    '''
+    movs = numpy.asarray(movs, dtype=numpy.float64)
+    n_rows = len(movs)
+    codes, _ = pd.factorize(numpy.concatenate([teams, opponents]))
+    team_codes, opponent_codes = codes[:n_rows], codes[n_rows:]
+    ## each team's rows, in file order ##
+    by_team = numpy.argsort(team_codes, kind='stable')
+    team_rows = numpy.bincount(team_codes, minlength=codes.max() + 1 if n_rows else 0)
+    team_starts = numpy.concatenate([[0], numpy.cumsum(team_rows)[:-1]]).astype(numpy.int64)
+    ## (row, opponent row) pairs ##
+    lengths = team_rows[opponent_codes]
+    row = numpy.repeat(numpy.arange(n_rows), lengths)
+    offset = numpy.arange(len(row)) - numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+    other = by_team[numpy.repeat(team_starts[opponent_codes], lengths) + offset]
+    ## drop the opponent's games against the team ##
+    keep = opponent_codes[other] != team_codes[row]
+    row, other = row[keep], other[keep]
+    values = movs[other]
+    played = ~numpy.isnan(values)
+    values = numpy.where(played, values, 0)
+    ## sum rows in groups of equal subset length ##
+    subset_length = numpy.bincount(row, minlength=n_rows)
+    sums = numpy.zeros(n_rows)
+    counts = numpy.bincount(row, weights=played, minlength=n_rows)
+    pair_length = subset_length[row]
+    for length in numpy.unique(subset_length[subset_length > 0]):
+        rows = numpy.flatnonzero(subset_length == length)
+        sums[rows] = values[pair_length == length].reshape(-1, length).sum(axis=1)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
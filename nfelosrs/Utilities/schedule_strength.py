@@ -0,0 +1,98 @@
+## past, remaining, and total strength of schedule for every rated week ##
+
+import pandas as pd
+import numpy
+from scipy import sparse
+
+from .team_index import TeamIndex
+
+## ratings SOS is measured against by default ##
+SOS_RATING_COLUMNS = ['srs_rating', 'bayesian_rating']
+
+
+def calc_sos_by_week(games, ratings, rating_columns=None):
+    '''
+    Strength of schedule for every team at every rated week, measured against
+    the ratings as of that week. Past SOS averages the current ratings of the
+    opponents in regular season games through the week, remaining SOS the
+    opponents still to play, and total SOS the full schedule
+
+    Every rated (season, week) is a slot, and each (slot, team) a row of one
+    block diagonal schedule incidence matrix, where a row counts the team's
+    games against each opponent in the slot's season. Splitting the incidence
+    on whether a game's week is after the slot's week gives past and remaining
+    schedules, and each is a single sparse product with the stacked ratings,
+    rather than a merge per week
+
+    Parameters:
+        games: games file with the full regular season schedule
+        ratings: srs ratings with a row for each season, week, and team
+        rating_columns: ratings to measure against
+
+    Returns:
+        a frame of past, remaining, and total games and SOS for each rating
+    '''
+    rating_columns = rating_columns or SOS_RATING_COLUMNS
+    reg = games[
+        (games['game_type'] == 'REG') &
+        games['season'].isin(ratings['season'].unique())
+    ]
+    teams = TeamIndex.from_columns(ratings['team'], reg['home_team'], reg['away_team'])
+    n_teams = len(teams)
+    ## slots, in season then week order ##
+    slots = ratings[['season', 'week']].drop_duplicates().sort_values(
+        by=['season', 'week']
+    ).reset_index(drop=True)
+    slot_index = pd.MultiIndex.from_frame(slots)
+    ## stacked (slot * team, rating) ratings ##
+    rows = (
+        slot_index.get_indexer(pd.MultiIndex.from_frame(ratings[['season', 'week']])) * n_teams +
+        teams.encode(ratings['team'].values)
+    )
+    stacked = numpy.full((len(slots) * n_teams, len(rating_columns)), numpy.nan)
+    stacked[rows] = ratings[rating_columns].values
+    ## each game from both sides ##
+    team = numpy.concatenate([teams.encode(reg['home_team'].values), teams.encode(reg['away_team'].values)])
+    opponent = numpy.concatenate([teams.encode(reg['away_team'].values), teams.encode(reg['home_team'].values)])
+    week = numpy.tile(reg['week'].values, 2)
+    season = numpy.tile(reg['season'].values, 2)
+    ## pair every side with each slot of its season ##
+    season_slots = slots.groupby('season').indices
+    first_slot = numpy.array([season_slots[s][0] for s in season])
+    n_slots = numpy.array([len(season_slots[s]) for s in season])
+    side = numpy.repeat(numpy.arange(len(team)), n_slots)
+    slot = (
+        numpy.repeat(first_slot, n_slots) +
+        numpy.arange(len(side)) - numpy.repeat(numpy.cumsum(n_slots) - n_slots, n_slots)
+    )
+    past = week[side] <= slots['week'].values[slot]
+    shape = (len(slots) * n_teams, len(slots) * n_teams)
+    output = {}
+    for name, keep in [('past', past), ('remaining', ~past)]:
+        schedule = sparse.csr_matrix(
+            (
+                numpy.ones(keep.sum()),
+                (slot[keep] * n_teams + team[side[keep]], slot[keep] * n_teams + opponent[side[keep]])
+            ),
+            shape=shape
+        )
+        output[name] = (
+            numpy.asarray(schedule.sum(axis=1)).ravel(),
+            schedule @ stacked
+        )
+    output['total'] = (
+        output['past'][0] + output['remaining'][0],
+        output['past'][1] + output['remaining'][1]
+    )
+    ## frame, for the rated rows ##
+    df = pd.DataFrame({
+        'season' : numpy.repeat(slots['season'].values, n_teams),
+        'week' : numpy.repeat(slots['week'].values, n_teams),
+        'team' : numpy.tile(teams.teams, len(slots))
+    })
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        for name, (counts, sums) in output.items():
+            df['{0}_games'.format(name)] = counts.astype(int)
+            for i, rating in enumerate(rating_columns):
+                df['{0}_{1}_sos'.format(rating, name)] = sums[:, i] / counts
+    return df.iloc[numpy.sort(rows)].reset_index(drop=True)
@@ -0,0 +1,195 @@
+## bincount based assembly of SRS systems ##
+## each game adds 1 to both teams' diagonal, -1 to the pair's off diagonals, and
+## the adjusted result to the home constant (subtracted from the away constant).
+## Rows are then normalized by games played. bincount accumulates in input order,
+## so sums match numpy.add.at over the same games bit for bit
+
+import numpy
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+
+def assemble_srs_weeks(home, away, results, masks, n_teams, weights=None):
+    '''
+    Assembles the SRS coefficient matrix and constants vector of many weeks
+    at once from a single game table
+
+    Parameters:
+        home, away: team index of each game's home and away team
+        results: adjusted home result of each game, either one per game, or
+            a (weeks, games) array if results differ by week (ie prior based
+            results for unplayed games)
+        masks: (weeks, games) bool array of the games in each week's system
+        n_teams: number of teams
+        weights: optional (weeks, games) weight of each game in each system
+            (ie bootstrap resamples), in place of counting each game once
+
+    Returns:
+        coefficients (weeks, teams, teams), constants (weeks, teams), and
+        game counts (weeks, teams). Teams without a game in a week have a
+        count of 0, so their normalized row is nan, as with a single week
+    '''
+    home = numpy.asarray(home, dtype=numpy.int64)
+    away = numpy.asarray(away, dtype=numpy.int64)
+    masks = numpy.asarray(masks, dtype=bool)
+    n_weeks = masks.shape[0]
+    results = numpy.broadcast_to(numpy.asarray(results, dtype=numpy.float64), masks.shape)
+    ## week and game of every masked game, in week then game order ##
+    week_index, game_index = numpy.nonzero(masks)
+    week_results = results[week_index, game_index]
+    if weights is None:
+        game_weights = None
+    else:
+        game_weights = numpy.broadcast_to(
+            numpy.asarray(weights, dtype=numpy.float64), masks.shape
+        )[week_index, game_index]
+        week_results = week_results * game_weights
+    ## flattened (week, team) slots for each side ##
+    home_slots = week_index * n_teams + home[game_index]
+    away_slots = week_index * n_teams + away[game_index]
+    slots = numpy.concatenate([home_slots, away_slots])
+    ## game counts, which are also the diagonal ##
+    game_counts = numpy.bincount(
+        slots,
+        weights=None if game_weights is None else numpy.concatenate([game_weights, game_weights]),
+        minlength=n_weeks * n_teams
+    ).reshape(n_weeks, n_teams).astype(numpy.float64)
+    ## constants. home results then away results, the order add.at uses ##
+    constants = numpy.bincount(
+        slots,
+        weights=numpy.concatenate([week_results, -1 * week_results]),
+        minlength=n_weeks * n_teams
+    ).reshape(n_weeks, n_teams)
+    ## off diagonals over flattened (week, i * n + j) indices ##
+    pair_offset = week_index * n_teams * n_teams
+    coefficients = -1 * numpy.bincount(
+        numpy.concatenate([
+            pair_offset + home[game_index] * n_teams + away[game_index],
+            pair_offset + away[game_index] * n_teams + home[game_index]
+        ]),
+        weights=None if game_weights is None else numpy.concatenate([game_weights, game_weights]),
+        minlength=n_weeks * n_teams * n_teams
+    ).reshape(n_weeks, n_teams, n_teams).astype(numpy.float64)
+    diagonal = numpy.arange(n_teams)
+    coefficients[:, diagonal, diagonal] += game_counts
+    ## normalize each row by games played ##
+    constants = constants / game_counts
+    coefficients = coefficients / game_counts[:, :, None]
+    return coefficients, constants, game_counts
+
+def assemble_srs(home, away, results, n_teams):
+    '''
+    Assembles a single SRS coefficient matrix and constants vector. See
+    assemble_srs_weeks
+    '''
+    coefficients, constants, game_counts = assemble_srs_weeks(
+        home, away, results, numpy.ones((1, len(home)), dtype=bool), n_teams
+    )
+    return coefficients[0], constants[0], game_counts[0]
+
+def assemble_srs_constants(home, away, results, game_counts):
+    '''
+    Assembles the SRS constants of many result vectors that share a schedule,
+    so one coefficient matrix serves all of them (ie SRS variants)
+
+    Each (team, column) constant accumulates over the same home then away
+    order assemble_srs uses, so every column matches the constants of its own
+    assembly bit for bit
+
+    Parameters:
+        home, away: team index of each game's home and away team
+        results: (games, columns) adjusted home results
+        game_counts: games played by each team, from the shared assembly
+
+    Returns:
+        constants (teams, columns)
+    '''
+    home = numpy.asarray(home, dtype=numpy.int64)
+    away = numpy.asarray(away, dtype=numpy.int64)
+    results = numpy.asarray(results, dtype=numpy.float64)
+    n_teams = len(game_counts)
+    n_columns = results.shape[1]
+    ## flattened (team, column) slots of every side ##
+    slots = (
+        numpy.concatenate([home, away])[:, None] * n_columns +
+        numpy.arange(n_columns)
+    ).ravel()
+    constants = numpy.bincount(
+        slots,
+        weights=numpy.concatenate([results, -1 * results]).ravel(),
+        minlength=n_teams * n_columns
+    ).reshape(n_teams, n_columns)
+    return constants / numpy.asarray(game_counts)[:, None]
+
+def assemble_laplacian(home, away, n_teams, weights=None):
+    '''
+    Assembles the schedule's graph laplacian (games played on the diagonal,
+    minus games between each pair off it) as a sparse matrix, along with the
+    symmetric game count adjacency it is built from. Games count once, or by
+    their weight if weights are passed
+
+    Returns:
+        laplacian and adjacency, both (teams, teams) csr matrices
+    '''
+    adjacency = sparse.coo_matrix(
+        (
+            numpy.ones(len(home)) if weights is None else numpy.asarray(weights, dtype=numpy.float64),
+            (home, away)
+        ),
+        shape=(n_teams, n_teams)
+    ).tocsr()
+    adjacency = adjacency + adjacency.T
+    laplacian = (
+        sparse.diags(numpy.asarray(adjacency.sum(axis=1)).ravel()) - adjacency
+    ).tocsr()
+    return laplacian, adjacency
+
+def solve_srs_components(home, away, results, n_teams, weights=None):
+    '''
+    Solves the SRS system sparsely for large or weakly connected schedules
+    (ie college football)
+
+    Normalizing rows by games played does not change the solution, so the
+    laplacian system L x = s is solved directly. One team per connected
+    component is grounded at 0, which leaves a single nonsingular, block
+    diagonal system over every other team, and each component is then centered
+    on 0. This is the minimum norm solution the dense path reaches with least
+    squares when the schedule is disconnected. Teams without games get 0
+
+    Results may also be a (games, columns) array of result vectors sharing the
+    schedule, which are solved against the same factorization. Games may be
+    weighted (ie bootstrap resamples) in place of counting each once
+
+    Returns:
+        ratings (teams,), or (teams, columns), and the component label of
+        each team
+    '''
+    home = numpy.asarray(home, dtype=numpy.int64)
+    away = numpy.asarray(away, dtype=numpy.int64)
+    results = numpy.asarray(results, dtype=numpy.float64)
+    columns = results.reshape(len(home), -1)
+    if weights is not None:
+        columns = columns * numpy.asarray(weights, dtype=numpy.float64)[:, None]
+    ## symmetric game count adjacency and its laplacian ##
+    laplacian, adjacency = assemble_laplacian(home, away, n_teams, weights)
+    laplacian = laplacian.tocsc()
+    n_components, labels = connected_components(adjacency, directed=False)
+    constants = numpy.stack([
+        numpy.bincount(home, weights=column, minlength=n_teams) -
+        numpy.bincount(away, weights=column, minlength=n_teams)
+        for column in columns.T
+    ], axis=1)
+    ratings = numpy.zeros((n_teams, columns.shape[1]))
+    ## ground the first member of each component ##
+    keep = numpy.ones(n_teams, dtype=bool)
+    keep[numpy.unique(labels, return_index=True)[1]] = False
+    if keep.any():
+        ratings[keep] = splu(laplacian[keep][:, keep]).solve(constants[keep])
+    ## center each component ##
+    sizes = numpy.bincount(labels)
+    for i in range(ratings.shape[1]):
+        ratings[:, i] -= (
+            numpy.bincount(labels, weights=ratings[:, i]) / sizes
+        )[labels]
+    return ratings.reshape((n_teams,) + results.shape[1:]), labels
@@ -0,0 +1,67 @@
+## bootstrapped SRS rating bands ##
+
+import numpy
+from scipy.sparse.csgraph import connected_components
+
+from .srs_assembly import assemble_srs_weeks, assemble_laplacian, solve_srs_components
+
+
+def bootstrap_srs(home, away, results, played, n_teams, n_boot=1000,
+                  percentiles=(5, 95), seed=None, chunk_size=250, dense=True):
+    '''
+    Percentile bands of SRS ratings under a bayesian bootstrap of the played
+    games. Each resample reweights the played games with exponential weights
+    (mean 1), while unplayed, prior based games keep a weight of 1. Every game
+    keeps a positive weight, so a resample never disconnects a team.
+
+    Resamples are assembled as a (chunk_size, teams, teams) stack and solved in
+    one batched numpy.linalg.solve. The row normalized SRS system is singular,
+    so 1 is added to every coefficient. As each row of the system sums to 0, the
+    solution of the regularized system is the mean 0 solution of the original,
+    which is then centered on the median as SRS does.
+
+    The regularized system is only nonsingular for a connected schedule, so
+    disconnected schedules, and large ones SRS solves sparsely (dense=False),
+    solve each resample with solve_srs_components instead
+
+    Parameters:
+        home, away: team index of each game's home and away team
+        results: adjusted home result of each game
+        played: bool array of the games that have been played
+        n_teams: number of teams
+        n_boot: number of bootstrap resamples
+        percentiles: percentiles of the resampled ratings to return
+        seed: seed for numpy's default_rng
+        chunk_size: resamples solved at once, which bounds memory
+        dense: whether the schedule is small enough for the batched dense solve
+
+    Returns:
+        (percentiles, teams) array of rating percentiles
+    '''
+    played = numpy.asarray(played, dtype=bool)
+    rng = numpy.random.default_rng(seed)
+    ratings = numpy.empty((n_boot, n_teams))
+    if dense:
+        n_components = connected_components(
+            assemble_laplacian(home, away, n_teams)[1], directed=False
+        )[0]
+        dense = n_components == 1
+    for start in range(0, n_boot, chunk_size):
+        n = min(chunk_size, n_boot - start)
+        weights = numpy.ones((n, len(played)))
+        if played.any():
+            draws = rng.standard_exponential((n, played.sum()))
+            weights[:, played] = draws / draws.mean(axis=1, keepdims=True)
+        if dense:
+            coefficients, constants, _ = assemble_srs_weeks(
+                home, away, results, numpy.ones((n, len(played)), dtype=bool),
+                n_teams, weights
+            )
+            solved = numpy.linalg.solve(coefficients + 1, constants[:, :, None])[:, :, 0]
+        else:
+            solved = numpy.array([
+                solve_srs_components(home, away, results, n_teams, w)[0]
+                for w in weights
+            ])
+        ratings[start:start + n] = solved - numpy.median(solved, axis=1, keepdims=True)
+    return numpy.percentile(ratings, percentiles, axis=0)
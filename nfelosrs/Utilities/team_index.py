@@ -0,0 +1,83 @@
+## integer team ids shared across the models ##
+
+import pandas as pd
+import numpy
+
+from .constants import TEAM_REPLACEMENTS
+
+
+class TeamIndex():
+    '''
+    Canonical registry of team abbreviations. Teams are sorted, so ids follow
+    alphabetical order, and encoded once at load as small ints that the models
+    use for array indexing in place of repeated string lookups
+    '''
+    def __init__(self, teams):
+        self.teams = numpy.array(sorted(set(teams)), dtype=object)
+        self.dtype = pd.CategoricalDtype(self.teams)
+        self.team_to_id = {team : i for i, team in enumerate(self.teams)}
+
+    def __len__(self):
+        return len(self.teams)
+
+    @staticmethod
+    def canonical(values):
+        '''
+        Applies relocation and abbreviation replacements, ie SD -> LAC
+        '''
+        return values.replace(TEAM_REPLACEMENTS)
+
+    @staticmethod
+    def from_columns(*columns):
+        '''
+        Builds an index from every team that appears in the columns passed
+        '''
+        return TeamIndex(pd.concat([pd.Series(c) for c in columns]).dropna().unique())
+
+    def encode(self, values):
+        '''
+        Returns the id of each team. Raises if a team is not in the index
+        '''
+        ids = pd.Categorical(values, dtype=self.dtype).codes.astype(numpy.int32)
+        unknown = (ids < 0) & pd.notnull(values)
+        if unknown.any():
+            raise ValueError('Teams not in the index: {0}'.format(
+                ', '.join(sorted(set(numpy.asarray(values)[unknown])))
+            ))
+        return ids
+
+    def decode(self, ids):
+        '''
+        Returns the team of each id
+        '''
+        return self.teams[ids]
+
+    def add_ids(self, df, columns):
+        '''
+        Adds a <column>_id column for each team column passed
+        '''
+        for column in columns:
+            df['{0}_id'.format(column)] = self.encode(df[column])
+        return df
+
+
+def index_teams(games, sort=False):
+    '''
+    Returns the teams in a games frame, and each game's home and away index
+    into that list. Teams are in order of first appearance (home before away),
+    or alphabetical if sort is True. The home_team_id and away_team_id columns
+    added by DataLoader are used when present, otherwise the names are encoded
+    '''
+    names = numpy.column_stack([
+        games['home_team'].values, games['away_team'].values
+    ]).ravel()
+    if 'home_team_id' in games.columns and 'away_team_id' in games.columns:
+        keys = numpy.column_stack([
+            games['home_team_id'].values, games['away_team_id'].values
+        ]).ravel()
+    else:
+        keys = names
+    codes, _ = pd.factorize(keys, sort=sort)
+    ## first appearance of each code gives its name ##
+    first = numpy.unique(codes, return_index=True)[1]
+    return names[first].tolist(), codes[0::2], codes[1::2]
@@ -0,0 +1,118 @@
+## consensus win total lines from many books and timestamps ##
+
+import pandas as pd
+import numpy
+
+from .odds_arrays import line_adj_arrays, prob_to_american_array, WT_ODDS_FIELDS
+
+## quote key, in index order ##
+WT_QUOTE_INDEX = ['season', 'team', 'source', 'source_date']
+## floor on hold when weighting by it, so no-vig or arbitrage quotes ##
+## do not receive unbounded weight ##
+MIN_CONSENSUS_HOLD = 0.01
+
+
+def add_quote_odds(quotes, over_prob_logit_coef):
+    '''
+    Adds vig free probabilities, hold and line_adj to a frame of quotes
+    in a single array pass
+    '''
+    fields = line_adj_arrays(
+        quotes['line'].values,
+        quotes['over_odds'].values,
+        quotes['under_odds'].values,
+        over_prob_logit_coef
+    )
+    for field in WT_ODDS_FIELDS:
+        quotes[field] = fields[field]
+    return quotes
+
+def latest_quotes(quotes):
+    '''
+    Filters quotes to each book's most recent snapshot for a team-season.
+    All alternate lines posted at that snapshot are kept
+    '''
+    dates = quotes.index.get_level_values('source_date')
+    latest = pd.Series(dates.values, index=quotes.index).groupby(
+        level=['season', 'team', 'source'], observed=True
+    ).transform('max').values
+    return quotes[dates.values == latest]
+
+def main_lines(quotes):
+    '''
+    Reduces the alternate lines a book posted at a snapshot to its main line,
+    the quote whose vig free over probability is closest to even. Expects the
+    fields from add_quote_odds
+    '''
+    flat = quotes.reset_index()
+    flat['distance'] = (flat['over_prob_vf'] - 0.5).abs()
+    flat = flat.sort_values(by=WT_QUOTE_INDEX + ['distance'], kind='mergesort')
+    return flat.drop_duplicates(subset=WT_QUOTE_INDEX, keep='first').drop(
+        columns=['distance']
+    ).set_index(WT_QUOTE_INDEX)
+
+def calc_consensus_lines(quotes, over_prob_logit_coef, method='median', latest_only=True):
+    '''
+    Calculates a vig free consensus win total line for each team-season. Each
+    book's main line is picked first, so alternate lines do not pull the
+    consensus, and the main lines are then aggregated across books
+
+    Parameters:
+        quotes: frame of quotes indexed by WT_QUOTE_INDEX with line,
+            over_odds, and under_odds columns
+        over_prob_logit_coef: coefficient on the logit of the vig free over prob
+        method: 'median' for the median across books, or 'hold_weighted' for a
+            mean weighted by 1 / hold so lower vig books count more
+        latest_only: if True, only each book's latest snapshot is used
+
+    Returns:
+        DataFrame with one row per season and team, in the shape of the
+        formatted win totals WTRatings expects. over_odds and under_odds are
+        the american odds of the consensus probabilities at the consensus hold
+    '''
+    quotes = add_quote_odds(quotes.copy(), over_prob_logit_coef)
+    if latest_only:
+        quotes = latest_quotes(quotes)
+    quotes = main_lines(quotes)
+    values = ['line', 'hold', 'over_prob_vf', 'line_adj']
+    flat = quotes[values].reset_index()
+    group_keys = ['season', 'team']
+    grouped = flat.groupby(group_keys, observed=True, sort=True)
+    if method == 'median':
+        consensus = grouped[values].median()
+    elif method == 'hold_weighted':
+        ## weighted means with bincount over the group codes ##
+        codes = grouped.ngroup().values
+        weights = 1 / numpy.maximum(flat['hold'].values, MIN_CONSENSUS_HOLD)
+        weight_sums = numpy.bincount(codes, weights=weights)
+        consensus = pd.DataFrame(
+            {
+                value : numpy.bincount(codes, weights=weights * flat[value].values) / weight_sums
+                for value in values
+            },
+            index=grouped.size().index
+        )
+    else:
+        raise ValueError('Unknown consensus method: {0}'.format(method))
+    ## derived fields are recomputed from the consensus over prob ##
+    consensus['under_prob_vf'] = 1 - consensus['over_prob_vf']
+    consensus['logit_over_prob_vf'] = numpy.log(
+        consensus['over_prob_vf'] / consensus['under_prob_vf']
+    )
+    ## odds that give back the consensus probabilities and hold ##
+    for side in ['over', 'under']:
+        consensus['{0}_odds'.format(side)] = prob_to_american_array(
+            consensus['{0}_prob_vf'.format(side)].values * (1 + consensus['hold'].values)
+        ).round(2)
+    consensus['source'] = 'consensus_{0}'.format(method)
+    consensus['source_date'] = grouped['source_date'].max()
+    consensus['n_sources'] = grouped['source'].nunique()
+    consensus['n_quotes'] = grouped.size()
+    consensus = consensus.reset_index()
+    consensus['team'] = consensus['team'].astype(str)
+    return consensus[[
+        'season', 'team', 'line', 'over_odds', 'under_odds', 'source',
+        'source_date', 'hold', 'over_prob_vf', 'under_prob_vf',
+        'logit_over_prob_vf', 'line_adj',
+        'n_sources', 'n_quotes'
+    ]]
@@ -1,22 +1,38 @@
+import pandas as pd
+
 from .Resources import *
+from .Utilities import get_package_dir
 
-def run(rebuild=False, with_date_return=False):
+def run(rebuild=False, with_date_return=False, wt_consensus=None, diff_sample=0, source=None, pipelined=False, bands=False, smoothed=False):
     ## wrapper to run and update all models ##
-    ## load data ##
-    data = DataLoader()
+    ## load data. Pass a SnapshotSource to run from a local snapshot ##
+    ## rather than live nfelodcm data ##
+    data = DataLoader(source)
+    ## if a consensus method (median or hold_weighted) is passed, seasons ##
+    ## with multi book quotes use the consensus line ##
+    wts = data.wts if wt_consensus is None else data.combine_wts(wt_consensus)
+    if pipelined:
+        ## overlap the wt update, srs snapshots, metrics, and writes ##
+        PipelinedRun(data, wts, rebuild, diff_sample, bands=bands, smoothed=smoothed).run()
+        if with_date_return:
+            return data.current_season, data.current_week
+        return
     ## update win totals ##
     wt_ratings = WTRatings(
-        data.wts,
+        wts,
         data.games,
         data.wt_ratings,
         rebuild
     )
     wt_ratings.update()
-    ## update srs
+    ## update srs. If diff_sample is passed, that many of the updated weeks ##
+    ## are checked against the reference implementation before writing. If ##
+    ## bands is True, ratings carry bootstrapped bands on srs_rating, and if ##
+    ## smoothed is True, smoothed bayesian rankings are written too ##
     srs_runner = SRSRunner(
         data.games, data.qbs,
         data.current_season, data.current_week,
-        rebuild
+        rebuild, diff_sample, bands, smoothed
     )
     srs_runner.run()
     if with_date_return:
@@ -25,8 +41,32 @@ def run(rebuild=False, with_date_return=False):
         ## downstream repo updating script contextual info for commit msg
         return data.current_season, data.current_week
 
-def create_bayesian_distributions():
+def create_bayesian_distributions(source=None, n_boot=0):
+    '''
+    wrapper for the bayesian distribution workflow. Pass n_boot to also write
+    bootstrap intervals on each stdev
+    '''
+    data = DataLoader(source)
+    update_distributions(data.games, data.qbs, data.features, n_boot)
+
+def backtest(source=None, processes=None):
+    '''
+    Backtests the stored ratings against the games and writes the season,
+    week, and rating report along with the calibration table
+    '''
+    data = DataLoader(source)
+    ratings = pd.read_csv(
+        '{0}/srs_ratings.csv'.format(get_package_dir()),
+        index_col=0
+    )
+    backtest = Backtest(data.games, ratings)
+    backtest.run(processes)
+    backtest.save()
+    return backtest
+
+def serve(host='127.0.0.1', port=8765, source=None, persist=True, bands=False, smoothed=False):
     '''
-    wrapper for the bayesian distribution workflow
+    Loads the data once and serves the ratings over HTTP. New results are
+    POSTed to /results and only the weeks they affect are recomputed
     '''
-    update_distributions()
+    serve_ratings(RatingsService.start(source, persist, bands, smoothed), host, port)